@@ -0,0 +1,180 @@
+"""Context compaction for the agent's in-flight message list."""
+
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.recall import ToolResultStore
+
+# Characters of an elided tool result kept as a preview
+ELIDED_PREVIEW_CHARS = 200
+
+# Messages longer than this are cut down in the last compaction stage
+TRUNCATE_OVER_CHARS = 4000
+
+# Characters of each dropped user message kept in the history digest
+DIGEST_LINE_CHARS = 120
+
+# Tool results shorter than this are never digested (digests themselves stay below it)
+DIGEST_MIN_CHARS = 1000
+
+# Characters of a digested tool result kept as a preview
+DIGEST_PREVIEW_CHARS = 300
+
+
+class ContextCompactor:
+    """
+    Shrinks an in-flight message list after the provider rejected it as too long.
+
+    Each call to ``compact()`` applies the next, more aggressive stage:
+
+    1. Elide tool results from earlier tool rounds of this turn.
+    2. Replace the prior conversation history with a short digest.
+    3. Truncate any remaining oversized message (head and tail kept).
+
+    Independently of overflows, ``digest_stale_tool_results()`` keeps the
+    prompt from growing with every tool round by replacing old results with
+    a digest and a handle for the ``recall_tool_result`` tool.
+
+    The list is modified in place so the caller's reference stays valid.
+    """
+
+    def __init__(self, messages: list[dict[str, Any]], turn_start: int):
+        """
+        Args:
+            messages: The message list sent to the LLM (system prompt first).
+            turn_start: Index of the current turn's user message.
+        """
+        self.messages = messages
+        self.turn_start = turn_start
+        self._stages = [
+            self._elide_old_tool_results,
+            self._summarize_history,
+            self._truncate_large_messages,
+        ]
+        self._next_stage = 0
+
+    def compact(self) -> bool:
+        """
+        Apply the next compaction stage that changes anything.
+
+        Returns:
+            True if the messages were shrunk, False once every stage is exhausted.
+        """
+        while self._next_stage < len(self._stages):
+            stage = self._stages[self._next_stage]
+            self._next_stage += 1
+            if stage():
+                logger.info(f"Context overflow: applied compaction stage '{stage.__name__.lstrip('_')}'")
+                return True
+        return False
+
+    def digest_stale_tool_results(self, keep_rounds: int, store: ToolResultStore) -> int:
+        """
+        Digest tool results from all but the newest ``keep_rounds`` tool rounds.
+
+        A round is one assistant message with tool calls plus its results.
+        Full results go to ``store``; the message keeps a preview and handle.
+
+        Returns:
+            Number of results digested by this call.
+        """
+        round_starts = [
+            i for i in range(self.turn_start, len(self.messages))
+            if self.messages[i]["role"] == "assistant" and self.messages[i].get("tool_calls")
+        ]
+        if len(round_starts) <= keep_rounds:
+            return 0
+
+        cutoff = round_starts[-keep_rounds] if keep_rounds > 0 else len(self.messages)
+        digested = 0
+        for msg in self.messages[self.turn_start:cutoff]:
+            content = msg.get("content")
+            if (
+                msg["role"] != "tool"
+                or not isinstance(content, str)
+                or len(content) < DIGEST_MIN_CHARS
+            ):
+                continue
+            handle = store.put(content)
+            msg["content"] = (
+                f"[Digest of {msg.get('name', 'tool')} result ({len(content)} chars); "
+                f"full text via recall_tool_result(handle=\"{handle}\")]\n"
+                f"{content[:DIGEST_PREVIEW_CHARS]}..."
+            )
+            digested += 1
+
+        if digested:
+            logger.debug(f"Digested {digested} stale tool result(s)")
+        return digested
+
+    def _elide_old_tool_results(self) -> bool:
+        """Replace tool results before the latest assistant message with a short preview."""
+        last_assistant = max(
+            (i for i in range(self.turn_start, len(self.messages)) if self.messages[i]["role"] == "assistant"),
+            default=None,
+        )
+        if last_assistant is None:
+            return False
+
+        changed = False
+        for msg in self.messages[self.turn_start:last_assistant]:
+            content = msg.get("content")
+            if msg["role"] != "tool" or not isinstance(content, str) or len(content) <= ELIDED_PREVIEW_CHARS:
+                continue
+            msg["content"] = (
+                f"{content[:ELIDED_PREVIEW_CHARS]}\n"
+                f"[... {len(content) - ELIDED_PREVIEW_CHARS} more characters elided to save context]"
+            )
+            changed = True
+        return changed
+
+    def _summarize_history(self) -> bool:
+        """Drop prior conversation history, leaving a digest of the user's earlier requests."""
+        history = self.messages[1:self.turn_start]
+        if not history:
+            return False
+
+        lines = []
+        for msg in history:
+            content = msg.get("content")
+            if msg["role"] == "user" and isinstance(content, str) and content.strip():
+                first_line = content.strip().splitlines()[0]
+                lines.append(f"- {first_line[:DIGEST_LINE_CHARS]}")
+
+        digest = (
+            f"# Earlier Conversation\n\n"
+            f"{len(history)} earlier messages were omitted to fit the context window."
+        )
+        if lines:
+            digest += " The user had asked:\n" + "\n".join(lines)
+
+        self._append_to_system(digest)
+        del self.messages[1:self.turn_start]
+        self.turn_start = 1
+        return True
+
+    def _truncate_large_messages(self) -> bool:
+        """Cut every oversized text message down to its head and tail."""
+        half = TRUNCATE_OVER_CHARS // 2
+        changed = False
+        for i in range(1, len(self.messages)):
+            content = self.messages[i].get("content")
+            if not isinstance(content, str) or len(content) <= TRUNCATE_OVER_CHARS:
+                continue
+            omitted = len(content) - 2 * half
+            # Replace rather than edit: history dicts are shared with the session's cached view
+            self.messages[i] = {
+                **self.messages[i],
+                "content": f"{content[:half]}\n[... {omitted} characters truncated ...]\n{content[-half:]}",
+            }
+            changed = True
+        return changed
+
+    def _append_to_system(self, text: str) -> None:
+        """Append a section to the system prompt, whichever content form it uses."""
+        system = self.messages[0]
+        if isinstance(system["content"], list):
+            system["content"] = [*system["content"], {"type": "text", "text": text}]
+        else:
+            system["content"] = f"{system['content']}\n\n---\n\n{text}"
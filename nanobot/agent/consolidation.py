@@ -0,0 +1,228 @@
+"""Consolidation of old daily notes into long-term memory."""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.agent.memory import MemoryStore, find_section, insert_into_section
+from nanobot.providers.base import LLMProvider
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.periodic import PeriodicService
+from nanobot.utils.tokens import count_tokens
+
+# Section of MEMORY.md that collects entries from consolidated daily notes
+CONSOLIDATED_SECTION = "From Daily Notes"
+
+CONSOLIDATE_PROMPT = """You maintain the long-term memory file (markdown) of an AI assistant.
+Merge the new notes into the current memory file. Keep its section headings.
+Keep durable facts, user preferences, decisions and open commitments; merge duplicates and drop chit-chat and details that no longer matter.
+The result must stay under {budget} tokens. Reply with the complete updated file only, no preamble."""
+
+_HEADING = re.compile(r"^#{1,6}\s")
+_ENTRY_PREFIX = re.compile(r"^(?:[-*+]|\d+\.)\s+(?:\[\d{4}-\d{2}-\d{2}\]\s*)?")
+
+
+def _normalize(line: str) -> str:
+    """Comparison key for an entry: no list marker or date tag, case and spacing folded."""
+    return " ".join(_ENTRY_PREFIX.sub("", line.strip()).lower().split()).rstrip(".!")
+
+
+@dataclass
+class ConsolidationReport:
+    """Outcome of one consolidation run."""
+    notes: list[str] = field(default_factory=list)  # Daily note files folded into MEMORY.md
+    added: int = 0  # New entries
+    dropped: int = 0  # Oldest consolidated entries removed to stay within the budget
+    summarized: bool = False  # Merged by the LLM rather than mechanically
+    tokens: int = 0  # Size of MEMORY.md afterwards
+
+
+class MemoryConsolidator:
+    """
+    Folds daily notes older than ``keep_days`` into long-term memory.
+
+    New, deduplicated lines from the notes are filed under the
+    "From Daily Notes" section of MEMORY.md (tagged with their date), and
+    the oldest of those entries are dropped once MEMORY.md exceeds
+    ``token_budget``. With a provider, an LLM rewrites MEMORY.md instead,
+    falling back to the mechanical merge if its answer is unusable.
+    Consolidated notes are moved to ``memory/archive/``: out of the
+    prompt, but still in the memory index, so entries later dropped from
+    MEMORY.md can still be retrieved.
+    """
+
+    def __init__(
+        self,
+        store: MemoryStore,
+        keep_days: int = 7,
+        token_budget: int = 1500,
+        provider: LLMProvider | None = None,
+        model: str | None = None,
+    ):
+        """
+        Args:
+            store: Memory store to consolidate.
+            keep_days: Daily notes from this many recent days are left alone.
+            token_budget: Maximum size of MEMORY.md in tokens.
+            provider: LLM provider for summarizing merges (None = mechanical merge only).
+            model: Model for summarizing (ideally a cheap one).
+        """
+        self.store = store
+        self.keep_days = max(1, keep_days)
+        self.token_budget = token_budget
+        self.provider = provider
+        self.model = model or (provider.get_default_model() if provider else None)
+
+    @property
+    def archive_dir(self) -> Path:
+        return self.store.memory_dir / "archive"
+
+    def due_notes(self, today: date | None = None) -> list[Path]:
+        """Daily notes old enough to consolidate, oldest first."""
+        cutoff = (today or date.today()) - timedelta(days=self.keep_days)
+        notes = []
+        for path in self.store.list_memory_files():
+            try:
+                day = date.fromisoformat(path.stem)
+            except ValueError:
+                continue
+            if day < cutoff:
+                notes.append(path)
+        return sorted(notes)
+
+    async def run(self, today: date | None = None) -> ConsolidationReport:
+        """Consolidate due daily notes and bring MEMORY.md within the budget."""
+        report = ConsolidationReport()
+        notes = self.due_notes(today)
+        current = self.store.read_long_term()
+        if not notes and count_tokens(current) <= self.token_budget:
+            report.tokens = count_tokens(current)
+            return report
+
+        entries = self._collect(notes, current)
+        merged = None
+        if self.provider is not None and (entries or count_tokens(current) > self.token_budget):
+            merged = await self._summarize(current, entries)
+            if merged is not None and self.store.read_long_term() != current:
+                logger.info("Long-term memory changed during consolidation; retrying next run")
+                return report
+        if merged is None:
+            merged, report.dropped = self._merge(current, entries)
+        else:
+            report.summarized = True
+
+        self.store.write_long_term(merged)
+        self.store.flush()  # Durable before the notes are moved away
+        ensure_dir(self.archive_dir)
+        for path in notes:
+            path.replace(self.archive_dir / path.name)
+
+        report.notes = [path.name for path in notes]
+        report.added = len(entries)
+        report.tokens = count_tokens(merged)
+        if notes or report.dropped:
+            logger.info(
+                f"Memory consolidation: {len(notes)} daily notes, {report.added} new entries, "
+                f"{report.dropped} dropped, MEMORY.md {report.tokens} tokens"
+            )
+        return report
+
+    @staticmethod
+    def _collect(notes: list[Path], current: str) -> list[str]:
+        """New entries from daily notes, one per line, minus anything already remembered."""
+        seen = {_normalize(line) for line in current.split("\n")}
+        entries = []
+        for path in notes:
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            for line in text.split("\n"):
+                if not line.strip() or _HEADING.match(line):
+                    continue
+                key = _normalize(line)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                entries.append(f"- [{path.stem}] {_ENTRY_PREFIX.sub('', line.strip())}")
+        return entries
+
+    def _merge(self, current: str, entries: list[str]) -> tuple[str, int]:
+        """
+        File entries under the consolidated section, then drop its oldest
+        entries while over budget.
+
+        Returns:
+            The new MEMORY.md text and the number of entries dropped.
+        """
+        text = current
+        if entries:
+            text = insert_into_section(text, "\n".join(entries), CONSOLIDATED_SECTION)
+
+        excess = count_tokens(text) - self.token_budget
+        lines = text.split("\n")
+        bounds = find_section(lines, CONSOLIDATED_SECTION)
+        if excess <= 0 or bounds is None:
+            return text, 0
+
+        dropped: set[int] = set()
+        for i in range(bounds[0] + 1, bounds[1]):
+            if not lines[i].strip():
+                continue
+            dropped.add(i)
+            excess -= count_tokens(lines[i]) + 1
+            if excess <= 0:  # Per-line counts are estimates: check the whole text
+                text = "\n".join(line for j, line in enumerate(lines) if j not in dropped)
+                excess = count_tokens(text) - self.token_budget
+                if excess <= 0:
+                    return text, len(dropped)
+
+        logger.warning(f"MEMORY.md stays over its {self.token_budget}-token budget after consolidation")
+        return "\n".join(line for j, line in enumerate(lines) if j not in dropped), len(dropped)
+
+    async def _summarize(self, current: str, entries: list[str]) -> str | None:
+        """Ask the LLM for a merged MEMORY.md, or None if it fails or exceeds the budget."""
+        content = f"## Current memory file\n{current or '(empty)'}\n\n## New notes\n" + "\n".join(entries)
+        response = await self.provider.chat(
+            messages=[
+                {"role": "system", "content": CONSOLIDATE_PROMPT.format(budget=self.token_budget)},
+                {"role": "user", "content": content},
+            ],
+            model=self.model,
+            max_tokens=self.token_budget * 2,
+            temperature=0.2,
+        )
+        if response.finish_reason in ("error", "context_length_exceeded") or not response.content:
+            logger.warning(f"Memory consolidation summary skipped: {response.content}")
+            return None
+
+        merged = response.content.strip()
+        fence = re.fullmatch(r"```(?:markdown|md)?\n(.*)\n```", merged, re.DOTALL)
+        if fence:
+            merged = fence.group(1).strip()
+        if count_tokens(merged) > self.token_budget:
+            logger.warning("Memory consolidation summary is over budget; merging without it")
+            return None
+        return merged + "\n"
+
+
+class MemoryConsolidationService(PeriodicService):
+    """Runs a MemoryConsolidator periodically (first shortly after startup)."""
+
+    name = "Memory consolidation"
+
+    def __init__(
+        self,
+        consolidator: MemoryConsolidator,
+        interval_s: int = 24 * 3600,
+        enabled: bool = True,
+        initial_delay_s: float = 60,
+    ):
+        super().__init__(interval_s, enabled, initial_delay_s)
+        self.consolidator = consolidator
+
+    async def tick(self) -> None:
+        await self.consolidator.run()
@@ -3,10 +3,14 @@
 import base64
 import mimetypes
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+from loguru import logger
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.utils.helpers import FileCache, file_signature
+from nanobot.utils.tokens import count_tokens, message_tokens, messages_tokens
 
 
 class ContextBuilder:
@@ -14,15 +18,46 @@ class ContextBuilder:
     Builds the context (system prompt + messages) for the agent.
     
     Assembles bootstrap files, memory, skills, and conversation history
-    into a coherent prompt for the LLM.
+    into a coherent prompt for the LLM. Prompt sections are cached and only
+    rebuilt when the files they come from change on disk.
+    
+    Memory is bounded by ``memory_budget`` tokens: long-term memory and
+    today's notes are included whole while they fit, and the rest of the
+    budget goes to snippets of other memory files relevant to the current
+    message. Once they no longer fit, only relevant snippets are included.
     """
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        memory_budget: int | None = 2000,
+        memory_vector_search: bool = False,
+    ):
+        """
+        Args:
+            workspace: Agent workspace directory.
+            memory_budget: Maximum tokens of memory per prompt; None includes
+                long-term memory and today's notes whole, without retrieval.
+            memory_vector_search: Rank memory snippets by embedding similarity
+                as well as keywords.
+        """
         self.workspace = workspace
-        self.memory = MemoryStore(workspace)
+        self.memory_budget = memory_budget
+        self.memory = MemoryStore(workspace, vector_search=memory_vector_search)
         self.skills = SkillsLoader(workspace)
+        self._sections: dict[str, tuple[Any, str]] = {}  # name -> (key, content)
+        self._files = FileCache()
+    
+    def _cached_section(self, name: str, key: Any, build: Callable[[], str]) -> str:
+        """Return a prompt section, rebuilding it only when its key changed."""
+        cached = self._sections.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+        content = build()
+        self._sections[name] = (key, content)
+        return content
     
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
         """
@@ -34,45 +69,68 @@ class ContextBuilder:
         Returns:
             Complete system prompt.
         """
+        return "\n\n---\n\n".join([self._build_stable_prompt(), self._get_runtime_context()])
+    
+    def _build_stable_prompt(self) -> str:
+        """
+        Build the part of the system prompt that rarely changes.
+        
+        Sections are ordered from most to least stable (identity, bootstrap
+        files, skills, memory) so provider-side prompt caches can reuse the
+        longest possible prefix; per-request details come after it.
+        """
         parts = []
         
         # Core identity
-        parts.append(self._get_identity())
+        parts.append(self._cached_section("identity", self.workspace, self._get_identity))
         
         # Bootstrap files
-        bootstrap = self._load_bootstrap_files()
+        bootstrap = self._cached_section(
+            "bootstrap",
+            file_signature(*(self.workspace / f for f in self.BOOTSTRAP_FILES)),
+            self._load_bootstrap_files,
+        )
         if bootstrap:
             parts.append(bootstrap)
         
+        # Skills
+        skills = self._cached_section("skills", self.skills.signature(), self._build_skills_section)
+        if skills:
+            parts.append(skills)
+        
         # Memory context
-        memory = self.memory.get_memory_context()
+        memory = self._get_memory_in_prompt()
         if memory:
             parts.append(f"# Memory\n\n{memory}")
         
-        # Skills - progressive loading
-        # 1. Always-loaded skills: include full content
-        always_skills = self.skills.get_always_skills()
-        if always_skills:
-            always_content = self.skills.load_skills_for_context(always_skills)
-            if always_content:
-                parts.append(f"# Active Skills\n\n{always_content}")
-        
-        # 2. Available skills: only show summary (agent uses read_file to load)
-        skills_summary = self.skills.build_skills_summary()
-        if skills_summary:
-            parts.append(f"""# Skills
-
-The following skills extend your capabilities. To use a skill, read its SKILL.md file using the read_file tool.
-Skills with available="false" need dependencies installed first - you can try installing them with apt/brew.
-
-{skills_summary}""")
-        
         return "\n\n---\n\n".join(parts)
     
+    def _get_memory_in_prompt(self) -> str:
+        """Long-term memory and today's notes, or "" if they exceed the memory budget."""
+        # Flush queued memory writes so the signature is current
+        self.memory.flush()
+        memory = self._cached_section(
+            "memory",
+            file_signature(self.memory.memory_file, self.memory.get_today_file()),
+            self.memory.get_memory_context,
+        )
+        if self.memory_budget is not None and count_tokens(memory) > self.memory_budget:
+            return ""
+        return memory
+    
+    def _build_relevant_memory(self, query: str) -> str:
+        """Memory snippets relevant to the current message, within the remaining budget."""
+        if self.memory_budget is None or not query:
+            return ""
+        in_prompt = self._get_memory_in_prompt()
+        exclude = {self.memory.memory_file.name, self.memory.get_today_file().name} if in_prompt else set()
+        snippets = self.memory.get_relevant_context(
+            query, self.memory_budget - count_tokens(in_prompt), exclude=exclude
+        )
+        return f"# Relevant Memories\n\n{snippets}" if snippets else ""
+    
     def _get_identity(self) -> str:
         """Get the core identity section."""
-        from datetime import datetime
-        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
         workspace_path = str(self.workspace.expanduser().resolve())
         
         return f"""# nanobot 🐈
@@ -81,12 +139,10 @@ You are nanobot, a helpful AI assistant. You have access to tools that allow you
 - Read, write, and edit files
 - Execute shell commands
 - Search the web and fetch web pages
+- Search and add to your memory
 - Send messages to users on chat channels
 - Spawn subagents for complex background tasks
 
-## Current Time
-{now}
-
 ## Workspace
 Your workspace is at: {workspace_path}
 - Memory files: {workspace_path}/memory/MEMORY.md
@@ -98,16 +154,46 @@ Only use the 'message' tool when you need to send a message to a specific chat c
 For normal conversation, just respond with text - do not call the message tool.
 
 Always be helpful, accurate, and concise. When using tools, explain what you're doing.
-When remembering something, write to {workspace_path}/memory/MEMORY.md"""
+When remembering something, use memory_append: target 'today' for events and progress, 'long_term' (with a section) for lasting facts about the user.
+To look something up in memory, use memory_search rather than reading memory files whole."""
+    
+    def _get_runtime_context(self) -> str:
+        """Get the volatile, per-request section (kept last so it never breaks the cached prefix)."""
+        from datetime import datetime
+        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
+        return f"## Current Time\n{now}"
+    
+    def _build_skills_section(self) -> str:
+        """Build the skills part of the system prompt (progressive loading)."""
+        parts = []
+        
+        # Skills - progressive loading
+        # 1. Always-loaded skills: include full content
+        always_skills = self.skills.get_always_skills()
+        if always_skills:
+            always_content = self.skills.load_skills_for_context(always_skills)
+            if always_content:
+                parts.append(f"# Active Skills\n\n{always_content}")
+        
+        # 2. Available skills: only show summary (agent uses read_file to load)
+        skills_summary = self.skills.build_skills_summary()
+        if skills_summary:
+            parts.append(f"""# Skills
+
+The following skills extend your capabilities. To use a skill, read its SKILL.md file using the read_file tool.
+Skills with available="false" need dependencies installed first - you can try installing them with apt/brew.
+
+{skills_summary}""")
+        
+        return "\n\n---\n\n".join(parts)
     
     def _load_bootstrap_files(self) -> str:
         """Load all bootstrap files from workspace."""
         parts = []
         
         for filename in self.BOOTSTRAP_FILES:
-            file_path = self.workspace / filename
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
+            content = self._files.read(self.workspace / filename)
+            if content is not None:
                 parts.append(f"## {filename}\n\n{content}")
         
         return "\n\n".join(parts) if parts else ""
@@ -118,6 +204,9 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         current_message: str,
         skill_names: list[str] | None = None,
         media: list[str] | None = None,
+        cache_control: bool = False,
+        token_budget: int | None = None,
+        summary: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -127,25 +216,68 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
             current_message: The new user message.
             skill_names: Optional skills to include.
             media: Optional list of local file paths for images/media.
+            cache_control: Mark the end of the stable system prompt as a
+                prompt-cache breakpoint (for providers that support it).
+            token_budget: Maximum prompt tokens for the assembled messages;
+                the oldest history is dropped to fit. None keeps it all.
+            summary: Running summary of the conversation before ``history``.
 
         Returns:
             List of messages including system prompt.
         """
         messages = []
 
-        # System prompt
-        system_prompt = self.build_system_prompt(skill_names)
-        messages.append({"role": "system", "content": system_prompt})
-
-        # History
-        messages.extend(history)
+        # System prompt: stable prefix first, volatile details last
+        stable = self._build_stable_prompt()
+        volatile = [self._get_runtime_context()]
+        relevant = self._build_relevant_memory(current_message)
+        if relevant:
+            volatile.insert(0, relevant)
+        if summary:
+            volatile.insert(0, f"# Conversation Summary\n\nEarlier in this conversation:\n\n{summary}")
+        if cache_control:
+            messages.append({"role": "system", "content": [
+                {"type": "text", "text": stable, "cache_control": {"type": "ephemeral"}},
+                *({"type": "text", "text": text} for text in volatile),
+            ]})
+        else:
+            messages.append({"role": "system", "content": "\n\n---\n\n".join([stable, *volatile])})
 
         # Current message (with optional image attachments)
-        user_content = self._build_user_content(current_message, media)
-        messages.append({"role": "user", "content": user_content})
+        user_message = {"role": "user", "content": self._build_user_content(current_message, media)}
+
+        # History, newest turns first, within whatever budget is left
+        if token_budget is not None:
+            remaining = token_budget - messages_tokens(messages) - message_tokens(user_message)
+            history = self._fit_history(history, remaining)
+        messages.extend(history)
+        messages.append(user_message)
 
         return messages
 
+    @staticmethod
+    def _fit_history(history: list[dict[str, Any]], budget: int) -> list[dict[str, Any]]:
+        """
+        Keep the newest messages whose combined tokens fit within ``budget``.
+
+        The kept slice always starts at a user message so the model never
+        sees a reply without the turn that prompted it.
+        """
+        start = len(history)
+        used = 0
+        for i in range(len(history) - 1, -1, -1):
+            used += message_tokens(history[i])
+            if used > budget:
+                break
+            start = i
+
+        while start < len(history) and history[start].get("role") != "user":
+            start += 1
+
+        if start:
+            logger.debug(f"History trimmed to fit context: dropped {start} of {len(history)} messages")
+        return history[start:]
+
     def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
         """Build user message content with optional base64-encoded images."""
         if not media:
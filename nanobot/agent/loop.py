@@ -2,23 +2,41 @@
 
 import asyncio
 import json
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.events import InboundMessage, OutboundDelta, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 from nanobot.agent.context import ContextBuilder
-from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.compaction import ContextCompactor
+from nanobot.agent.tools.registry import ToolBatch, ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
+from nanobot.agent.tools.recall import RecallToolResultTool, ToolResultStore
+from nanobot.agent.tools.history import SearchHistoryTool
+from nanobot.agent.tools.memory import MemoryAppendTool, MemorySearchTool
 from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.summarizer import SessionSummarizer
+from nanobot.session.archive import SessionArchive
 from nanobot.session.manager import SessionManager
+from nanobot.session.cache import SessionCache
+from nanobot.session.search import SessionSearchIndex
+from nanobot.session.store import SessionStore
+from nanobot.utils.tokens import context_window as model_context_window
+
+# Share of the context window kept free for tool calls and results added during a turn
+TOOL_LOOP_RESERVE = 0.2
+
+# Upper bound on stored messages considered before token-budget trimming
+HISTORY_SCAN_LIMIT = 500
 
 
 class AgentLoop:
@@ -40,8 +58,23 @@ class AgentLoop:
         workspace: Path,
         model: str | None = None,
         max_iterations: int = 20,
+        max_tokens: int = 8192,
+        temperature: float = 0.7,
+        context_window: int = 0,
+        max_concurrent_turns: int = 4,
+        stream: bool = True,
+        summary_model: str | None = None,
+        summary_trigger: int = 40,
+        tool_result_keep_rounds: int = 2,
+        memory_token_budget: int = 2000,
+        memory_vector_search: bool = False,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
+        session_store: SessionStore | None = None,
+        session_cache: SessionCache | None = None,
+        session_search: SessionSearchIndex | None = None,
+        session_archive: SessionArchive | None = None,
+        search_all_chats: bool = False,
     ):
         from nanobot.config.schema import ExecToolConfig
         self.bus = bus
@@ -49,12 +82,36 @@ class AgentLoop:
         self.workspace = workspace
         self.model = model or provider.get_default_model()
         self.max_iterations = max_iterations
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.context_window = context_window
+        self.tool_result_keep_rounds = tool_result_keep_rounds
+        self.max_concurrent_turns = max(1, max_concurrent_turns)
+        self.stream = stream
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.search_all_chats = search_all_chats
         
-        self.context = ContextBuilder(workspace)
-        self.sessions = SessionManager(workspace)
+        self.context = ContextBuilder(
+            workspace,
+            memory_budget=memory_token_budget or None,
+            memory_vector_search=memory_vector_search,
+        )
+        self.sessions = SessionManager(
+            workspace,
+            store=session_store,
+            cache=session_cache,
+            search=session_search,
+            archive=session_archive,
+        )
+        self.summarizer = SessionSummarizer(
+            provider=provider,
+            sessions=self.sessions,
+            model=summary_model or self.model,
+            trigger=summary_trigger,
+        )
         self.tools = ToolRegistry()
+        self.tool_results = ToolResultStore()
         self.subagents = SubagentManager(
             provider=provider,
             workspace=workspace,
@@ -65,6 +122,10 @@ class AgentLoop:
         )
         
         self._running = False
+        # Per-session FIFO of pending turns and the worker draining it
+        self._session_queues: dict[str, deque[InboundMessage]] = {}
+        self._session_workers: dict[str, asyncio.Task[None]] = {}
+        self._turn_slots = asyncio.Semaphore(self.max_concurrent_turns)
         self._register_default_tools()
     
     def _register_default_tools(self) -> None:
@@ -90,12 +151,30 @@ class AgentLoop:
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
         self.tools.register(message_tool)
         
+        # Memory tools
+        self.tools.register(MemorySearchTool(self.context.memory))
+        self.tools.register(MemoryAppendTool(self.context.memory))
+        
+        # Recall tool (full text of digested tool results)
+        if self.tool_result_keep_rounds > 0:
+            self.tools.register(RecallToolResultTool(self.tool_results))
+        
+        # History search tool (needs a session search index)
+        if self.sessions.search is not None:
+            self.tools.register(SearchHistoryTool(self.sessions.search, allow_all=self.search_all_chats))
+        
         # Spawn tool (for subagents)
         spawn_tool = SpawnTool(manager=self.subagents)
         self.tools.register(spawn_tool)
     
     async def run(self) -> None:
-        """Run the agent loop, processing messages from the bus."""
+        """
+        Run the agent loop, processing messages from the bus.
+        
+        Turns for different sessions run concurrently (at most
+        ``max_concurrent_turns`` at a time), while turns for the same
+        session are processed strictly in arrival order.
+        """
         self._running = True
         logger.info("Agent loop started")
         
@@ -106,34 +185,110 @@ class AgentLoop:
                     self.bus.consume_inbound(),
                     timeout=1.0
                 )
-                
-                # Process it
-                try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
             except asyncio.TimeoutError:
                 continue
+            
+            self._dispatch(msg)
+    
+    def _dispatch(self, msg: InboundMessage) -> None:
+        """Queue a message on its session's worker, starting one if idle."""
+        key = self._shard_key(msg)
+        queue = self._session_queues.get(key)
+        if queue is None:
+            queue = self._session_queues[key] = deque()
+            self._session_workers[key] = asyncio.create_task(
+                self._session_worker(key, queue)
+            )
+        queue.append(msg)
+    
+    @staticmethod
+    def _shard_key(msg: InboundMessage) -> str:
+        """Session key a message belongs to (system messages route to their origin)."""
+        if msg.channel == "system":
+            return msg.chat_id if ":" in msg.chat_id else f"cli:{msg.chat_id}"
+        return msg.session_key
+    
+    async def _session_worker(self, key: str, queue: deque[InboundMessage]) -> None:
+        """Drain one session's queue, one turn at a time."""
+        try:
+            while queue:
+                msg = queue.popleft()
+                async with self._turn_slots:
+                    await self._handle_turn(msg)
+        finally:
+            # No await between the empty check and here, so nothing can be
+            # queued on this worker after it decides to exit.
+            self._session_queues.pop(key, None)
+            self._session_workers.pop(key, None)
+    
+    async def _handle_turn(self, msg: InboundMessage) -> None:
+        """Process a message and publish the response (or an error reply)."""
+        on_delta = None
+        stream_id = uuid.uuid4().hex[:12]
+        if self.stream:
+            channel, chat_id = self._shard_key(msg).split(":", 1)
+            
+            async def on_delta(delta: str) -> None:
+                await self.bus.publish_outbound(OutboundDelta(
+                    channel=channel,
+                    chat_id=chat_id,
+                    stream_id=stream_id,
+                    delta=delta,
+                ))
+        
+        try:
+            with self.sessions.pinned(self._shard_key(msg)):
+                response = await self._process_message(msg, on_delta=on_delta)
+            if response:
+                if on_delta:
+                    response.metadata.setdefault("stream_id", stream_id)
+                await self.bus.publish_outbound(response)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            # Send error response (finalizing the streamed preview, if any)
+            error = OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=f"Sorry, I encountered an error: {str(e)}"
+            )
+            if on_delta:
+                error.channel, error.chat_id = channel, chat_id
+                error.metadata["stream_id"] = stream_id
+            await self.bus.publish_outbound(error)
+    
+    @property
+    def prompt_budget(self) -> int:
+        """
+        Prompt tokens available when a turn starts.
+        
+        The model's context window minus room for the reply (``max_tokens``)
+        and for tool calls and results that accumulate during the turn.
+        """
+        window = self.context_window or model_context_window(self.model)
+        budget = int(window * (1 - TOOL_LOOP_RESERVE)) - self.max_tokens
+        return max(budget, window // 4)
+    
+    @property
+    def active_sessions(self) -> int:
+        """Number of sessions with a turn queued or in progress."""
+        return len(self._session_workers)
     
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    async def _process_message(
+        self,
+        msg: InboundMessage,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
+            on_delta: Optional callback receiving reply text as it streams.
         
         Returns:
             The response message, or None if no response needed.
@@ -141,14 +296,14 @@ class AgentLoop:
         # Handle system messages (subagent announces)
         # The chat_id contains the original "channel:chat_id" to route back to
         if msg.channel == "system":
-            return await self._process_system_message(msg)
+            return await self._process_system_message(msg, on_delta=on_delta)
         
         logger.info(f"Processing message from {msg.channel}:{msg.sender_id}")
         
         # Get or create session
         session = self.sessions.get_or_create(msg.session_key)
         
-        # Update tool contexts
+        # Update tool contexts (scoped to this turn's task)
         message_tool = self.tools.get("message")
         if isinstance(message_tool, MessageTool):
             message_tool.set_context(msg.channel, msg.chat_id)
@@ -157,65 +312,34 @@ class AgentLoop:
         if isinstance(spawn_tool, SpawnTool):
             spawn_tool.set_context(msg.channel, msg.chat_id)
         
-        # Build initial messages (use get_history for LLM-formatted messages)
+        history_tool = self.tools.get("search_history")
+        if isinstance(history_tool, SearchHistoryTool):
+            history_tool.set_context(msg.channel, msg.chat_id)
+        
+        # Build initial messages (summary of older turns + recent history)
+        summary, upto = self.summarizer.get_summary(session)
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=session.get_history(max_messages=HISTORY_SCAN_LIMIT, start=upto),
+            summary=summary,
             current_message=msg.content,
             media=msg.media if msg.media else None,
+            cache_control=self.provider.supports_prompt_caching(self.model),
+            token_budget=self.prompt_budget,
         )
         
         # Agent loop
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Add assistant message with tool calls
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                # Execute tools
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        trajectory: list[dict[str, Any]] = []
+        final_content = await self._run_agent_loop(messages, on_delta=on_delta, trajectory=trajectory)
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
         
-        # Save to session
+        # Save to session (including the tool-call trajectory)
         session.add_message("user", msg.content)
+        self.sessions.add_transcript(session, trajectory)
         session.add_message("assistant", final_content)
         self.sessions.save(session)
+        self.summarizer.schedule(session.key)  # Runs in the background, after the reply
         
         return OutboundMessage(
             channel=msg.channel,
@@ -223,7 +347,150 @@ class AgentLoop:
             content=final_content
         )
     
-    async def _process_system_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    async def _run_agent_loop(
+        self,
+        messages: list[dict[str, Any]],
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+        trajectory: list[dict[str, Any]] | None = None,
+    ) -> str | None:
+        """
+        Run the LLM/tool loop until the model answers without tool calls.
+        
+        The LLM is always streamed so tool calls can start as soon as their
+        arguments are complete, overlapping tool latency with generation.
+        Requests rejected for exceeding the context window are compacted
+        and retried.
+        
+        Args:
+            messages: Initial message list (extended in place).
+            on_delta: Optional callback receiving content deltas as they arrive.
+            trajectory: Optional list receiving a copy of each assistant
+                tool-call message and tool result, as first produced.
+        
+        Returns:
+            The final assistant content, or None if the iteration limit was hit.
+        """
+        iteration = 0
+        compactor = ContextCompactor(messages, turn_start=len(messages) - 1)
+        
+        while iteration < self.max_iterations:
+            iteration += 1
+            
+            # Call LLM; tool calls completed mid-stream are already running
+            batch = ToolBatch(self.tools)
+            started: dict[str, asyncio.Task[str]] = {}
+            try:
+                response = await self._stream_llm(messages, on_delta, batch, started)
+            except BaseException:
+                batch.cancel()
+                raise
+            
+            if response.finish_reason == "context_length_exceeded":
+                # Shrink the request and retry; give up once nothing is left to compact
+                await batch.drain()
+                if compactor.compact():
+                    iteration -= 1
+                    continue
+                return response.content
+            
+            if not response.has_tool_calls:
+                # No tool calls, we're done
+                await batch.drain()
+                return response.content
+            
+            # Add assistant message with tool calls
+            tool_call_dicts = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": json.dumps(tc.arguments)  # Must be JSON string
+                    }
+                }
+                for tc in response.tool_calls
+            ]
+            messages = self.context.add_assistant_message(
+                messages, response.content, tool_call_dicts
+            )
+            if trajectory is not None:
+                trajectory.append(dict(messages[-1]))
+            
+            # Calls started mid-stream are reused while they match the final list
+            # in order; from the first one that was not, the rest are submitted
+            # in order, so none runs ahead of an earlier call's barrier
+            early = list(started.items())
+            tasks: list[asyncio.Task[str]] = []
+            reusing = True
+            for i, tc in enumerate(response.tool_calls):
+                reusing = reusing and i < len(early) and early[i][0] == tc.id
+                tasks.append(early[i][1] if reusing else self._submit_tool(batch, tc))
+            results = await asyncio.gather(*tasks)
+            await batch.drain()  # Drop any early call the final response no longer contains
+            
+            for tool_call, result in zip(response.tool_calls, results):
+                messages = self.context.add_tool_result(
+                    messages, tool_call.id, tool_call.name, result
+                )
+                if trajectory is not None:
+                    trajectory.append(dict(messages[-1]))
+            
+            # Older rounds' results shrink to digests the model can recall on demand
+            if self.tool_result_keep_rounds > 0:
+                compactor.digest_stale_tool_results(self.tool_result_keep_rounds, self.tool_results)
+        
+        return None
+    
+    def _submit_tool(self, batch: ToolBatch, tool_call: ToolCallRequest) -> asyncio.Task[str]:
+        """Schedule a tool call on the iteration's batch."""
+        args_str = json.dumps(tool_call.arguments)
+        logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
+        return batch.submit(tool_call.name, tool_call.arguments)
+    
+    async def _stream_llm(
+        self,
+        messages: list[dict[str, Any]],
+        on_delta: Callable[[str], Awaitable[None]] | None,
+        batch: ToolBatch,
+        started: dict[str, asyncio.Task[str]],
+    ) -> LLMResponse:
+        """
+        Stream one LLM call and return the full response.
+        
+        Content deltas go to ``on_delta``; tool calls that complete before
+        the stream ends are submitted to ``batch`` and recorded in ``started``.
+        """
+        response: LLMResponse | None = None
+        streamed = False
+        
+        async for chunk in self.provider.chat_stream(
+            messages=messages,
+            tools=self.tools.get_definitions(),
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        ):
+            if chunk.delta and on_delta:
+                streamed = True
+                await on_delta(chunk.delta)
+            if chunk.tool_call and chunk.tool_call.id not in started:
+                started[chunk.tool_call.id] = self._submit_tool(batch, chunk.tool_call)
+            if chunk.response:
+                response = chunk.response
+        
+        if response is None:
+            response = LLMResponse(content="Error calling LLM: stream ended unexpectedly", finish_reason="error")
+        
+        # Separate text streamed before tool calls from the text that follows them
+        if streamed and response.has_tool_calls:
+            await on_delta("\n\n")
+        return response
+    
+    async def _process_system_message(
+        self,
+        msg: InboundMessage,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+    ) -> OutboundMessage | None:
         """
         Process a system message (e.g., subagent announce).
         
@@ -246,7 +513,7 @@ class AgentLoop:
         session_key = f"{origin_channel}:{origin_chat_id}"
         session = self.sessions.get_or_create(session_key)
         
-        # Update tool contexts
+        # Update tool contexts (scoped to this turn's task)
         message_tool = self.tools.get("message")
         if isinstance(message_tool, MessageTool):
             message_tool.set_context(origin_channel, origin_chat_id)
@@ -255,59 +522,33 @@ class AgentLoop:
         if isinstance(spawn_tool, SpawnTool):
             spawn_tool.set_context(origin_channel, origin_chat_id)
         
+        history_tool = self.tools.get("search_history")
+        if isinstance(history_tool, SearchHistoryTool):
+            history_tool.set_context(origin_channel, origin_chat_id)
+        
         # Build messages with the announce content
+        summary, upto = self.summarizer.get_summary(session)
         messages = self.context.build_messages(
-            history=session.get_history(),
-            current_message=msg.content
+            history=session.get_history(max_messages=HISTORY_SCAN_LIMIT, start=upto),
+            summary=summary,
+            current_message=msg.content,
+            cache_control=self.provider.supports_prompt_caching(self.model),
+            token_budget=self.prompt_budget,
         )
         
         # Agent loop (limited for announce handling)
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            if response.has_tool_calls:
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                final_content = response.content
-                break
+        trajectory: list[dict[str, Any]] = []
+        final_content = await self._run_agent_loop(messages, on_delta=on_delta, trajectory=trajectory)
         
         if final_content is None:
             final_content = "Background task completed."
         
         # Save to session (mark as system message in history)
         session.add_message("user", f"[System: {msg.sender_id}] {msg.content}")
+        self.sessions.add_transcript(session, trajectory)
         session.add_message("assistant", final_content)
         self.sessions.save(session)
+        self.summarizer.schedule(session.key)  # Runs in the background, after the reply
         
         return OutboundMessage(
             channel=origin_channel,
@@ -315,13 +556,19 @@ class AgentLoop:
             content=final_content
         )
     
-    async def process_direct(self, content: str, session_key: str = "cli:direct") -> str:
+    async def process_direct(
+        self,
+        content: str,
+        session_key: str = "cli:direct",
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
         """
         Process a message directly (for CLI usage).
         
         Args:
             content: The message content.
             session_key: Session identifier.
+            on_delta: Optional callback receiving the reply as it streams.
         
         Returns:
             The agent's response.
@@ -333,5 +580,6 @@ class AgentLoop:
             content=content
         )
         
-        response = await self._process_message(msg)
+        with self.sessions.pinned(msg.session_key):
+            response = await self._process_message(msg, on_delta=on_delta)
         return response.content if response else ""
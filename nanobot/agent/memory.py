@@ -1,9 +1,79 @@
 """Memory system for persistent agent memory."""
 
+import re
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from nanobot.utils.helpers import ensure_dir, today_date
+from loguru import logger
+
+from nanobot.agent.memory_index import MemoryChunk, MemoryIndex
+from nanobot.utils.helpers import FileCache, ensure_dir, today_date
+from nanobot.utils.tokens import count_tokens
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+if TYPE_CHECKING:
+    from nanobot.agent.memory_vectors import Embedder, VectorIndex
+
+# Snippets considered for the relevant-memory section of a prompt
+RELEVANT_TOP_K = 8
+
+# Reciprocal rank fusion constant for combining keyword and vector rankings
+RRF_K = 60
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+_PLACEHOLDER = re.compile(r"^\(.*\)$")  # Template filler such as "(Things to remember)"
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+\.)\s")
+
+
+def find_section(lines: list[str], section: str) -> tuple[int, int] | None:
+    """
+    Locate a markdown section by heading (case-insensitive).
+    
+    Returns:
+        (heading line, end line) indices, the end being the next heading of
+        the same or a higher level (or len(lines)); None if not found.
+    """
+    for start, line in enumerate(lines):
+        match = _HEADING.match(line)
+        if match and match.group(2).lower() == section.strip().lower():
+            level = len(match.group(1))
+            end = start + 1
+            while end < len(lines):
+                next_match = _HEADING.match(lines[end])
+                if next_match and len(next_match.group(1)) <= level:
+                    break
+                end += 1
+            return start, end
+    return None
+
+
+def insert_into_section(text: str, content: str, section: str | None = None) -> str:
+    """
+    Add content at the end of a markdown section.
+    
+    A missing section is created at the end of the document; template
+    placeholder lines such as "(Things to remember)" in the section are
+    dropped. List items join the list above them.
+    """
+    content = content.strip()
+    lines = text.rstrip("\n").split("\n") if text.strip() else []
+    bounds = find_section(lines, section) if section else None
+    
+    if bounds is None:
+        if section:
+            lines += ["", f"## {section.strip()}"] if lines else [f"## {section.strip()}"]
+        lines += ["", content] if lines else [content]
+    else:
+        start, end = bounds
+        body = [line for line in lines[start + 1:end] if not _PLACEHOLDER.match(line.strip())]
+        while body and not body[-1].strip():
+            body.pop()
+        tail = [""] + lines[end:] if end < len(lines) else []
+        joined = body and _LIST_ITEM.match(body[-1]) and _LIST_ITEM.match(content)
+        lines = lines[:start + 1] + body + ([content] if joined else ["", content]) + tail
+    
+    return "\n".join(lines) + "\n"
 
 
 class MemoryStore:
@@ -11,12 +81,49 @@ class MemoryStore:
     Memory system for the agent.
     
     Supports daily notes (memory/YYYY-MM-DD.md) and long-term memory (MEMORY.md).
+    Writes go through a background writer; reads first wait for the pending
+    writes to memory files (only those, see ``flush``). All memory
+    files are searchable through a MemoryIndex (BM25), optionally combined
+    with a dense VectorIndex (needs numpy).
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        writer: BackgroundWriter | None = None,
+        vector_search: bool = False,
+        embedder: "Embedder | None" = None,
+    ):
+        """
+        Args:
+            workspace: Agent workspace directory.
+            writer: Background writer for memory files (default: shared).
+            vector_search: Also rank memory by embedding similarity.
+            embedder: Embedder for vector search (default: offline HashingEmbedder).
+        """
         self.workspace = workspace
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
+        self.writer = writer or get_writer()
+        self._files = FileCache()
+        self._started_day: Path | None = None  # Daily note known to exist (header written)
+        self.index = MemoryIndex(self.memory_dir)
+        self.vectors: "VectorIndex | None" = None
+        if vector_search or embedder is not None:
+            self.vectors = self._make_vector_index(embedder)
+    
+    def _make_vector_index(self, embedder: "Embedder | None") -> "VectorIndex | None":
+        """Create the vector index, or None if numpy is not installed."""
+        try:
+            from nanobot.agent.memory_vectors import HashingEmbedder, VectorIndex
+        except ImportError as e:
+            logger.warning(f"Vector memory search unavailable (pip install nanobot-ai[vector]): {e}")
+            return None
+        return VectorIndex(self.memory_dir / ".index", embedder or HashingEmbedder(), self.writer)
+    
+    def flush(self) -> None:
+        """Wait until queued writes to memory files are on disk."""
+        self.writer.flush(paths=[self.memory_dir])
     
     def get_today_file(self) -> Path:
         """Get path to today's memory file."""
@@ -24,34 +131,57 @@ class MemoryStore:
     
     def read_today(self) -> str:
         """Read today's memory notes."""
-        today_file = self.get_today_file()
-        if today_file.exists():
-            return today_file.read_text(encoding="utf-8")
-        return ""
+        self.flush()
+        return self._files.read(self.get_today_file()) or ""
     
     def append_today(self, content: str) -> None:
-        """Append content to today's memory notes."""
-        today_file = self.get_today_file()
+        """
+        Append content to today's memory notes.
         
-        if today_file.exists():
-            existing = today_file.read_text(encoding="utf-8")
-            content = existing + "\n" + content
-        else:
-            # Add header for new day
-            header = f"# {today_date()}\n\n"
-            content = header + content
+        Only the new text is written, in append mode. Whether the day's
+        header is needed is checked once per day, so later appends neither
+        flush the writer nor touch the file system.
+        """
+        today_file = self.get_today_file()
+        if today_file != self._started_day:
+            self.flush()  # So a just-queued first note is seen and gets no second header
+            if not today_file.exists():
+                self.writer.append(today_file, f"# {today_date()}\n")  # Header for a new day
+            self._started_day = today_file
         
-        today_file.write_text(content, encoding="utf-8")
+        self.writer.append(today_file, "\n" + content)
     
     def read_long_term(self) -> str:
         """Read long-term memory (MEMORY.md)."""
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
-        return ""
+        self.flush()
+        return self._files.read(self.memory_file) or ""
     
     def write_long_term(self, content: str) -> None:
         """Write to long-term memory (MEMORY.md)."""
-        self.memory_file.write_text(content, encoding="utf-8")
+        self.writer.write(self.memory_file, content)
+    
+    def append_long_term(self, content: str, section: str | None = None) -> bool:
+        """
+        Add an entry to long-term memory, at the end of a section.
+        
+        The section is created if missing (see ``insert_into_section``).
+        The file is replaced atomically.
+        
+        Args:
+            content: Text to add.
+            section: Heading to file the entry under; None appends to the end.
+        
+        Returns:
+            False if the entry was already in long-term memory.
+        """
+        content = content.strip()
+        text = self.read_long_term()
+        existing = {line.strip() for line in text.split("\n")} | {p.strip() for p in text.split("\n\n")}
+        if content in existing:
+            return False
+        
+        self.write_long_term(insert_into_section(text, content, section))
+        return True
     
     def get_recent_memories(self, days: int = 7) -> str:
         """
@@ -67,6 +197,7 @@ class MemoryStore:
         
         memories = []
         today = datetime.now().date()
+        self.flush()
         
         for i in range(days):
             date = today - timedelta(days=i)
@@ -107,3 +238,67 @@ class MemoryStore:
             parts.append("## Today's Notes\n" + today)
         
         return "\n\n".join(parts) if parts else ""
+    
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> list[tuple[float, MemoryChunk]]:
+        """
+        Find the memory snippets most relevant to a query.
+        
+        Args:
+            query: Free text to match.
+            k: Maximum number of snippets.
+            exclude: Memory file names to leave out (e.g. ones already in the prompt).
+        
+        Returns:
+            (score, chunk) pairs, best first. With vector search the score is
+            a reciprocal-rank-fusion score of both rankings.
+        """
+        self.flush()
+        changed = self.index.refresh()
+        if self.vectors is None:
+            return self.index.search(query, k=k, exclude=exclude)
+        
+        for name in changed:  # Only files that changed are re-hashed and embedded
+            self.vectors.update(name, self.index.file_chunks(name))
+        fused: dict[int, list] = {}  # id(chunk) -> [score, chunk]
+        for ranking in (
+            self.index.search(query, k=2 * k, exclude=exclude),
+            self.vectors.search(query, k=2 * k, exclude=exclude),
+        ):
+            for rank, (_, chunk) in enumerate(ranking):
+                entry = fused.setdefault(id(chunk), [0.0, chunk])
+                entry[0] += 1 / (RRF_K + rank + 1)
+        ranked = sorted(fused.values(), key=lambda e: e[0], reverse=True)[:k]
+        return [(score, chunk) for score, chunk in ranked]
+    
+    def get_relevant_context(
+        self,
+        query: str,
+        token_budget: int,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> str:
+        """
+        Get the memory snippets relevant to a query, within a token budget.
+        
+        Returns:
+            Formatted snippets, or an empty string if nothing matched or fit.
+        """
+        if token_budget <= 0:
+            return ""
+        
+        blocks = []
+        used = 0
+        for _, chunk in self.search(query, k=RELEVANT_TOP_K, exclude=exclude):
+            title = f"{chunk.source} › {chunk.heading}" if chunk.heading else chunk.source
+            block = f"[{title}]\n{chunk.text}"
+            tokens = count_tokens(block)
+            if used + tokens > token_budget:
+                continue  # A shorter, lower-ranked snippet may still fit
+            blocks.append(block)
+            used += tokens
+        
+        return "\n\n".join(blocks)
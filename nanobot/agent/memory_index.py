@@ -0,0 +1,205 @@
+"""Keyword retrieval index over memory files."""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from nanobot.utils.helpers import file_signature
+
+# Maximum characters per chunk (paragraphs are grouped up to this size)
+CHUNK_MAX_CHARS = 800
+
+# Words too common to help ranking
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or that the this "
+    "to was were will with you your we our they their he she his her not no do does did".split()
+)
+
+_HEADING = re.compile(r"^#{1,6}\s+(.*)")
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase index terms."""
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+@dataclass
+class MemoryChunk:
+    """A retrievable piece of a memory file."""
+    source: str  # Path within memory/ (e.g. "MEMORY.md", "2026-02-01.md", "archive/2026-01-02.md")
+    heading: str  # Nearest markdown heading above the chunk ("" if none)
+    text: str
+
+
+def chunk_markdown(source: str, text: str, max_chars: int = CHUNK_MAX_CHARS) -> list[MemoryChunk]:
+    """Split a markdown file into chunks of whole paragraphs under their heading."""
+    chunks: list[MemoryChunk] = []
+    heading = ""
+    current: list[str] = []
+
+    def emit() -> None:
+        body = "\n\n".join(current).strip()
+        if body:
+            chunks.append(MemoryChunk(source, heading, body))
+        current.clear()
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        match = _HEADING.match(block)
+        if match:
+            emit()
+            heading = match.group(1).strip()
+            block = block[match.end():].strip()  # Text directly under the heading line
+            if not block:
+                continue
+        if current and sum(len(p) for p in current) + len(block) > max_chars:
+            emit()
+        # Oversized paragraphs are split on line boundaries
+        while len(block) > max_chars:
+            cut = block.rfind("\n", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            current.append(block[:cut])
+            emit()
+            block = block[cut:].strip()
+        current.append(block)
+    emit()
+    return chunks
+
+
+class MemoryIndex:
+    """
+    BM25 index over the chunks of ``memory/**/*.md``.
+
+    Files in subdirectories (such as consolidated notes in ``archive/``) are
+    named by their relative path, e.g. "archive/2026-02-01.md"; hidden
+    directories are skipped.
+
+    ``refresh`` re-chunks only files whose mtime/size changed (and drops
+    removed ones), so keeping the index current costs one ``stat`` per file.
+    """
+
+    def __init__(self, memory_dir: Path, k1: float = 1.5, b: float = 0.75):
+        self.memory_dir = memory_dir
+        self.k1 = k1
+        self.b = b
+        self._files: dict[str, tuple[tuple, list[int]]] = {}  # name -> (signature, chunk ids)
+        self._chunks: dict[int, MemoryChunk] = {}
+        self._lengths: dict[int, int] = {}
+        self._postings: dict[str, dict[int, int]] = {}  # term -> {chunk id: term frequency}
+        self._total_length = 0
+        self._next_id = 0
+
+    def refresh(self) -> set[str]:
+        """
+        Bring the index up to date with the memory directory.
+
+        Returns:
+            Names of the files added, changed or removed (empty if none).
+        """
+        paths = {}
+        if self.memory_dir.exists():
+            for path in self.memory_dir.rglob("*.md"):
+                name = path.relative_to(self.memory_dir).as_posix()
+                if not any(part.startswith(".") for part in name.split("/")):
+                    paths[name] = path
+        changed: set[str] = set()
+
+        for name in list(self._files):
+            if name not in paths:
+                self._remove_file(name)
+                changed.add(name)
+
+        for name, path in paths.items():
+            sig = file_signature(path)
+            indexed = self._files.get(name)
+            if indexed and indexed[0] == sig:
+                continue
+            if indexed:
+                self._remove_file(name)
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            self._files[name] = (sig, [self._add(chunk) for chunk in chunk_markdown(name, text)])
+            changed.add(name)
+
+        return changed
+
+    def _add(self, chunk: MemoryChunk) -> int:
+        chunk_id = self._next_id
+        self._next_id += 1
+        terms = Counter(tokenize(f"{chunk.heading}\n{chunk.text}"))
+        self._chunks[chunk_id] = chunk
+        self._lengths[chunk_id] = sum(terms.values())
+        self._total_length += self._lengths[chunk_id]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[chunk_id] = tf
+        return chunk_id
+
+    def _remove_file(self, name: str) -> None:
+        _, chunk_ids = self._files.pop(name)
+        for chunk_id in chunk_ids:
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= self._lengths.pop(chunk_id)
+            for term in set(tokenize(f"{chunk.heading}\n{chunk.text}")):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> list[tuple[float, MemoryChunk]]:
+        """
+        Rank chunks against a query.
+
+        Args:
+            query: Free text (e.g. the user's message).
+            k: Maximum number of results.
+            exclude: Source file names to leave out.
+
+        Returns:
+            (score, chunk) pairs, best first.
+        """
+        n = len(self._chunks)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores: dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for chunk_id, score in ranked:
+            chunk = self._chunks[chunk_id]
+            if chunk.source in exclude:
+                continue
+            results.append((score, chunk))
+            if len(results) >= k:
+                break
+        return results
+
+    def file_chunks(self, name: str) -> list[MemoryChunk]:
+        """A file's chunks in order (empty if it is not indexed)."""
+        _, chunk_ids = self._files.get(name, ((), []))
+        return [self._chunks[chunk_id] for chunk_id in chunk_ids]
+
+    def __len__(self) -> int:
+        return len(self._chunks)
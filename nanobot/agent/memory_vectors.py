@@ -0,0 +1,254 @@
+"""Dense vector retrieval over memory chunks (requires numpy: pip install nanobot-ai[vector])."""
+
+import hashlib
+import re
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+from nanobot.agent.memory_index import MemoryChunk
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.writer import BackgroundWriter
+
+_WORD = re.compile(r"\w+")
+
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized float32 vectors."""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Identifier stored with the index; changing it forces re-embedding."""
+        pass
+
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        """Vector dimension."""
+        pass
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of texts into a ``(len(texts), dim)`` float32 matrix."""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder using signed feature hashing.
+
+    Words and character trigrams (within words, so typos and inflections
+    still overlap) are hashed into ``dim`` buckets. No model download, and
+    embedding is deterministic across processes.
+    """
+
+    def __init__(self, dim: int = 256):
+        self._dim = dim
+
+    @property
+    def name(self) -> str:
+        return f"hashing-v1-{self._dim}"
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def _features(self, text: str) -> list[str]:
+        features = []
+        for word in _WORD.findall(text.lower()):
+            features.append(word)
+            padded = f"<{word}>"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self._dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self._features(text)), dtype=np.uint32
+            )
+            if not len(hashes):
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self._dim, signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+def chunk_key(chunk: MemoryChunk) -> str:
+    """Content hash identifying a chunk's embedding."""
+    return hashlib.sha1(f"{chunk.source}\0{chunk.heading}\0{chunk.text}".encode("utf-8")).hexdigest()
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index of memory chunk embeddings.
+
+    Embeddings live in one float32 matrix whose rows are grouped by memory
+    file. ``update`` replaces a single file's rows in place (freed rows are
+    reused), hashing and embedding only that file's new or changed chunks.
+    New embeddings are appended to ``vectors.f32`` with their content hashes
+    in ``vectors.keys``; on startup the file is memory-mapped so nothing is
+    re-embedded, and it is rewritten only once it is mostly stale rows.
+    Search is a single matrix-vector product plus a partial sort.
+    """
+
+    # Stored rows tolerated (beyond twice the live ones) before the files are rewritten
+    COMPACT_MIN_ROWS = 1024
+
+    def __init__(self, index_dir: Path, embedder: Embedder, writer: BackgroundWriter):
+        self.index_dir = ensure_dir(index_dir)
+        self.embedder = embedder
+        self.writer = writer
+        self._matrix = np.zeros((0, embedder.dim), dtype=np.float32)
+        self._size = 0  # Rows in use or freed; the rest of _matrix is spare capacity
+        self._free: list[int] = []
+        self._keys: list[str] = []  # Per row: content hash ("" if free)
+        self._chunks: list[MemoryChunk | None] = []  # Per row (None if free)
+        self._sources = np.zeros(0, dtype=np.int32)  # Per row: index into _source_names (-1 if free)
+        self._source_names: list[str] = []
+        self._source_ids: dict[str, int] = {}
+        self._files: dict[str, list[int]] = {}  # File name -> rows, in chunk order
+        self._disk: np.ndarray | None = None  # Memory-mapped stored embeddings
+        self._stored: dict[str, int] = {}  # Stored embeddings: key -> row in _disk
+        self._stored_rows = 0  # Rows in vectors.f32
+        self._torn = False  # Stored files out of step: rewrite them on the next save
+        self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.index_dir / "vectors.f32"
+
+    @property
+    def _keys_path(self) -> Path:
+        return self.index_dir / "vectors.keys"
+
+    def _load(self) -> None:
+        """Memory-map stored embeddings made by the same embedder."""
+        self.writer.flush(paths=[self.index_dir])
+        try:
+            header, *keys = self._keys_path.read_text(encoding="utf-8").splitlines()
+            if header != self.embedder.name:
+                return
+            # A torn append leaves keys and vectors out of step: use the rows both have
+            rows = min(len(keys), self._vectors_path.stat().st_size // (4 * self.embedder.dim))
+            if rows:
+                self._disk = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim)
+                )
+        except (OSError, ValueError):
+            return
+        self._stored = {key: row for row, key in enumerate(keys[:rows])}
+        self._stored_rows = rows
+        self._torn = len(keys) != rows or self._vectors_path.stat().st_size != rows * 4 * self.embedder.dim
+
+    def update(self, source: str, chunks: list[MemoryChunk]) -> None:
+        """Replace one memory file's chunks (an empty list removes the file)."""
+        old_rows = self._files.pop(source, [])
+        reusable = {self._keys[row]: row for row in old_rows}
+        rows: list[int] = []
+        missing: list[tuple[int, MemoryChunk, str]] = []  # (row, chunk, key) still to embed
+
+        for chunk in chunks:
+            key = chunk_key(chunk)
+            row = reusable.pop(key, None)
+            if row is None:
+                row = self._allocate()
+                if key in self._stored:
+                    self._matrix[row] = self._disk[self._stored[key]]
+                else:
+                    missing.append((row, chunk, key))
+            self._keys[row] = key
+            self._chunks[row] = chunk  # The keyword index's object, so rankings can be fused by identity
+            self._sources[row] = self._source_id(source)
+            rows.append(row)
+
+        for row in reusable.values():
+            self._release(row)
+        if rows:
+            self._files[source] = rows
+        if missing:
+            vectors = self.embedder.embed([self._text(chunk) for _, chunk, _ in missing])
+            for (row, _, _), vector in zip(missing, vectors):
+                self._matrix[row] = vector
+            self._persist(vectors, [key for _, _, key in missing])
+
+    def _source_id(self, source: str) -> int:
+        if source not in self._source_ids:
+            self._source_ids[source] = len(self._source_names)
+            self._source_names.append(source)
+        return self._source_ids[source]
+
+    def _allocate(self) -> int:
+        """Take a free row, growing the matrix (by doubling) if there is none."""
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self._matrix):
+            capacity = max(64, 2 * len(self._matrix))
+            matrix = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            sources = np.full(capacity, -1, dtype=np.int32)
+            sources[:self._size] = self._sources[:self._size]
+            self._matrix, self._sources = matrix, sources
+        self._keys.append("")
+        self._chunks.append(None)
+        self._size += 1
+        return self._size - 1
+
+    def _release(self, row: int) -> None:
+        self._keys[row] = ""
+        self._chunks[row] = None
+        self._sources[row] = -1
+        self._matrix[row] = 0
+        self._free.append(row)
+
+    @staticmethod
+    def _text(chunk: MemoryChunk) -> str:
+        return f"{chunk.heading}\n{chunk.text}" if chunk.heading else chunk.text
+
+    def _persist(self, vectors: np.ndarray, keys: list[str]) -> None:
+        """Append new embeddings to the stored ones (in the background), compacting if mostly stale."""
+        if self._torn or self._stored_rows + len(keys) > max(self.COMPACT_MIN_ROWS, 2 * len(self)):
+            live = [row for row in range(self._size) if self._chunks[row] is not None]
+            self.writer.write_bytes(self._vectors_path, self._matrix[live].tobytes())
+            self.writer.write(self._keys_path, "\n".join([self.embedder.name, *(self._keys[r] for r in live)]) + "\n")
+            self._stored_rows = len(live)
+            self._disk, self._stored = None, {}  # Every live embedding is in memory anyway
+            self._torn = False
+            return
+        if not self._stored_rows:
+            self.writer.write_bytes(self._vectors_path, b"")
+            self.writer.write(self._keys_path, self.embedder.name + "\n")
+        self.writer.append_bytes(self._vectors_path, np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self.writer.append(self._keys_path, "".join(f"{key}\n" for key in keys))
+        self._stored_rows += len(keys)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> list[tuple[float, MemoryChunk]]:
+        """
+        Rank chunks by cosine similarity to a query.
+
+        Returns:
+            (similarity, chunk) pairs, best first.
+        """
+        if not len(self) or k <= 0:
+            return []
+        scores = self._matrix[:self._size] @ self.embedder.embed([query])[0]
+        sources = self._sources[:self._size]
+        excluded = [i for i, name in enumerate(self._source_names) if name in exclude]
+        scores = np.where(np.isin(sources, [-1, *excluded]), -np.inf, scores)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self._chunks[i]) for i in top if scores[i] > 0]
+
+    def __len__(self) -> int:
+        return self._size - len(self._free)
@@ -6,6 +6,8 @@ import re
 import shutil
 from pathlib import Path
 
+from nanobot.utils.helpers import FileCache, file_signature
+
 # Default builtin skills directory (relative to this file)
 BUILTIN_SKILLS_DIR = Path(__file__).parent.parent / "skills"
 
@@ -22,6 +24,22 @@ class SkillsLoader:
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
+        self._files = FileCache()  # SKILL.md contents, re-read only when changed
+    
+    def signature(self) -> tuple:
+        """
+        Change-detection key for everything the skills prompt depends on.
+        
+        Covers the skill directories (entries added/removed), every SKILL.md
+        and the environment used for requirement checks.
+        """
+        paths = []
+        for root in (self.workspace_skills, self.builtin_skills):
+            if root and root.exists():
+                paths.append(root)
+                paths.extend(sorted(d / "SKILL.md" for d in root.iterdir() if d.is_dir()))
+        env = frozenset(k for k, v in os.environ.items() if v)
+        return file_signature(*paths), os.environ.get("PATH"), env
     
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         """
@@ -67,15 +85,13 @@ class SkillsLoader:
             Skill content or None if not found.
         """
         # Check workspace first
-        workspace_skill = self.workspace_skills / name / "SKILL.md"
-        if workspace_skill.exists():
-            return workspace_skill.read_text(encoding="utf-8")
+        content = self._files.read(self.workspace_skills / name / "SKILL.md")
+        if content is not None:
+            return content
         
         # Check built-in
         if self.builtin_skills:
-            builtin_skill = self.builtin_skills / name / "SKILL.md"
-            if builtin_skill.exists():
-                return builtin_skill.read_text(encoding="utf-8")
+            return self._files.read(self.builtin_skills / name / "SKILL.md")
         
         return None
     
@@ -0,0 +1,133 @@
+"""Rolling summarization of long conversation sessions."""
+
+import asyncio
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider
+from nanobot.session.manager import Session, SessionManager
+
+SUMMARY_PROMPT = """You maintain the running summary of a conversation between a user and an AI assistant.
+Merge the previous summary and the new messages into one updated summary.
+Keep facts, decisions, user preferences, open tasks and anything the assistant promised to do.
+Drop greetings, filler and details that no longer matter. Write concise bullet points, no preamble."""
+
+# Characters of each message included in the summarization transcript
+TRANSCRIPT_MESSAGE_CHARS = 2000
+
+
+class SessionSummarizer:
+    """
+    Folds older turns of a session into a persisted running summary.
+
+    The summary lives in ``session.metadata["summary"]`` and covers messages
+    before ``session.metadata["summarized_upto"]``; only messages after that
+    index are sent to the LLM verbatim. Summaries are produced in background
+    tasks so they never delay a reply.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        sessions: SessionManager,
+        model: str | None = None,
+        trigger: int = 40,
+    ):
+        """
+        Args:
+            provider: LLM provider used for summarization.
+            sessions: Session manager to load and save sessions.
+            model: Model for summaries (ideally a cheaper one than the agent's).
+            trigger: Number of unsummarized messages that starts a summary;
+                the newest half of them are kept verbatim.
+        """
+        self.provider = provider
+        self.sessions = sessions
+        self.model = model or provider.get_default_model()
+        self.trigger = max(2, trigger)
+        self._running_tasks: dict[str, asyncio.Task[None]] = {}
+
+    @staticmethod
+    def get_summary(session: Session) -> tuple[str | None, int]:
+        """Return the session's running summary and the index of the first unsummarized message."""
+        upto = session.metadata.get("summarized_upto", 0)
+        if upto > session.message_count:  # Session was cleared after summarizing
+            return None, 0
+        return session.metadata.get("summary"), upto
+
+    def needs_summary(self, session: Session) -> bool:
+        """Check whether enough unsummarized messages have piled up."""
+        _, upto = self.get_summary(session)
+        return session.message_count - upto >= self.trigger
+
+    def schedule(self, session_key: str) -> None:
+        """Start a background summary for a session if one is due and none is running."""
+        if session_key in self._running_tasks:
+            return
+        if not self.needs_summary(self.sessions.get_or_create(session_key)):
+            return
+
+        bg_task = asyncio.create_task(self._run(session_key))
+        self._running_tasks[session_key] = bg_task
+        bg_task.add_done_callback(lambda _: self._running_tasks.pop(session_key, None))
+
+    async def _run(self, session_key: str) -> None:
+        """Summarize a session and persist the result."""
+        try:
+            await self.summarize(session_key)
+        except Exception as e:
+            logger.error(f"Summarizing session {session_key} failed: {e}")
+
+    async def summarize(self, session_key: str) -> bool:
+        """
+        Fold the session's older unsummarized messages into its summary.
+
+        Returns:
+            True if the summary was updated.
+        """
+        session = self.sessions.get_or_create(session_key)
+        previous, upto = self.get_summary(session)
+        pending = session.get_messages(upto)
+        end = len(pending) - self.trigger // 2
+        # Never split a turn: the verbatim part starts at a user message
+        while end > 0 and pending[end].role != "user":
+            end -= 1
+        if end <= 0:
+            return False
+
+        transcript = "\n\n".join(
+            f"{m.role}: {str(m.content or '')[:TRANSCRIPT_MESSAGE_CHARS]}"
+            for m in pending[:end]
+            if m.is_conversation
+        )
+        end += upto
+        response = await self.provider.chat(
+            messages=self._build_messages(previous, transcript),
+            model=self.model,
+            max_tokens=1024,
+            temperature=0.2,
+        )
+        if response.finish_reason in ("error", "context_length_exceeded") or not response.content:
+            logger.warning(f"Session summary for {session_key} skipped: {response.content}")
+            return False
+
+        # Re-fetch: the session may have been cleared or reloaded while the LLM was running
+        session = self.sessions.get_or_create(session_key)
+        if self.get_summary(session)[1] != upto or session.message_count < end:
+            return False
+
+        session.metadata["summary"] = response.content.strip()
+        session.metadata["summarized_upto"] = end
+        self.sessions.save(session)
+        logger.debug(f"Session {session_key}: summarized messages {upto}-{end}")
+        return True
+
+    @staticmethod
+    def _build_messages(previous: str | None, transcript: str) -> list[dict[str, Any]]:
+        """Build the summarization request."""
+        content = f"## Previous summary\n{previous or '(none)'}\n\n## New messages\n{transcript}"
+        return [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": content},
+        ]
@@ -1,6 +1,6 @@
 """Agent tools module."""
 
 from nanobot.agent.tools.base import Tool
-from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.registry import ToolBatch, ToolRegistry
 
-__all__ = ["Tool", "ToolRegistry"]
+__all__ = ["Tool", "ToolBatch", "ToolRegistry"]
@@ -39,6 +39,16 @@ class Tool(ABC):
         """JSON Schema for tool parameters."""
         pass
     
+    @property
+    def read_only(self) -> bool:
+        """
+        Whether the tool is free of side effects.
+        
+        Read-only tools may run concurrently with each other; all other
+        tools are serialized in call order.
+        """
+        return False
+    
     @abstractmethod
     async def execute(self, **kwargs: Any) -> str:
         """
@@ -17,6 +17,10 @@ class ReadFileTool(Tool):
     def description(self) -> str:
         return "Read the contents of a file at the given path."
     
+    @property
+    def read_only(self) -> bool:
+        return True
+    
     @property
     def parameters(self) -> dict[str, Any]:
         return {
@@ -155,6 +159,10 @@ class ListDirTool(Tool):
     def description(self) -> str:
         return "List the contents of a directory."
     
+    @property
+    def read_only(self) -> bool:
+        return True
+    
     @property
     def parameters(self) -> dict[str, Any]:
         return {
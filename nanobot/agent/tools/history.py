@@ -0,0 +1,107 @@
+"""Search history tool: full-text search over past conversations."""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.session.search import SessionSearchIndex
+
+
+class SearchHistoryTool(Tool):
+    """
+    Tool to search past conversation messages.
+
+    Searches only the current chat unless ``allow_all`` is set, which lets
+    the agent search every chat (so any user could surface another chat's
+    messages). The current chat is held in a context variable so concurrent
+    turns never see each other's.
+    """
+
+    def __init__(self, index: SessionSearchIndex, max_results: int = 10, allow_all: bool = False):
+        self.index = index
+        self.max_results = max_results
+        self.allow_all = allow_all
+        self._session_key: ContextVar[str] = ContextVar("search_history_session", default="")
+
+    def set_context(self, channel: str, chat_id: str) -> None:
+        """Set the current chat for this turn (task-local)."""
+        self._session_key.set(f"{channel}:{chat_id}")
+
+    @property
+    def name(self) -> str:
+        return "search_history"
+
+    @property
+    def description(self) -> str:
+        if not self.allow_all:
+            return "Search past messages of this conversation by keywords, best matches first."
+        return (
+            "Search past conversation messages by keywords, best matches first. "
+            "Searches this chat by default; set scope to 'all' to search every chat."
+        )
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        properties: dict[str, Any] = {
+            "query": {
+                "type": "string",
+                "description": "Keywords to search for (all must appear)"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum results (default 10)",
+                "minimum": 1,
+                "maximum": 50
+            }
+        }
+        if self.allow_all:
+            properties["scope"] = {
+                "type": "string",
+                "enum": ["chat", "all"],
+                "description": "'chat' (default) for this conversation, 'all' for every conversation"
+            }
+            properties["channel"] = {
+                "type": "string",
+                "description": "Optional: with scope 'all', only this channel (telegram, whatsapp, ...)"
+            }
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": ["query"]
+        }
+
+    async def execute(
+        self,
+        query: str,
+        scope: str = "chat",
+        channel: str | None = None,
+        limit: int | None = None,
+        **kwargs: Any
+    ) -> str:
+        if scope == "all" and not self.allow_all:
+            return "Error: Searching other chats is disabled"
+        session_key = self._session_key.get() if scope != "all" else None
+        if scope != "all" and not session_key:
+            return "Error: No current chat" + ("; use scope 'all'" if self.allow_all else "")
+
+        results = await asyncio.to_thread(
+            self.index.search,
+            query,
+            session_key=session_key,
+            channel=channel,
+            limit=min(limit or self.max_results, 50),
+        )
+        if not results:
+            return f"No messages found for: {query}"
+
+        lines = []
+        for r in results:
+            when = (r["timestamp"] or "")[:16].replace("T", " ")
+            where = "" if session_key else f" {r['session_key']}"
+            lines.append(f"[{when}]{where} #{r['seq']} {r['role']}: {r['snippet']}")
+        return "\n".join(lines)
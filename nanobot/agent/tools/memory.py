@@ -0,0 +1,119 @@
+"""Memory tools: search and add to the agent's memory files."""
+
+from typing import Any
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.base import Tool
+
+
+class MemorySearchTool(Tool):
+    """Tool to find relevant snippets in long-term memory and daily notes."""
+
+    def __init__(self, store: MemoryStore, max_results: int = 5):
+        self.store = store
+        self.max_results = max_results
+
+    @property
+    def name(self) -> str:
+        return "memory_search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search your memory (long-term memory and daily notes) for snippets relevant to a query, "
+            "best matches first. Use this instead of reading whole memory files."
+        )
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "What to look for (keywords or a short question)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum snippets (default 5)",
+                    "minimum": 1,
+                    "maximum": 20
+                }
+            },
+            "required": ["query"]
+        }
+
+    async def execute(self, query: str, limit: int | None = None, **kwargs: Any) -> str:
+        results = self.store.search(query, k=min(limit or self.max_results, 20))
+        if not results:
+            return f"No memories found for: {query}"
+
+        blocks = []
+        for _, chunk in results:
+            title = f"{chunk.source} › {chunk.heading}" if chunk.heading else chunk.source
+            blocks.append(f"[{title}]\n{chunk.text}")
+        return "\n\n".join(blocks)
+
+
+class MemoryAppendTool(Tool):
+    """Tool to add an entry to today's notes or to long-term memory."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    @property
+    def name(self) -> str:
+        return "memory_append"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Remember something. target 'today' (default) adds to today's daily notes (events, "
+            "progress); 'long_term' adds a lasting fact to MEMORY.md under a section such as "
+            "'User Information', 'Preferences' or 'Important Notes'. Only the new entry is written."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "content": {
+                    "type": "string",
+                    "description": "The entry to add (e.g. a short markdown bullet)"
+                },
+                "target": {
+                    "type": "string",
+                    "enum": ["today", "long_term"],
+                    "description": "'today' (default) for daily notes, 'long_term' for MEMORY.md"
+                },
+                "section": {
+                    "type": "string",
+                    "description": "Optional: with 'long_term', the section heading to add under (created if missing)"
+                }
+            },
+            "required": ["content"]
+        }
+
+    async def execute(
+        self,
+        content: str,
+        target: str = "today",
+        section: str | None = None,
+        **kwargs: Any
+    ) -> str:
+        if not content.strip():
+            return "Error: content is empty"
+
+        if target == "long_term":
+            if not self.store.append_long_term(content, section):
+                return "Already in long-term memory"
+            where = f"section '{section}'" if section else "the end"
+            return f"Added to long-term memory ({where})"
+
+        self.store.append_today(content.strip())
+        return f"Added to today's notes ({self.store.get_today_file().name})"
@@ -0,0 +1,93 @@
+"""Recall tool: retrieve full tool results that were digested out of the context."""
+
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+
+
+class ToolResultStore:
+    """
+    Keeps the full text of digested tool results, addressable by handle.
+
+    Bounded by total characters; the least recently used results are
+    dropped first.
+    """
+
+    def __init__(self, max_chars: int = 20_000_000):
+        self.max_chars = max_chars
+        self._results: OrderedDict[str, str] = OrderedDict()
+        self._size = 0
+
+    def put(self, content: str) -> str:
+        """Store a result and return its handle."""
+        handle = f"tr_{uuid.uuid4().hex[:12]}"
+        self._results[handle] = content
+        self._size += len(content)
+        while self._size > self.max_chars and len(self._results) > 1:
+            _, dropped = self._results.popitem(last=False)
+            self._size -= len(dropped)
+        return handle
+
+    def get(self, handle: str) -> str | None:
+        """Return a stored result, or None if unknown or evicted."""
+        content = self._results.get(handle)
+        if content is not None:
+            self._results.move_to_end(handle)
+        return content
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+class RecallToolResultTool(Tool):
+    """Tool to read back a tool result that was replaced by a digest."""
+
+    def __init__(self, store: ToolResultStore, max_chars: int = 20000):
+        self.store = store
+        self.max_chars = max_chars
+
+    @property
+    def name(self) -> str:
+        return "recall_tool_result"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Retrieve the full text of an earlier tool result that was shortened to a digest. "
+            "Use the handle shown in the digest; page through long results with offset."
+        )
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle from the digest (e.g. tr_1a2b3c4d5e6f)"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Character offset to start from (default 0)",
+                    "minimum": 0
+                }
+            },
+            "required": ["handle"]
+        }
+
+    async def execute(self, handle: str, offset: int = 0, **kwargs: Any) -> str:
+        content = self.store.get(handle)
+        if content is None:
+            return f"Error: No stored result for handle {handle} (it may have expired)"
+
+        end = offset + self.max_chars
+        chunk = content[offset:end]
+        if end < len(content):
+            chunk += f"\n\n[Showing {offset}-{end} of {len(content)} chars; call again with offset={end} for more]"
+        return chunk
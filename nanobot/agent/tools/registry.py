@@ -1,5 +1,6 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -14,14 +15,17 @@ class ToolRegistry:
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definitions: list[dict[str, Any]] | None = None
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._definitions = None
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
         self._tools.pop(name, None)
+        self._definitions = None
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -32,8 +36,15 @@ class ToolRegistry:
         return name in self._tools
     
     def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+        """
+        Get all tool definitions in OpenAI format.
+        
+        Definitions are sorted by name and built once, so every request sends
+        byte-identical tools and provider-side prompt caches keep hitting.
+        """
+        if self._definitions is None:
+            self._definitions = [self._tools[name].to_schema() for name in sorted(self._tools)]
+        return list(self._definitions)
     
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -61,6 +72,23 @@ class ToolRegistry:
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
     
+    async def execute_batch(self, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """
+        Execute several tool calls, running independent ones concurrently.
+        
+        Consecutive read-only tools fan out together; any other tool acts as
+        a barrier and runs alone, after everything before it has finished.
+        
+        Args:
+            calls: (name, params) pairs in the order the model issued them.
+        
+        Returns:
+            Results in the same order as ``calls``.
+        """
+        batch = ToolBatch(self)
+        tasks = [batch.submit(name, params) for name, params in calls]
+        return list(await asyncio.gather(*tasks))
+    
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
@@ -71,3 +99,79 @@ class ToolRegistry:
     
     def __contains__(self, name: str) -> bool:
         return name in self._tools
+
+
+class ToolBatch:
+    """
+    Tool calls scheduled one at a time as they become known.
+    
+    Each call starts as soon as it is submitted (e.g. while the rest of a
+    streamed response is still being generated), subject to the ordering
+    rules of ToolRegistry.execute_batch: read-only calls overlap freely,
+    any other call waits for everything submitted before it, and calls
+    submitted after it wait for it.
+    """
+    
+    def __init__(self, registry: ToolRegistry):
+        self._registry = registry
+        self._tasks: list[asyncio.Task[str]] = []
+        self._barrier: asyncio.Task[str] | None = None  # Last non-read-only call
+        self._reads: list[asyncio.Task[str]] = []  # Read-only calls since the barrier
+        self._running: set[asyncio.Task[str]] = set()  # Non-read-only calls past their wait
+    
+    def submit(self, name: str, params: dict[str, Any]) -> asyncio.Task[str]:
+        """
+        Schedule a tool call.
+        
+        Args:
+            name: Tool name.
+            params: Tool parameters.
+        
+        Returns:
+            Task resolving to the tool result string.
+        """
+        wait_for = [self._barrier] if self._barrier else []
+        tool = self._registry.get(name)
+        
+        if tool and tool.read_only:
+            task = asyncio.create_task(self._run(wait_for, name, params))
+            self._reads.append(task)
+        else:
+            task = asyncio.create_task(self._run(wait_for + self._reads, name, params, mutating=True))
+            self._barrier = task
+            self._reads = []
+        
+        self._tasks.append(task)
+        return task
+    
+    async def _run(
+        self, wait_for: list[asyncio.Task[str]], name: str, params: dict[str, Any], mutating: bool = False
+    ) -> str:
+        if wait_for:
+            await asyncio.wait(wait_for)
+        if mutating:
+            self._running.add(asyncio.current_task())
+        return await self._registry.execute(name, params)
+    
+    def cancel(self) -> None:
+        """Cancel any calls that have not finished (e.g. the turn itself was cancelled)."""
+        for task in self._tasks:
+            task.cancel()
+    
+    async def drain(self) -> None:
+        """
+        Abandon the calls still outstanding (e.g. the response was an error).
+        
+        Read-only calls and calls still waiting their turn are cancelled;
+        calls with side effects that have already started run to completion,
+        so they are never interrupted halfway.
+        """
+        for task in self._tasks:
+            if task not in self._running:
+                task.cancel()
+        started = [task for task in self._running if not task.done()]
+        if started:
+            await asyncio.wait(started)
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
@@ -35,3 +35,16 @@ class OutboundMessage:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class OutboundDelta:
+    """
+    Incremental piece of a reply that is still being generated.
+    
+    Deltas sharing a stream_id belong to one reply; the final
+    OutboundMessage for it carries the same id in metadata["stream_id"].
+    """
+    
+    channel: str
+    chat_id: str
+    stream_id: str
+    delta: str
@@ -5,7 +5,7 @@ from typing import Callable, Awaitable
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.events import InboundMessage, OutboundDelta, OutboundMessage
 
 
 class MessageBus:
@@ -18,7 +18,7 @@ class MessageBus:
     
     def __init__(self):
         self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+        self.outbound: asyncio.Queue[OutboundMessage | OutboundDelta] = asyncio.Queue()
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
     
@@ -30,12 +30,12 @@ class MessageBus:
         """Consume the next inbound message (blocks until available)."""
         return await self.inbound.get()
     
-    async def publish_outbound(self, msg: OutboundMessage) -> None:
-        """Publish a response from the agent to channels."""
+    async def publish_outbound(self, msg: OutboundMessage | OutboundDelta) -> None:
+        """Publish a response (or a streamed delta of one) from the agent to channels."""
         await self.outbound.put(msg)
     
-    async def consume_outbound(self) -> OutboundMessage:
-        """Consume the next outbound message (blocks until available)."""
+    async def consume_outbound(self) -> OutboundMessage | OutboundDelta:
+        """Consume the next outbound message or delta (blocks until available)."""
         return await self.outbound.get()
     
     def subscribe_outbound(
@@ -57,6 +57,8 @@ class MessageBus:
         while self._running:
             try:
                 msg = await asyncio.wait_for(self.outbound.get(), timeout=1.0)
+                if isinstance(msg, OutboundDelta):
+                    continue  # Subscribers only receive complete messages
                 subscribers = self._outbound_subscribers.get(msg.channel, [])
                 for callback in subscribers:
                     try:
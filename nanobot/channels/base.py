@@ -3,7 +3,7 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.events import InboundMessage, OutboundDelta, OutboundMessage
 from nanobot.bus.queue import MessageBus
 
 
@@ -56,6 +56,18 @@ class BaseChannel(ABC):
         """
         pass
     
+    async def send_delta(self, delta: OutboundDelta) -> None:
+        """
+        Deliver a piece of a reply that is still streaming.
+        
+        Channels that can update messages in place override this; the
+        default ignores deltas and waits for the final message.
+        
+        Args:
+            delta: The streamed delta.
+        """
+        pass
+    
     def is_allowed(self, sender_id: str) -> bool:
         """
         Check if a sender is allowed to use this bot.
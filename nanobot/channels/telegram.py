@@ -2,12 +2,14 @@
 
 import asyncio
 import re
+import time
+from dataclasses import dataclass
 
 from loguru import logger
 from telegram import Update
 from telegram.ext import Application, MessageHandler, filters, ContextTypes
 
-from nanobot.bus.events import OutboundMessage
+from nanobot.bus.events import OutboundDelta, OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import TelegramConfig
@@ -76,6 +78,21 @@ def _markdown_to_telegram_html(text: str) -> str:
     return text
 
 
+# Minimum seconds between edits of a streaming message (Telegram rate-limits edits)
+STREAM_EDIT_INTERVAL_S = 1.0
+# Telegram's maximum message length
+MAX_MESSAGE_LEN = 4096
+
+
+@dataclass
+class _LiveMessage:
+    """A Telegram message being progressively edited while a reply streams."""
+    chat_id: int
+    text: str = ""
+    message_id: int | None = None
+    last_edit: float = 0.0
+
+
 class TelegramChannel(BaseChannel):
     """
     Telegram channel using long polling.
@@ -91,6 +108,7 @@ class TelegramChannel(BaseChannel):
         self.groq_api_key = groq_api_key
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
+        self._streams: dict[str, _LiveMessage] = {}  # stream_id -> message being streamed
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -150,13 +168,58 @@ class TelegramChannel(BaseChannel):
             await self._app.stop()
             await self._app.shutdown()
             self._app = None
+        self._streams.clear()
+    
+    async def send_delta(self, delta: OutboundDelta) -> None:
+        """
+        Show a streaming reply by sending it early and editing it as it grows.
+        
+        The first delta is sent immediately; later ones are batched into at
+        most one editMessageText call per STREAM_EDIT_INTERVAL_S.
+        """
+        if not self._app:
+            return
+        
+        live = self._streams.get(delta.stream_id)
+        if live is None:
+            try:
+                live = self._streams[delta.stream_id] = _LiveMessage(chat_id=int(delta.chat_id))
+            except ValueError:
+                logger.error(f"Invalid chat_id: {delta.chat_id}")
+                return
+        live.text += delta.delta
+        
+        now = time.monotonic()
+        if not live.text.strip() or now - live.last_edit < STREAM_EDIT_INTERVAL_S:
+            return
+        live.last_edit = now
+        
+        # Partial markdown is not valid HTML yet, so stream as plain text
+        preview = live.text[:MAX_MESSAGE_LEN]
+        try:
+            if live.message_id is None:
+                sent = await self._app.bot.send_message(chat_id=live.chat_id, text=preview)
+                live.message_id = sent.message_id
+            else:
+                await self._app.bot.edit_message_text(
+                    chat_id=live.chat_id,
+                    message_id=live.message_id,
+                    text=preview,
+                )
+        except Exception as e:
+            logger.debug(f"Telegram stream update failed: {e}")
     
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Telegram."""
+        """Send a message through Telegram (finalizing a streamed one if present)."""
         if not self._app:
             logger.warning("Telegram bot not running")
             return
         
+        live = self._streams.pop(msg.metadata.get("stream_id", ""), None)
+        if live and live.message_id is not None:
+            await self._finish_stream(live, msg.content)
+            return
+        
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
@@ -180,6 +243,28 @@ class TelegramChannel(BaseChannel):
             except Exception as e2:
                 logger.error(f"Error sending Telegram message: {e2}")
     
+    async def _finish_stream(self, live: _LiveMessage, content: str) -> None:
+        """Replace a streamed preview with the final, formatted reply."""
+        try:
+            await self._app.bot.edit_message_text(
+                chat_id=live.chat_id,
+                message_id=live.message_id,
+                text=_markdown_to_telegram_html(content),
+                parse_mode="HTML",
+            )
+        except Exception as e:
+            if "not modified" in str(e).lower():
+                return  # Preview already shows the final text
+            logger.warning(f"HTML edit failed, falling back to plain text: {e}")
+            try:
+                await self._app.bot.edit_message_text(
+                    chat_id=live.chat_id,
+                    message_id=live.message_id,
+                    text=content,
+                )
+            except Exception as e2:
+                logger.error(f"Error finalizing Telegram message: {e2}")
+    
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
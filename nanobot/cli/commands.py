@@ -7,7 +7,7 @@ import typer
 from rich.console import Console
 from rich.table import Table
 
-from nanobot import __version__, __logo__
+from nanobot import __logo__, __version__
 
 app = typer.Typer(
     name="nanobot",
@@ -152,20 +152,31 @@ This file stores important information that should persist across sessions.
 # ============================================================================
 
 
+def _make_provider(config):
+    """Create the LLM provider, exiting with a message if none fits the config."""
+    from nanobot.providers.factory import create_provider
+    
+    try:
+        return create_provider(config)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+
 @app.command()
 def gateway(
     port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
 ):
     """Start the nanobot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
-    from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
     from nanobot.channels.manager import ChannelManager
+    from nanobot.config.loader import get_data_dir, load_config
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.providers.http_client import close_http_client
     
     if verbose:
         import logging
@@ -178,22 +189,17 @@ def gateway(
     # Create components
     bus = MessageBus()
     
-    # Create provider (supports OpenRouter, Anthropic, OpenAI, Bedrock)
+    # Create provider (OpenRouter, Anthropic, OpenAI, Zhipu, vLLM built in; others via LiteLLM)
     api_key = config.get_api_key()
-    api_base = config.get_api_base()
     model = config.agents.defaults.model
     is_bedrock = model.startswith("bedrock/")
 
-    if not api_key and not is_bedrock:
+    if not api_key and not is_bedrock and not config.providers.vllm.api_base:
         console.print("[red]Error: No API key configured.[/red]")
         console.print("Set one in ~/.nanobot/config.json under providers.openrouter.apiKey")
         raise typer.Exit(1)
     
-    provider = LiteLLMProvider(
-        api_key=api_key,
-        api_base=api_base,
-        default_model=config.agents.defaults.model
-    )
+    provider = _make_provider(config)
     
     # Create agent
     agent = AgentLoop(
@@ -202,8 +208,23 @@ def gateway(
         workspace=config.workspace_path,
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
+        max_tokens=config.agents.defaults.max_tokens,
+        temperature=config.agents.defaults.temperature,
+        context_window=config.agents.defaults.context_window,
+        summary_model=config.agents.defaults.summary_model or None,
+        summary_trigger=config.agents.defaults.summary_trigger,
+        tool_result_keep_rounds=config.agents.defaults.tool_result_keep_rounds,
+        memory_token_budget=config.agents.defaults.memory_token_budget,
+        memory_vector_search=config.agents.defaults.memory_vector_search,
+        max_concurrent_turns=config.agents.defaults.max_concurrent_turns,
+        stream=config.agents.defaults.stream,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        session_store=_make_session_store(config),
+        session_cache=_make_session_cache(config),
+        session_search=_make_session_search(config),
+        session_archive=_make_session_archive(config),
+        search_all_chats=config.sessions.search_all_chats,
     )
     
     # Create cron service
@@ -238,6 +259,30 @@ def gateway(
         enabled=True
     )
     
+    # Create session maintenance service (archival and retention)
+    from nanobot.session.archive import SessionMaintenanceService
+    maintenance_hours = config.sessions.maintenance_interval_hours
+    maintenance = SessionMaintenanceService(
+        _make_session_archiver(config, agent.sessions),
+        interval_s=maintenance_hours * 3600,
+        enabled=maintenance_hours > 0,
+    )
+    
+    # Create memory consolidation service (daily notes -> MEMORY.md)
+    from nanobot.agent.consolidation import MemoryConsolidationService, MemoryConsolidator
+    consolidation = config.agents.defaults.memory_consolidation
+    memory_consolidation = MemoryConsolidationService(
+        MemoryConsolidator(
+            agent.context.memory,
+            keep_days=consolidation.keep_days,
+            token_budget=consolidation.token_budget,
+            provider=provider if consolidation.summarize else None,
+            model=consolidation.model or config.agents.defaults.summary_model or None,
+        ),
+        interval_s=consolidation.interval_hours * 3600,
+        enabled=consolidation.enabled and consolidation.interval_hours > 0,
+    )
+    
     # Create channel manager
     channels = ChannelManager(config, bus)
     
@@ -256,6 +301,8 @@ def gateway(
         try:
             await cron.start()
             await heartbeat.start()
+            await maintenance.start()
+            await memory_consolidation.start()
             await asyncio.gather(
                 agent.run(),
                 channels.start_all(),
@@ -263,9 +310,12 @@ def gateway(
         except KeyboardInterrupt:
             console.print("\nShutting down...")
             heartbeat.stop()
+            maintenance.stop()
+            memory_consolidation.stop()
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            await close_http_client()
     
     asyncio.run(run())
 
@@ -281,46 +331,70 @@ def gateway(
 def agent(
     message: str = typer.Option(None, "--message", "-m", help="Message to send to the agent"),
     session_id: str = typer.Option("cli:default", "--session", "-s", help="Session ID"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Print the reply as it is generated"),
 ):
     """Interact with the agent directly."""
-    from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
-    from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
     
     config = load_config()
     
     api_key = config.get_api_key()
-    api_base = config.get_api_base()
     model = config.agents.defaults.model
     is_bedrock = model.startswith("bedrock/")
 
-    if not api_key and not is_bedrock:
+    if not api_key and not is_bedrock and not config.providers.vllm.api_base:
         console.print("[red]Error: No API key configured.[/red]")
         raise typer.Exit(1)
 
     bus = MessageBus()
-    provider = LiteLLMProvider(
-        api_key=api_key,
-        api_base=api_base,
-        default_model=config.agents.defaults.model
-    )
+    provider = _make_provider(config)
     
     agent_loop = AgentLoop(
         bus=bus,
         provider=provider,
         workspace=config.workspace_path,
+        max_tokens=config.agents.defaults.max_tokens,
+        temperature=config.agents.defaults.temperature,
+        context_window=config.agents.defaults.context_window,
+        summary_model=config.agents.defaults.summary_model or None,
+        summary_trigger=config.agents.defaults.summary_trigger,
+        tool_result_keep_rounds=config.agents.defaults.tool_result_keep_rounds,
+        memory_token_budget=config.agents.defaults.memory_token_budget,
+        memory_vector_search=config.agents.defaults.memory_vector_search,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        session_store=_make_session_store(config),
+        session_cache=_make_session_cache(config),
+        session_search=_make_session_search(config),
+        session_archive=_make_session_archive(config),
+        search_all_chats=config.sessions.search_all_chats,
     )
     
-    if message:
-        # Single message mode
-        async def run_once():
-            response = await agent_loop.process_direct(message, session_id)
+    async def ask(text: str) -> None:
+        if not stream:
+            response = await agent_loop.process_direct(text, session_id)
             console.print(f"\n{__logo__} {response}")
+            return
         
-        asyncio.run(run_once())
+        # Print deltas as they arrive; fall back to the full reply if nothing streamed
+        console.print(f"\n{__logo__} ", end="")
+        streamed = False
+        
+        async def on_delta(delta: str) -> None:
+            nonlocal streamed
+            streamed = True
+            console.print(delta, end="", markup=False, highlight=False)
+        
+        response = await agent_loop.process_direct(text, session_id, on_delta=on_delta)
+        if not streamed:
+            console.print(response, end="", markup=False, highlight=False)
+        console.print()
+    
+    if message:
+        # Single message mode
+        asyncio.run(ask(message))
     else:
         # Interactive mode
         console.print(f"{__logo__} Interactive mode (Ctrl+C to exit)\n")
@@ -332,8 +406,8 @@ def agent(
                     if not user_input.strip():
                         continue
                     
-                    response = await agent_loop.process_direct(user_input, session_id)
-                    console.print(f"\n{__logo__} {response}\n")
+                    await ask(user_input)
+                    console.print()
                 except KeyboardInterrupt:
                     console.print("\nGoodbye!")
                     break
@@ -615,6 +689,244 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Session Commands
+# ============================================================================
+
+
+sessions_app = typer.Typer(help="Manage conversation sessions", invoke_without_command=True)
+app.add_typer(sessions_app, name="sessions")
+
+
+def _make_session_store(config, backend: str | None = None):
+    """Create the session store for a backend (defaults to the configured one)."""
+    from nanobot.session.store import create_session_store
+    
+    backend = backend or config.sessions.backend
+    path = None
+    if backend == config.sessions.backend and config.sessions.path:
+        path = Path(config.sessions.path).expanduser()
+    return create_session_store(backend, path)
+
+
+def _make_session_cache(config):
+    """Create the in-memory session cache from config."""
+    from nanobot.session.cache import SessionCache
+    
+    return SessionCache(
+        max_sessions=config.sessions.cache_max_sessions,
+        max_bytes=config.sessions.cache_max_mb * 1024 * 1024,
+        idle_ttl=config.sessions.cache_idle_ttl,
+    )
+
+
+def _make_session_search(config, force: bool = False):
+    """Create the session search index, or None if disabled in config."""
+    from nanobot.session.search import SessionSearchIndex
+    from nanobot.utils.helpers import get_data_path
+    
+    if not (config.sessions.search or force):
+        return None
+    path = Path(config.sessions.search_path).expanduser() if config.sessions.search_path else None
+    return SessionSearchIndex(path or get_data_path() / "search.db")
+
+
+def _make_session_archive(config):
+    """Create the cold session archive from config."""
+    from nanobot.session.archive import SessionArchive
+    from nanobot.utils.helpers import get_data_path
+    
+    path = Path(config.sessions.archive_path).expanduser() if config.sessions.archive_path else None
+    return SessionArchive(path or get_data_path() / "archive")
+
+
+def _make_session_archiver(config, sessions):
+    """Create the archiver applying the configured retention policies."""
+    from nanobot.session.archive import RetentionPolicy, SessionArchiver
+    
+    policies = {
+        channel: RetentionPolicy(
+            archive_after_days=r.archive_after_days,
+            max_age_days=r.max_age_days,
+            max_bytes=r.max_archive_mb * 1024 * 1024,
+        )
+        for channel, r in config.sessions.retention.items()
+    }
+    return SessionArchiver(sessions, sessions.archive, policies)
+
+
+@sessions_app.callback()
+def sessions_main(ctx: typer.Context):
+    """List sessions when no subcommand is given."""
+    if ctx.invoked_subcommand is None:
+        sessions_list(channel=None, limit=20)
+
+
+@sessions_app.command("list")
+def sessions_list(
+    channel: str = typer.Option(None, "--channel", "-c", help="Only sessions from this channel"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum sessions to show (0 for all)"),
+):
+    """List the most recently updated sessions."""
+    from nanobot.config.loader import load_config
+    
+    config = load_config()
+    store = _make_session_store(config)
+    sessions = store.list_sessions(channel=channel, limit=limit or None)
+    stats = store.stats()
+    store.close()
+    
+    if not sessions:
+        console.print("No sessions.")
+        return
+    
+    table = Table(title="Sessions")
+    table.add_column("Key", style="cyan")
+    table.add_column("Channel")
+    table.add_column("Messages", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Updated")
+    
+    for info in sessions:
+        updated = (info.get("updated_at") or "")[:16].replace("T", " ")
+        table.add_row(
+            info["key"],
+            info.get("channel") or info["key"].split(":", 1)[0],
+            str(info.get("message_count") or 0),
+            f"{(info.get('size_bytes') or 0) / 1024:.1f} KB",
+            updated,
+        )
+    
+    console.print(table)
+    console.print(
+        f"{stats['sessions']} session(s), {stats['messages']} message(s), "
+        f"{stats['bytes'] / (1024 * 1024):.1f} MB"
+    )
+
+
+@sessions_app.command("search")
+def sessions_search(
+    query: str = typer.Argument(..., help="Words to search for (all must match)"),
+    channel: str = typer.Option(None, "--channel", "-c", help="Only sessions from this channel"),
+    session: str = typer.Option(None, "--session", "-s", help="Only this session key"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum results"),
+    raw: bool = typer.Option(False, "--raw", help="Use FTS5 query syntax (phrases, OR, prefix*)"),
+):
+    """Search messages across all sessions, best matches first."""
+    import sqlite3
+
+    from nanobot.config.loader import load_config
+    
+    index = _make_session_search(load_config(), force=True)
+    try:
+        results = index.search(query, session_key=session, channel=channel, limit=limit, raw=raw)
+    except sqlite3.OperationalError as e:
+        console.print(f"[red]Invalid query: {e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        index.close()
+    
+    if not results:
+        console.print("No matches. (Run [cyan]nanobot sessions reindex[/cyan] to index older sessions.)")
+        return
+    
+    table = Table(title=f"Matches for: {query}")
+    table.add_column("Session", style="cyan")
+    table.add_column("#", justify="right")
+    table.add_column("When")
+    table.add_column("Role")
+    table.add_column("Message")
+    
+    for r in results:
+        when = (r["timestamp"] or "")[:16].replace("T", " ")
+        table.add_row(r["session_key"], str(r["seq"]), when, r["role"], r["snippet"])
+    
+    console.print(table)
+
+
+@sessions_app.command("reindex")
+def sessions_reindex():
+    """Rebuild the search index from all stored sessions."""
+    from nanobot.config.loader import load_config
+    
+    config = load_config()
+    store = _make_session_store(config)
+    index = _make_session_search(config, force=True)
+    
+    count = 0
+    for info in store.list_sessions():
+        session = store.load(info["key"])
+        if session is None:
+            console.print(f"[yellow]Skipped unreadable session {info['key']}[/yellow]")
+            continue
+        index.index(session, rebuild=True)
+        count += 1
+    index.close()
+    store.close()
+    
+    console.print(f"[green]✓[/green] Indexed {count} session(s)")
+
+
+@sessions_app.command("archive")
+def sessions_archive():
+    """Archive idle sessions and prune old ones per the retention policies."""
+    from nanobot.config.loader import load_config
+    from nanobot.session.manager import SessionManager
+    
+    config = load_config()
+    sessions = SessionManager(
+        config.workspace_path,
+        store=_make_session_store(config),
+        search=_make_session_search(config),
+        archive=_make_session_archive(config),
+    )
+    archiver = _make_session_archiver(config, sessions)
+    report = asyncio.run(archiver.run())
+    sessions.store.close()
+    
+    console.print(
+        f"[green]✓[/green] Archived {len(report.archived)} session(s), "
+        f"pruned {len(report.pruned)}, deleted {report.blobs_deleted} unused blob(s), "
+        f"reclaimed {report.bytes_reclaimed / (1024 * 1024):.1f} MB"
+    )
+
+
+@sessions_app.command("migrate")
+def sessions_migrate(
+    source: str = typer.Option("jsonl", "--from", help="Backend to copy sessions from (jsonl or sqlite)"),
+    target: str = typer.Option("sqlite", "--to", help="Backend to copy sessions to (jsonl or sqlite)"),
+):
+    """Copy all sessions from one storage backend to another."""
+    from nanobot.config.loader import load_config
+    
+    if source == target:
+        console.print("[red]Error: --from and --to must be different backends[/red]")
+        raise typer.Exit(1)
+    
+    config = load_config()
+    try:
+        src = _make_session_store(config, source)
+        dst = _make_session_store(config, target)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    
+    migrated = 0
+    for info in reversed(src.list_sessions()):  # Oldest first, preserving update order
+        session = src.load(info["key"])
+        if session is None:
+            console.print(f"[yellow]Skipped unreadable session {info['key']}[/yellow]")
+            continue
+        dst.save(session)
+        migrated += 1
+    src.close()
+    dst.close()
+    
+    console.print(f"[green]✓[/green] Migrated {migrated} session(s) from {source} to {target}")
+    if config.sessions.backend != target:
+        console.print(f"Set sessions.backend to \"{target}\" in ~/.nanobot/config.json to use them.")
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
@@ -623,7 +935,7 @@ def cron_run(
 @app.command()
 def status():
     """Show nanobot status."""
-    from nanobot.config.loader import load_config, get_config_path
+    from nanobot.config.loader import get_config_path, load_config
 
     config_path = get_config_path()
     config = load_config()
@@ -25,13 +25,32 @@ class ChannelsConfig(BaseModel):
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
 
 
+class MemoryConsolidationConfig(BaseModel):
+    """Periodic consolidation of daily notes into long-term memory."""
+    enabled: bool = True
+    interval_hours: int = 24  # How often the gateway consolidates
+    keep_days: int = 7  # Daily notes from this many recent days are left as they are
+    token_budget: int = 1500  # Maximum size of MEMORY.md; oldest consolidated entries are dropped beyond it
+    summarize: bool = False  # Let an LLM merge notes into MEMORY.md (otherwise deduplicated and appended)
+    model: str = ""  # Model for summarizing; empty = `summaryModel`, then `model`
+
+
 class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.nanobot/workspace"
     model: str = "anthropic/claude-opus-4-5"
     max_tokens: int = 8192
     temperature: float = 0.7
+    context_window: int = 0  # Prompt + reply token limit; 0 = infer from the model name
     max_tool_iterations: int = 20
+    max_concurrent_turns: int = 4  # Turns for different sessions processed in parallel
+    stream: bool = True  # Stream replies to channels that support progressive delivery
+    summary_model: str = ""  # Model for rolling session summaries; empty = use `model`
+    summary_trigger: int = 40  # Unsummarized messages that trigger a summary (newest half kept verbatim)
+    tool_result_keep_rounds: int = 2  # Tool rounds per turn kept verbatim; older results become digests (0 = off)
+    memory_token_budget: int = 2000  # Max memory tokens per prompt; beyond it only relevant snippets (0 = unlimited)
+    memory_vector_search: bool = False  # Also rank memory by embedding similarity (pip install nanobot-ai[vector])
+    memory_consolidation: MemoryConsolidationConfig = Field(default_factory=MemoryConsolidationConfig)
 
 
 class AgentsConfig(BaseModel):
@@ -47,6 +66,7 @@ class ProviderConfig(BaseModel):
 
 class ProvidersConfig(BaseModel):
     """Configuration for LLM providers."""
+    backend: str = "auto"  # "auto" (built-in clients, LiteLLM for the rest), "native" or "litellm"
     anthropic: ProviderConfig = Field(default_factory=ProviderConfig)
     openai: ProviderConfig = Field(default_factory=ProviderConfig)
     openrouter: ProviderConfig = Field(default_factory=ProviderConfig)
@@ -85,6 +105,31 @@ class ToolsConfig(BaseModel):
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
 
 
+class SessionRetentionConfig(BaseModel):
+    """Retention policy for one channel's sessions."""
+    archive_after_days: int = 30  # Compress sessions idle this long into the archive (0 = never)
+    max_age_days: int = 0  # Delete sessions idle this long, live or archived (0 = keep forever)
+    max_archive_mb: int = 0  # Delete the oldest archived sessions beyond this size (0 = unlimited)
+
+
+class SessionsConfig(BaseModel):
+    """Session storage configuration."""
+    backend: str = "jsonl"  # "jsonl" (one file per session) or "sqlite"
+    path: str = ""  # Sessions directory / database file; empty = default under ~/.nanobot
+    cache_max_sessions: int = 1000  # Sessions kept in memory (least recently used evicted first)
+    cache_max_mb: int = 256  # Estimated memory budget for cached sessions
+    cache_idle_ttl: int = 3600  # Seconds before an idle session is evicted (0 = never)
+    search: bool = True  # Maintain a full-text index of messages (search_history tool)
+    search_path: str = ""  # Search index database; empty = ~/.nanobot/search.db
+    search_all_chats: bool = False  # Let search_history search every chat, not just the current one
+    archive_path: str = ""  # Archive directory; empty = ~/.nanobot/archive
+    maintenance_interval_hours: int = 24  # How often the gateway archives/prunes (0 = never)
+    # Retention policies by channel; "*" applies to channels without their own
+    retention: dict[str, SessionRetentionConfig] = Field(
+        default_factory=lambda: {"*": SessionRetentionConfig()}
+    )
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
@@ -92,6 +137,7 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    sessions: SessionsConfig = Field(default_factory=SessionsConfig)
     
     @property
     def workspace_path(self) -> Path:
@@ -10,6 +10,7 @@ from typing import Any, Callable, Coroutine
 from loguru import logger
 
 from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.utils.writer import get_writer
 
 
 def _now_ms() -> int:
@@ -58,6 +59,7 @@ class CronService:
         if self._store:
             return self._store
         
+        get_writer().flush(paths=[self.store_path])
         if self.store_path.exists():
             try:
                 data = json.loads(self.store_path.read_text())
@@ -142,7 +144,8 @@ class CronService:
             ]
         }
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        # Written in the background so timer ticks never block on disk
+        get_writer().write(self.store_path, json.dumps(data, indent=2))
     
     async def start(self) -> None:
         """Start the cron service."""
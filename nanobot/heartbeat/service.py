@@ -1,11 +1,12 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
-import asyncio
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
 from loguru import logger
 
+from nanobot.utils.periodic import PeriodicService
+
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
 
@@ -35,7 +36,7 @@ def _is_heartbeat_empty(content: str | None) -> bool:
     return True
 
 
-class HeartbeatService:
+class HeartbeatService(PeriodicService):
     """
     Periodic heartbeat service that wakes the agent to check for tasks.
     
@@ -43,6 +44,8 @@ class HeartbeatService:
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
     """
     
+    name = "Heartbeat"
+    
     def __init__(
         self,
         workspace: Path,
@@ -50,12 +53,9 @@ class HeartbeatService:
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
     ):
+        super().__init__(interval_s, enabled)
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
-        self.interval_s = interval_s
-        self.enabled = enabled
-        self._running = False
-        self._task: asyncio.Task | None = None
     
     @property
     def heartbeat_file(self) -> Path:
@@ -70,36 +70,7 @@ class HeartbeatService:
                 return None
         return None
     
-    async def start(self) -> None:
-        """Start the heartbeat service."""
-        if not self.enabled:
-            logger.info("Heartbeat disabled")
-            return
-        
-        self._running = True
-        self._task = asyncio.create_task(self._run_loop())
-        logger.info(f"Heartbeat started (every {self.interval_s}s)")
-    
-    def stop(self) -> None:
-        """Stop the heartbeat service."""
-        self._running = False
-        if self._task:
-            self._task.cancel()
-            self._task = None
-    
-    async def _run_loop(self) -> None:
-        """Main heartbeat loop."""
-        while self._running:
-            try:
-                await asyncio.sleep(self.interval_s)
-                if self._running:
-                    await self._tick()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Heartbeat error: {e}")
-    
-    async def _tick(self) -> None:
+    async def tick(self) -> None:
         """Execute a single heartbeat tick."""
         content = self._read_heartbeat_file()
         
@@ -1,6 +1,24 @@
 """LLM provider abstraction module."""
 
-from nanobot.providers.base import LLMProvider, LLMResponse
-from nanobot.providers.litellm_provider import LiteLLMProvider
+from typing import Any
 
-__all__ = ["LLMProvider", "LLMResponse", "LiteLLMProvider"]
+from nanobot.providers.anthropic_provider import AnthropicProvider
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamChunk
+from nanobot.providers.openai_provider import OpenAICompatibleProvider
+
+__all__ = [
+    "LLMProvider",
+    "LLMResponse",
+    "StreamChunk",
+    "AnthropicProvider",
+    "OpenAICompatibleProvider",
+    "LiteLLMProvider",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # LiteLLM is optional and slow to import: load it only when asked for
+    if name == "LiteLLMProvider":
+        from nanobot.providers.litellm_provider import LiteLLMProvider
+        return LiteLLMProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,326 @@
+"""Native provider for the Anthropic Messages API."""
+
+import json
+import re
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamChunk, ToolCallRequest
+from nanobot.providers.common import add_cache_breakpoints, error_response, parse_arguments
+from nanobot.providers.http_client import get_http_client, http_error_message, iter_sse
+
+ANTHROPIC_API_BASE = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Anthropic stop reasons in OpenAI terms, which the agent loop expects
+STOP_REASONS = {
+    "end_turn": "stop",
+    "stop_sequence": "stop",
+    "tool_use": "tool_calls",
+    "max_tokens": "length",
+}
+
+_DATA_URL = re.compile(r"^data:([^;]+);base64,(.*)$", re.DOTALL)
+
+
+class AnthropicProvider(LLMProvider):
+    """
+    LLM provider for Anthropic (Claude) models via the Messages API.
+
+    Accepts and returns the OpenAI-style messages the rest of nanobot uses
+    and converts them on the way: system messages become the ``system``
+    parameter, tool calls become ``tool_use`` blocks and tool results
+    ``tool_result`` blocks. Requests go over the shared pooled HTTP client.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        default_model: str = "claude-opus-4-5",
+        client: httpx.AsyncClient | None = None,
+    ):
+        """
+        Args:
+            api_key: Anthropic API key.
+            api_base: API root (default https://api.anthropic.com).
+            default_model: Model used when a request names none.
+            client: HTTP client to use (default: the shared pooled client).
+        """
+        super().__init__(api_key, (api_base or ANTHROPIC_API_BASE).rstrip("/"))
+        self.default_model = default_model
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_http_client()
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """Send a Messages API request."""
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+        try:
+            response = await self.client.post(self._url, json=body, headers=self._headers)
+            if response.is_error:
+                return error_response(http_error_message(response), status=response.status_code)
+            return self._parse_response(response.json())
+        except (httpx.HTTPError, ValueError) as e:
+            return error_response(e)
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a Messages API request.
+
+        Text deltas are yielded as they arrive; each tool call is yielded when
+        its content block closes, before the rest of the reply is generated.
+        """
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+        body["stream"] = True
+
+        content_parts: list[str] = []
+        blocks: dict[int, dict[str, Any]] = {}  # Open tool_use blocks by index
+        tool_calls: list[ToolCallRequest] = []
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+
+        try:
+            async with self.client.stream("POST", self._url, json=body, headers=self._headers) as response:
+                if response.is_error:
+                    await response.aread()
+                    yield StreamChunk(response=error_response(http_error_message(response), status=response.status_code))
+                    return
+
+                async for event, data in iter_sse(response):
+                    payload = json.loads(data)
+                    event = event or payload.get("type", "")
+                    if event == "error":
+                        raise ValueError(payload.get("error", {}).get("message") or data)
+                    if event == "message_start":
+                        usage = self._parse_usage(payload["message"].get("usage") or {})
+                    elif event == "content_block_start":
+                        block = payload["content_block"]
+                        if block.get("type") == "tool_use":
+                            blocks[payload["index"]] = {"id": block["id"], "name": block["name"], "json": ""}
+                    elif event == "content_block_delta":
+                        delta = payload["delta"]
+                        if delta.get("type") == "text_delta" and delta.get("text"):
+                            content_parts.append(delta["text"])
+                            yield StreamChunk(delta=delta["text"])
+                        elif delta.get("type") == "input_json_delta" and payload["index"] in blocks:
+                            blocks[payload["index"]]["json"] += delta.get("partial_json", "")
+                    elif event == "content_block_stop":
+                        block = blocks.pop(payload["index"], None)
+                        if block is not None:
+                            tool_call = ToolCallRequest(
+                                id=block["id"], name=block["name"], arguments=parse_arguments(block["json"])
+                            )
+                            tool_calls.append(tool_call)
+                            yield StreamChunk(tool_call=tool_call)
+                    elif event == "message_delta":
+                        stop_reason = payload.get("delta", {}).get("stop_reason")
+                        if stop_reason:
+                            finish_reason = STOP_REASONS.get(stop_reason, stop_reason)
+                        if payload.get("usage"):
+                            usage = self._parse_usage(payload["usage"], usage)
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            yield StreamChunk(response=error_response(e))
+            return
+
+        yield StreamChunk(response=LLMResponse(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+        ))
+
+    @property
+    def _url(self) -> str:
+        return f"{self.api_base}/v1/messages"
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        return {"x-api-key": self.api_key or "", "anthropic-version": ANTHROPIC_VERSION}
+
+    def _build_body(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Build the request body from OpenAI-style messages and tools."""
+        messages, tools = add_cache_breakpoints(messages, tools)
+        system, converted = self._convert_messages(messages)
+
+        body: dict[str, Any] = {
+            "model": (model or self.default_model).removeprefix("anthropic/"),
+            "messages": converted,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if system:
+            body["system"] = system
+        if tools:
+            body["tools"] = [self._convert_tool(t) for t in tools]
+        return body
+
+    def supports_prompt_caching(self, model: str | None = None) -> bool:
+        """Claude models accept cache_control breakpoints."""
+        return True
+
+    @classmethod
+    def _convert_messages(
+        cls, messages: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Convert OpenAI-style messages to Anthropic's format.
+
+        Returns:
+            (system blocks, messages); consecutive messages of the same role
+            are merged, since the API requires alternating roles.
+        """
+        system: list[dict[str, Any]] = []
+        converted: list[dict[str, Any]] = []
+
+        for msg in messages:
+            role = msg.get("role")
+            if role == "system":
+                system.extend(cls._content_blocks(msg.get("content")))
+                continue
+
+            if role == "tool":
+                result: dict[str, Any] = {"type": "tool_result", "tool_use_id": msg.get("tool_call_id", "")}
+                blocks = cls._content_blocks(msg.get("content"))
+                if blocks and "cache_control" in blocks[-1]:
+                    result["cache_control"] = blocks[-1].pop("cache_control")
+                result["content"] = blocks
+                role, blocks = "user", [result]
+            elif role == "assistant":
+                blocks = cls._content_blocks(msg.get("content"))
+                for tc in msg.get("tool_calls") or []:
+                    function = tc.get("function") or {}
+                    blocks.append({
+                        "type": "tool_use",
+                        "id": tc.get("id", ""),
+                        "name": function.get("name", ""),
+                        "input": parse_arguments(function.get("arguments")),
+                    })
+            else:
+                role, blocks = "user", cls._content_blocks(msg.get("content"))
+
+            if not blocks:
+                continue
+            if converted and converted[-1]["role"] == role:
+                converted[-1]["content"].extend(blocks)
+            else:
+                converted.append({"role": role, "content": blocks})
+
+        return system, converted
+
+    @staticmethod
+    def _content_blocks(content: Any) -> list[dict[str, Any]]:
+        """Convert message content (string or OpenAI content parts) to Anthropic blocks."""
+        if content is None:
+            return []
+        if isinstance(content, str):
+            return [{"type": "text", "text": content}] if content else []
+
+        blocks = []
+        for part in content:
+            if part.get("type") == "text":
+                if not part.get("text"):
+                    continue
+                block = {"type": "text", "text": part["text"]}
+            elif part.get("type") == "image_url":
+                url = (part.get("image_url") or {}).get("url", "")
+                match = _DATA_URL.match(url)
+                source = (
+                    {"type": "base64", "media_type": match.group(1), "data": match.group(2)}
+                    if match else {"type": "url", "url": url}
+                )
+                block = {"type": "image", "source": source}
+            else:
+                block = dict(part)
+            if "cache_control" in part:
+                block["cache_control"] = part["cache_control"]
+            blocks.append(block)
+        return blocks
+
+    @staticmethod
+    def _convert_tool(tool: dict[str, Any]) -> dict[str, Any]:
+        """Convert an OpenAI function tool definition to Anthropic's format."""
+        function = tool.get("function", tool)
+        converted = {
+            "name": function["name"],
+            "description": function.get("description", ""),
+            "input_schema": function.get("parameters") or {"type": "object", "properties": {}},
+        }
+        if "cache_control" in tool:
+            converted["cache_control"] = tool["cache_control"]
+        return converted
+
+    def _parse_response(self, data: dict[str, Any]) -> LLMResponse:
+        """Parse a Messages API response."""
+        text = []
+        tool_calls = []
+        for block in data.get("content") or []:
+            if block.get("type") == "text":
+                text.append(block.get("text", ""))
+            elif block.get("type") == "tool_use":
+                tool_calls.append(ToolCallRequest(
+                    id=block["id"],
+                    name=block["name"],
+                    arguments=block.get("input") or {},
+                ))
+
+        stop_reason = data.get("stop_reason") or "end_turn"
+        return LLMResponse(
+            content="".join(text) or None,
+            tool_calls=tool_calls,
+            finish_reason=STOP_REASONS.get(stop_reason, stop_reason),
+            usage=self._parse_usage(data.get("usage") or {}),
+        )
+
+    @staticmethod
+    def _parse_usage(usage: dict[str, Any], previous: dict[str, int] | None = None) -> dict[str, int]:
+        """
+        Convert Anthropic usage to prompt/completion/total token counts.
+
+        Cached prompt tokens (read or written) count as prompt tokens.
+        Streamed usage arrives in parts, merged into ``previous``.
+        """
+        counts = dict(previous or {})
+        prompt = sum(
+            usage.get(key) or 0
+            for key in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        )
+        if prompt:
+            counts["prompt_tokens"] = prompt
+        if "output_tokens" in usage:
+            counts["completion_tokens"] = usage["output_tokens"] or 0
+        if not counts:
+            return {}
+        counts.setdefault("prompt_tokens", 0)
+        counts.setdefault("completion_tokens", 0)
+        counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+        return counts
+
+    def get_default_model(self) -> str:
+        """Get the default model."""
+        return self.default_model
@@ -1,6 +1,7 @@
 """Base LLM provider interface."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -18,7 +19,7 @@ class LLMResponse:
     """Response from an LLM provider."""
     content: str | None
     tool_calls: list[ToolCallRequest] = field(default_factory=list)
-    finish_reason: str = "stop"
+    finish_reason: str = "stop"  # e.g. "stop", "tool_calls", "error", "context_length_exceeded"
     usage: dict[str, int] = field(default_factory=dict)
     
     @property
@@ -27,6 +28,15 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+@dataclass
+class StreamChunk:
+    """An incremental piece of a streamed LLM response."""
+    delta: str = ""  # Newly generated content text
+    # A tool call whose arguments just completed; calls come in response order
+    tool_call: ToolCallRequest | None = None
+    response: LLMResponse | None = None  # Complete response, set on the final chunk only
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -63,6 +73,55 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Send a chat completion request and stream the result.
+        
+        Yields content deltas as they are generated, tool calls as soon as
+        their arguments are complete (when the provider can tell), then a
+        final chunk carrying the complete LLMResponse with every tool call.
+        Providers without native streaming yield the whole reply at once.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions.
+            model: Model identifier (provider-specific).
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+        
+        Yields:
+            StreamChunk objects; the last one has ``response`` set.
+        """
+        response = await self.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        if response.content:
+            yield StreamChunk(delta=response.content)
+        yield StreamChunk(response=response)
+    
+    def supports_prompt_caching(self, model: str | None = None) -> bool:
+        """
+        Whether requests to this model accept ``cache_control`` breakpoints.
+        
+        Args:
+            model: Model identifier (defaults to the provider's default model).
+        
+        Returns:
+            True if the provider honors Anthropic-style cache_control markers.
+        """
+        return False
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
@@ -0,0 +1,115 @@
+"""Helpers shared by the LLM provider implementations."""
+
+import json
+from typing import Any
+
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+# Error text that signals the prompt exceeded the model's context window
+CONTEXT_OVERFLOW_MARKERS = (
+    "context_length_exceeded",
+    "context length",
+    "context window",
+    "maximum context",
+    "prompt is too long",
+)
+
+# HTTP statuses an overflow can come with; rate limits (429) never count,
+# even when their message talks about tokens
+CONTEXT_OVERFLOW_STATUSES = (400, 413)
+
+
+def error_response(
+    error: Exception | str,
+    overflow: bool = False,
+    status: int | None = None,
+) -> LLMResponse:
+    """
+    Turn a failed request into an error response, flagging context-window overflows.
+
+    Args:
+        error: The exception or error message.
+        overflow: Known to be an overflow (e.g. from a typed exception).
+        status: HTTP status of the failed request, if there was one.
+    """
+    message = str(error)
+    if not overflow and (status is None or status in CONTEXT_OVERFLOW_STATUSES):
+        overflow = any(marker in message.lower() for marker in CONTEXT_OVERFLOW_MARKERS)
+    return LLMResponse(
+        content=f"Error calling LLM: {message}",
+        finish_reason="context_length_exceeded" if overflow else "error",
+    )
+
+
+def parse_arguments(args: Any) -> dict[str, Any]:
+    """Parse tool call arguments from a JSON string if needed."""
+    if not isinstance(args, str):
+        return args or {}
+    if not args.strip():
+        return {}
+    try:
+        return json.loads(args)
+    except json.JSONDecodeError:
+        return {"raw": args}
+
+
+def complete_tool_call(part: dict[str, str]) -> ToolCallRequest | None:
+    """Return the tool call if its streamed arguments are a complete JSON object."""
+    args = part["arguments"].rstrip()
+    if not (part["id"] and part["name"] and args.endswith("}")):
+        return None
+    try:
+        arguments = json.loads(args)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(arguments, dict):
+        return None
+    return ToolCallRequest(id=part["id"], name=part["name"], arguments=arguments)
+
+
+def ready_tool_calls(parts: dict[int, dict[str, str]], emitted: int) -> list[ToolCallRequest]:
+    """
+    Streamed tool calls that can be yielded now, in response order.
+
+    Returns the complete calls after the first ``emitted`` (by index), up to
+    the first one whose arguments are not complete yet, so no call is ever
+    yielded ahead of an earlier one.
+    """
+    ready = []
+    for index in sorted(parts)[emitted:]:
+        call = complete_tool_call(parts[index])
+        if call is None:
+            break
+        ready.append(call)
+    return ready
+
+
+def add_cache_breakpoints(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]] | None]:
+    """
+    Mark the tool list and the conversation tail as cache breakpoints.
+
+    Together with the breakpoint on the stable system prompt this caches
+    tools + system + history, so each tool-loop iteration only pays for
+    the newly appended messages. Inputs are copied, never mutated.
+    """
+    marker = {"type": "ephemeral"}
+
+    if tools:
+        tools = [*tools[:-1], {**tools[-1], "cache_control": marker}]
+
+    messages = list(messages)
+    for i in range(len(messages) - 1, 0, -1):
+        content = messages[i].get("content")
+        if isinstance(content, str) and content:
+            blocks = [{"type": "text", "text": content, "cache_control": marker}]
+        elif isinstance(content, list) and content:
+            blocks = [*content[:-1], {**content[-1], "cache_control": marker}]
+        else:
+            continue
+        messages[i] = {**messages[i], "content": blocks}
+        break
+
+    return messages, tools
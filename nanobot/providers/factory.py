@@ -0,0 +1,101 @@
+"""Create the LLM provider for a configuration."""
+
+from nanobot.config.schema import Config
+from nanobot.providers.anthropic_provider import AnthropicProvider
+from nanobot.providers.base import LLMProvider
+from nanobot.providers.openai_provider import OPENAI_API_BASE, OpenAICompatibleProvider
+
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+ZHIPU_API_BASE = "https://open.bigmodel.cn/api/paas/v4"
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+
+
+def create_provider(config: Config, model: str | None = None) -> LLMProvider:
+    """
+    Create the provider for the configured credentials and model.
+
+    With ``providers.backend`` "auto" (the default), OpenRouter, Anthropic,
+    OpenAI, Zhipu, Groq and vLLM use the built-in HTTP providers and anything
+    else (Gemini, Bedrock, ...) falls back to LiteLLM. "native" never uses
+    LiteLLM; "litellm" always does.
+
+    Raises:
+        ValueError: If no provider fits, or LiteLLM is needed but not installed.
+    """
+    model = model or config.agents.defaults.model
+    backend = config.providers.backend
+    if backend not in ("auto", "native", "litellm"):
+        raise ValueError(f"Unknown providers.backend '{backend}' (use auto, native or litellm)")
+
+    if backend != "litellm":
+        provider = _create_native_provider(config, model)
+        if provider is not None:
+            return provider
+        if backend == "native":
+            raise ValueError(
+                f"No built-in provider for model '{model}': configure OpenRouter, Anthropic, "
+                "OpenAI, Zhipu, Groq or vLLM, or set providers.backend to auto"
+            )
+
+    return _create_litellm_provider(config, model)
+
+
+def _create_native_provider(config: Config, model: str) -> LLMProvider | None:
+    """Pick a built-in provider, or None if the model needs LiteLLM."""
+    providers = config.providers
+    name = model.lower()
+    if name.startswith("bedrock/"):
+        return None
+
+    if providers.openrouter.api_key:
+        return OpenAICompatibleProvider(
+            api_key=providers.openrouter.api_key,
+            api_base=providers.openrouter.api_base or OPENROUTER_API_BASE,
+            default_model=model,
+        )
+    if providers.anthropic.api_key and ("anthropic" in name or "claude" in name):
+        return AnthropicProvider(
+            api_key=providers.anthropic.api_key,
+            api_base=providers.anthropic.api_base,
+            default_model=model,
+        )
+    if providers.openai.api_key and ("openai" in name or "gpt" in name):
+        return OpenAICompatibleProvider(
+            api_key=providers.openai.api_key,
+            api_base=providers.openai.api_base or OPENAI_API_BASE,
+            default_model=model,
+        )
+    if providers.zhipu.api_key and ("glm" in name or "zhipu" in name or "zai" in name):
+        return OpenAICompatibleProvider(
+            api_key=providers.zhipu.api_key,
+            api_base=providers.zhipu.api_base or ZHIPU_API_BASE,
+            default_model=model,
+        )
+    if providers.groq.api_key and "groq" in name:
+        return OpenAICompatibleProvider(
+            api_key=providers.groq.api_key,
+            api_base=providers.groq.api_base or GROQ_API_BASE,
+            default_model=model,
+        )
+    if providers.vllm.api_base:
+        return OpenAICompatibleProvider(
+            api_key=providers.vllm.api_key or None,
+            api_base=providers.vllm.api_base,
+            default_model=model,
+        )
+    return None
+
+
+def _create_litellm_provider(config: Config, model: str) -> LLMProvider:
+    """Create a LiteLLM provider (optional dependency)."""
+    try:
+        from nanobot.providers.litellm_provider import LiteLLMProvider
+    except ImportError as e:
+        raise ValueError(
+            f"Model '{model}' needs LiteLLM, which is not installed (pip install nanobot-ai[litellm]): {e}"
+        ) from e
+    return LiteLLMProvider(
+        api_key=config.get_api_key(),
+        api_base=config.get_api_base(),
+        default_model=model,
+    )
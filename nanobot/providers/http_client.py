@@ -0,0 +1,98 @@
+"""Shared HTTP client for the native LLM providers."""
+
+import asyncio
+import importlib.util
+import weakref
+from collections.abc import AsyncIterator
+
+import httpx
+
+# Pool sized for concurrent turns plus background summaries
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY_S = 90.0
+
+# LLM replies can take minutes; connecting should not
+DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def http2_available() -> bool:
+    """Whether the optional ``h2`` package (needed for HTTP/2) is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled client: keep-alive connections, HTTP/2 when available."""
+    return httpx.AsyncClient(
+        http2=http2_available(),
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_S,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the client shared by all providers on the running event loop.
+
+    Connections are bound to the loop that opened them, so each loop (e.g.
+    each ``asyncio.run`` in the CLI) gets its own pool, released with it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = create_http_client()
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's shared client (e.g. on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def iter_sse(response: httpx.Response) -> AsyncIterator[tuple[str, str]]:
+    """
+    Parse a server-sent events stream.
+
+    Yields:
+        (event name, data) pairs; the event name is "" when the server
+        sends none (as OpenAI-compatible APIs do).
+    """
+    event = ""
+    data: list[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield event, "\n".join(data)
+
+
+def http_error_message(response: httpx.Response) -> str:
+    """Readable message for a failed API response (needs the body read)."""
+    try:
+        error = response.json().get("error")
+    except (ValueError, AttributeError):
+        error = None
+    if isinstance(error, dict):
+        detail = error.get("message") or error.get("type") or ""
+        code = error.get("code") or error.get("type")
+        if code and str(code) not in detail:
+            detail = f"{code}: {detail}"
+    else:
+        detail = str(error) if error else response.text[:1000]
+    return f"HTTP {response.status_code}: {detail}"
@@ -1,12 +1,19 @@
 """LiteLLM provider implementation for multi-provider support."""
 
-import os
+from collections.abc import AsyncIterator
 from typing import Any
 
 import litellm
 from litellm import acompletion
+from litellm.exceptions import ContextWindowExceededError
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamChunk, ToolCallRequest
+from nanobot.providers.common import (
+    add_cache_breakpoints,
+    error_response,
+    parse_arguments,
+    ready_tool_calls,
+)
 
 
 class LiteLLMProvider(LLMProvider):
@@ -14,7 +21,9 @@ class LiteLLMProvider(LLMProvider):
     LLM provider using LiteLLM for multi-provider support.
     
     Supports OpenRouter, Anthropic, OpenAI, Gemini, and many other providers through
-    a unified interface.
+    a unified interface. Requires the optional ``litellm`` extra; the API key
+    and base URL are passed with each request, so several instances can
+    coexist in one process.
     """
     
     def __init__(
@@ -35,28 +44,6 @@ class LiteLLMProvider(LLMProvider):
         # Track if using custom endpoint (vLLM, etc.)
         self.is_vllm = bool(api_base) and not self.is_openrouter
         
-        # Configure LiteLLM based on provider
-        if api_key:
-            if self.is_openrouter:
-                # OpenRouter mode - set key
-                os.environ["OPENROUTER_API_KEY"] = api_key
-            elif self.is_vllm:
-                # vLLM/custom endpoint - uses OpenAI-compatible API
-                os.environ["OPENAI_API_KEY"] = api_key
-            elif "anthropic" in default_model:
-                os.environ.setdefault("ANTHROPIC_API_KEY", api_key)
-            elif "openai" in default_model or "gpt" in default_model:
-                os.environ.setdefault("OPENAI_API_KEY", api_key)
-            elif "gemini" in default_model.lower():
-                os.environ.setdefault("GEMINI_API_KEY", api_key)
-            elif "zhipu" in default_model or "glm" in default_model or "zai" in default_model:
-                os.environ.setdefault("ZHIPUAI_API_KEY", api_key)
-            elif "groq" in default_model:
-                os.environ.setdefault("GROQ_API_KEY", api_key)
-        
-        if api_base:
-            litellm.api_base = api_base
-        
         # Disable LiteLLM logging noise
         litellm.suppress_debug_info = True
     
@@ -81,8 +68,134 @@ class LiteLLMProvider(LLMProvider):
         Returns:
             LLMResponse with content and/or tool calls.
         """
-        model = model or self.default_model
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature)
+        
+        try:
+            response = await acompletion(**kwargs)
+            return self._parse_response(response)
+        except Exception as e:
+            # Return error as content for graceful handling
+            return self._error_response(e)
+    
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a chat completion via LiteLLM.
+        
+        Content deltas are yielded as they arrive. Tool call fragments are
+        accumulated, and each call is yielded as soon as its JSON arguments
+        form a complete object (and every earlier call's did), so it can
+        start before the stream ends.
+        """
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        
+        content_parts: list[str] = []
+        tool_parts: dict[int, dict[str, str]] = {}
+        emitted = 0  # Tool calls yielded so far, in index order
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+        
+        try:
+            stream = await acompletion(**kwargs)
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = self._parse_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield StreamChunk(delta=delta.content)
+                
+                # Tool calls arrive as fragments keyed by index
+                for tc in getattr(delta, "tool_calls", None) or []:
+                    index = tc.index or 0
+                    part = tool_parts.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                    if tc.id:
+                        part["id"] = tc.id
+                    if tc.function and tc.function.name:
+                        part["name"] = tc.function.name
+                    if tc.function and tc.function.arguments:
+                        part["arguments"] += tc.function.arguments
+                
+                for ready in ready_tool_calls(tool_parts, emitted):
+                    emitted += 1
+                    yield StreamChunk(tool_call=ready)
+        except Exception as e:
+            yield StreamChunk(response=self._error_response(e))
+            return
+        
+        tool_calls = [
+            ToolCallRequest(
+                id=part["id"],
+                name=part["name"],
+                arguments=parse_arguments(part["arguments"]),
+            )
+            for _, part in sorted(tool_parts.items())
+        ]
+        
+        yield StreamChunk(response=LLMResponse(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+        ))
+    
+    def _build_kwargs(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Build the LiteLLM completion arguments for a request."""
+        model = self._resolve_model(model or self.default_model)
+        
+        if self.supports_prompt_caching(model):
+            messages, tools = add_cache_breakpoints(messages, tools)
+        
+        kwargs: dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        
+        # Per-request credentials instead of process-wide environment variables
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        
+        # Pass api_base directly for custom endpoints (vLLM, etc.)
+        if self.api_base:
+            kwargs["api_base"] = self.api_base
+        
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
         
+        return kwargs
+    
+    def supports_prompt_caching(self, model: str | None = None) -> bool:
+        """Anthropic (Claude) models accept cache_control breakpoints through LiteLLM."""
+        model = (model or self.default_model).lower()
+        return not self.is_vllm and ("anthropic" in model or "claude" in model)
+    
+    def _resolve_model(self, model: str) -> str:
+        """Add the LiteLLM routing prefix the configured provider needs."""
         # For OpenRouter, prefix model name if not already prefixed
         if self.is_openrouter and not model.startswith("openrouter/"):
             model = f"openrouter/{model}"
@@ -105,30 +218,7 @@ class LiteLLMProvider(LLMProvider):
         if "gemini" in model.lower() and not model.startswith("gemini/"):
             model = f"gemini/{model}"
         
-        kwargs: dict[str, Any] = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-        }
-        
-        # Pass api_base directly for custom endpoints (vLLM, etc.)
-        if self.api_base:
-            kwargs["api_base"] = self.api_base
-        
-        if tools:
-            kwargs["tools"] = tools
-            kwargs["tool_choice"] = "auto"
-        
-        try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
-        except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
-            )
+        return model
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -138,28 +228,15 @@ class LiteLLMProvider(LLMProvider):
         tool_calls = []
         if hasattr(message, "tool_calls") and message.tool_calls:
             for tc in message.tool_calls:
-                # Parse arguments from JSON string if needed
-                args = tc.function.arguments
-                if isinstance(args, str):
-                    import json
-                    try:
-                        args = json.loads(args)
-                    except json.JSONDecodeError:
-                        args = {"raw": args}
-                
                 tool_calls.append(ToolCallRequest(
                     id=tc.id,
                     name=tc.function.name,
-                    arguments=args,
+                    arguments=parse_arguments(tc.function.arguments),
                 ))
         
         usage = {}
         if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
+            usage = self._parse_usage(response.usage)
         
         return LLMResponse(
             content=message.content,
@@ -168,6 +245,24 @@ class LiteLLMProvider(LLMProvider):
             usage=usage,
         )
     
+    @staticmethod
+    def _error_response(error: Exception) -> LLMResponse:
+        """Turn a failed request into an error response, flagging context-window overflows."""
+        return error_response(
+            error,
+            overflow=isinstance(error, ContextWindowExceededError),
+            status=getattr(error, "status_code", None),
+        )
+    
+    @staticmethod
+    def _parse_usage(usage: Any) -> dict[str, int]:
+        """Extract token counts from a LiteLLM usage object."""
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+    
     def get_default_model(self) -> str:
         """Get the default model."""
         return self.default_model
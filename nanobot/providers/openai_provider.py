@@ -0,0 +1,253 @@
+"""Native provider for OpenAI-compatible chat completion APIs."""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamChunk, ToolCallRequest
+from nanobot.providers.common import (
+    add_cache_breakpoints,
+    error_response,
+    parse_arguments,
+    ready_tool_calls,
+)
+from nanobot.providers.http_client import get_http_client, http_error_message, iter_sse
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+
+# Model name prefixes used for routing (LiteLLM style); the endpoints want bare ids
+ROUTING_PREFIXES = ("openrouter/", "hosted_vllm/", "vllm/", "openai/", "zai/", "zhipu/", "groq/")
+
+# Reasoning models: take max_completion_tokens and reject a non-default temperature
+REASONING_MODEL_PREFIXES = ("o1", "o3", "o4", "gpt-5")
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    LLM provider for OpenAI-compatible ``/chat/completions`` endpoints.
+
+    Covers OpenAI, OpenRouter, vLLM, Zhipu (GLM) and Groq. Requests go over
+    the shared pooled HTTP client, and credentials stay on the instance, so
+    several providers can run side by side in one process.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        default_model: str = "gpt-4o",
+        extra_headers: dict[str, str] | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        """
+        Args:
+            api_key: Bearer token (optional for local vLLM servers).
+            api_base: Base URL up to and including the version (e.g. .../v1).
+            default_model: Model used when a request names none.
+            extra_headers: Headers added to every request.
+            client: HTTP client to use (default: the shared pooled client).
+        """
+        super().__init__(api_key, (api_base or OPENAI_API_BASE).rstrip("/"))
+        self.default_model = default_model
+        self.extra_headers = extra_headers or {}
+        self._client = client
+        self.is_openrouter = "openrouter" in self.api_base
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_http_client()
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """Send a chat completion request."""
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+        try:
+            response = await self.client.post(self._url, json=body, headers=self._headers)
+            if response.is_error:
+                return error_response(http_error_message(response), status=response.status_code)
+            return self._parse_response(response.json())
+        except (httpx.HTTPError, ValueError) as e:
+            return error_response(e)
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a chat completion.
+
+        Content deltas are yielded as they arrive; each tool call is yielded
+        as soon as its JSON arguments form a complete object, unless an
+        earlier call is still incomplete.
+        """
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+
+        content_parts: list[str] = []
+        tool_parts: dict[int, dict[str, str]] = {}
+        emitted = 0  # Tool calls yielded so far, in index order
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+
+        try:
+            async with self.client.stream("POST", self._url, json=body, headers=self._headers) as response:
+                if response.is_error:
+                    await response.aread()
+                    yield StreamChunk(response=error_response(http_error_message(response), status=response.status_code))
+                    return
+
+                async for _, data in iter_sse(response):
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if chunk.get("error"):
+                        raise ValueError(self._error_text(chunk["error"]))
+                    if chunk.get("usage"):
+                        usage = self._parse_usage(chunk["usage"])
+                    if not chunk.get("choices"):
+                        continue
+
+                    choice = chunk["choices"][0]
+                    delta = choice.get("delta") or {}
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+
+                    if delta.get("content"):
+                        content_parts.append(delta["content"])
+                        yield StreamChunk(delta=delta["content"])
+
+                    # Tool calls arrive as fragments keyed by index
+                    for tc in delta.get("tool_calls") or []:
+                        index = tc.get("index") or 0
+                        part = tool_parts.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                        function = tc.get("function") or {}
+                        if tc.get("id"):
+                            part["id"] = tc["id"]
+                        if function.get("name"):
+                            part["name"] = function["name"]
+                        if function.get("arguments"):
+                            part["arguments"] += function["arguments"]
+
+                    for ready in ready_tool_calls(tool_parts, emitted):
+                        emitted += 1
+                        yield StreamChunk(tool_call=ready)
+        except (httpx.HTTPError, ValueError) as e:
+            yield StreamChunk(response=error_response(e))
+            return
+
+        tool_calls = [
+            ToolCallRequest(id=part["id"], name=part["name"], arguments=parse_arguments(part["arguments"]))
+            for _, part in sorted(tool_parts.items())
+        ]
+        yield StreamChunk(response=LLMResponse(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+        ))
+
+    @property
+    def _url(self) -> str:
+        return f"{self.api_base}/chat/completions"
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        headers = dict(self.extra_headers)
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _build_body(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Build the request body."""
+        model = self._resolve_model(model or self.default_model)
+
+        if self.supports_prompt_caching(model):
+            messages, tools = add_cache_breakpoints(messages, tools)
+
+        body: dict[str, Any] = {"model": model, "messages": messages}
+        if model.removeprefix("openai/").lower().startswith(REASONING_MODEL_PREFIXES):
+            body["max_completion_tokens"] = max_tokens
+        else:
+            body["max_tokens"] = max_tokens
+            body["temperature"] = temperature
+        if tools:
+            body["tools"] = tools
+            body["tool_choice"] = "auto"
+        return body
+
+    def _resolve_model(self, model: str) -> str:
+        """Strip routing prefixes the endpoint does not understand."""
+        if self.is_openrouter:
+            # OpenRouter ids are "vendor/model" (e.g. anthropic/claude-opus-4-5): keep the vendor
+            return model.removeprefix("openrouter/")
+        for prefix in ROUTING_PREFIXES:
+            if model.startswith(prefix):
+                return model[len(prefix):]
+        return model
+
+    def supports_prompt_caching(self, model: str | None = None) -> bool:
+        """OpenRouter passes cache_control breakpoints through to Anthropic models."""
+        model = (model or self.default_model).lower()
+        return self.is_openrouter and ("anthropic" in model or "claude" in model)
+
+    def _parse_response(self, data: dict[str, Any]) -> LLMResponse:
+        """Parse a chat completion response."""
+        if data.get("error"):
+            return error_response(self._error_text(data["error"]))
+        choice = data["choices"][0]
+        message = choice.get("message") or {}
+
+        tool_calls = [
+            ToolCallRequest(
+                id=tc["id"],
+                name=tc["function"]["name"],
+                arguments=parse_arguments(tc["function"].get("arguments")),
+            )
+            for tc in message.get("tool_calls") or []
+        ]
+        return LLMResponse(
+            content=message.get("content"),
+            tool_calls=tool_calls,
+            finish_reason=choice.get("finish_reason") or "stop",
+            usage=self._parse_usage(data.get("usage") or {}),
+        )
+
+    @staticmethod
+    def _error_text(error: Any) -> str:
+        """Message of an error object embedded in a response body."""
+        return str(error.get("message") or error) if isinstance(error, dict) else str(error)
+
+    @staticmethod
+    def _parse_usage(usage: dict[str, Any]) -> dict[str, int]:
+        """Extract token counts from a usage object."""
+        if not usage:
+            return {}
+        return {
+            "prompt_tokens": usage.get("prompt_tokens") or 0,
+            "completion_tokens": usage.get("completion_tokens") or 0,
+            "total_tokens": usage.get("total_tokens") or 0,
+        }
+
+    def get_default_model(self) -> str:
+        """Get the default model."""
+        return self.default_model
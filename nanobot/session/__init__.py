@@ -1,5 +1,9 @@
 """Session management module."""
 
 from nanobot.session.manager import SessionManager, Session
+from nanobot.session.message import Message
+from nanobot.session.blobs import BlobStore
+from nanobot.session.cache import SessionCache
+from nanobot.session.store import JsonlSessionStore, SessionStore, create_session_store
 
-__all__ = ["SessionManager", "Session"]
+__all__ = ["SessionManager", "Session", "Message", "SessionCache", "SessionStore", "JsonlSessionStore", "create_session_store", "BlobStore"]
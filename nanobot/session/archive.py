@@ -0,0 +1,270 @@
+"""Cold archival and retention of idle sessions."""
+
+import asyncio
+import gzip
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.session.manager import Session, SessionManager
+from nanobot.session.message import Message
+from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.utils.periodic import PeriodicService
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+
+@dataclass
+class RetentionPolicy:
+    """How long a channel's sessions are kept hot, archived, or at all."""
+    archive_after_days: int = 30  # Archive sessions idle this long (0 = never)
+    max_age_days: int = 0  # Delete sessions (live or archived) idle this long (0 = keep)
+    max_bytes: int = 0  # Delete the oldest archives beyond this total size (0 = unlimited)
+
+
+@dataclass
+class ArchiveReport:
+    """Outcome of one maintenance run."""
+    archived: list[str] = field(default_factory=list)
+    pruned: list[str] = field(default_factory=list)
+    blobs_deleted: int = 0
+    bytes_reclaimed: int = 0
+
+
+class SessionArchive:
+    """
+    Gzip-compressed cold storage for sessions.
+
+    Each archived session is one ``.jsonl.gz`` file holding a metadata record
+    followed by all of its messages, independent of the live store backend.
+    """
+
+    def __init__(self, archive_dir: Path, writer: BackgroundWriter | None = None):
+        self.archive_dir = ensure_dir(archive_dir)
+        self.writer = writer or get_writer()
+
+    def _get_archive_path(self, key: str) -> Path:
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.archive_dir / f"{safe_key}.jsonl.gz"
+
+    def archive(self, session: Session) -> int:
+        """
+        Write a session to the archive and wait until it is on disk.
+
+        Returns:
+            Size of the archive file in bytes.
+        """
+        record = {
+            "_type": "metadata",
+            "key": session.key,
+            "created_at": session.created_at.isoformat(),
+            "updated_at": session.updated_at.isoformat(),
+            "metadata": session.metadata,
+            "message_count": session.message_count,
+        }
+        lines = [json.dumps(record) + "\n"]
+        lines.extend(json.dumps(m.to_dict()) + "\n" for m in session.get_messages())
+        data = gzip.compress("".join(lines).encode("utf-8"))
+        path = self._get_archive_path(session.key)
+        self.writer.write_bytes(path, data)
+        self.writer.flush(paths=[path])  # Durable before the caller drops the live copy
+        return len(data)
+
+    def load(self, key: str) -> Session | None:
+        """Read an archived session, or return None if it is not archived."""
+        path = self._get_archive_path(key)
+        self.writer.flush(paths=[path])
+        if not path.exists():
+            return None
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            record = json.loads(f.readline())
+            messages = [Message.from_dict(json.loads(line)) for line in f if line.strip()]
+        return Session(
+            key=record.get("key", key),
+            messages=messages,
+            created_at=datetime.fromisoformat(record["created_at"]),
+            updated_at=datetime.fromisoformat(record["updated_at"]),
+            metadata=record.get("metadata", {}),
+        )
+
+    def delete(self, key: str) -> int:
+        """
+        Delete a session's archive (after flushing pending writes).
+
+        Returns:
+            Bytes freed (0 if it was not archived).
+        """
+        path = self._get_archive_path(key)
+        self.writer.flush(paths=[path])
+        if not path.exists():
+            return 0
+        size = path.stat().st_size
+        path.unlink()
+        return size
+
+    def list_archives(self) -> list[dict[str, Any]]:
+        """List archived sessions (key, channel, updated_at, size_bytes), oldest first."""
+        archives = []
+        self.writer.flush(paths=[self.archive_dir])
+        for path in self.archive_dir.glob("*.jsonl.gz"):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    record = json.loads(f.readline())
+            except (OSError, EOFError, json.JSONDecodeError):
+                logger.warning(f"Skipping unreadable session archive {path.name}")
+                continue
+            archives.append({
+                "key": record["key"],
+                "channel": record["key"].split(":", 1)[0],
+                "updated_at": record.get("updated_at") or "",
+                "size_bytes": path.stat().st_size,
+            })
+        return sorted(archives, key=lambda a: a["updated_at"])
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_archive_path(key).exists()
+
+
+class SessionArchiver:
+    """
+    Applies retention policies: archives idle sessions and prunes old ones.
+
+    Policies are looked up by channel (the part of the session key before
+    ":"), falling back to the ``"*"`` policy. Each run ends by deleting the
+    transcript blobs no live or archived session references any more, as
+    recorded by the BlobStore.
+    """
+
+    def __init__(
+        self,
+        sessions: SessionManager,
+        archive: SessionArchive,
+        policies: dict[str, RetentionPolicy] | None = None,
+    ):
+        self.sessions = sessions
+        self.archive = archive
+        self.policies = policies or {}
+        self.policies.setdefault("*", RetentionPolicy())
+
+    def policy_for(self, channel: str) -> RetentionPolicy:
+        """Get the retention policy for a channel."""
+        return self.policies.get(channel) or self.policies["*"]
+
+    async def run(self, now: datetime | None = None) -> ArchiveReport:
+        """
+        Archive idle live sessions, then prune by age and archive size.
+
+        Pinned sessions (with a turn in flight) are left alone, whatever
+        their last update time. Yields to the event loop between sessions so
+        it can run alongside the agent.
+        """
+        now = now or datetime.now()
+        report = ArchiveReport()
+
+        for info in self.sessions.list_sessions():
+            if self.sessions.is_pinned(info["key"]):
+                continue
+            policy = self.policy_for(info["key"].split(":", 1)[0])
+            idle = now - datetime.fromisoformat(info["updated_at"])
+            if policy.max_age_days and idle > timedelta(days=policy.max_age_days):
+                report.bytes_reclaimed += info.get("size_bytes") or 0
+                self.sessions.delete(info["key"])
+                report.pruned.append(info["key"])
+            elif policy.archive_after_days and idle > timedelta(days=policy.archive_after_days):
+                report.bytes_reclaimed += self._archive(info)
+                report.archived.append(info["key"])
+            await asyncio.sleep(0)
+
+        archive_bytes: dict[str, int] = {}
+        archives = self.archive.list_archives()
+        for info in archives:
+            archive_bytes[info["channel"]] = archive_bytes.get(info["channel"], 0) + info["size_bytes"]
+        for info in archives:  # Oldest first
+            policy = self.policy_for(info["channel"])
+            idle = now - datetime.fromisoformat(info["updated_at"])
+            too_old = policy.max_age_days and idle > timedelta(days=policy.max_age_days)
+            too_big = policy.max_bytes and archive_bytes[info["channel"]] > policy.max_bytes
+            if too_old or too_big:
+                freed = self.archive.delete(info["key"])
+                self.sessions.blobs.forget(info["key"])
+                if self.sessions.search is not None:
+                    self.sessions.search.remove(info["key"])
+                archive_bytes[info["channel"]] -= freed
+                report.bytes_reclaimed += freed
+                report.pruned.append(info["key"])
+            await asyncio.sleep(0)
+
+        blobs = self.sessions.blobs
+        if not blobs.references_loaded:
+            blobs.add_references(await self._scan_blob_references())
+        report.blobs_deleted, freed = await asyncio.to_thread(blobs.sweep, blobs.referenced())
+        report.bytes_reclaimed += freed
+
+        if report.archived or report.pruned or report.blobs_deleted:
+            logger.info(
+                f"Session maintenance: archived {len(report.archived)}, pruned {len(report.pruned)}, "
+                f"deleted {report.blobs_deleted} blobs, reclaimed {report.bytes_reclaimed} bytes"
+            )
+        return report
+
+    async def _scan_blob_references(self) -> dict[str, set[str]]:
+        """
+        Read every live and archived session for its blob references.
+
+        Only needed once, for blob stores that predate the reference log.
+        Cached sessions are read from the cache, since reloading them would
+        make the store rewrite them on their next save.
+        """
+        refs: dict[str, set[str]] = {}
+        for info in self.sessions.list_sessions():
+            key = info["key"]
+            session = self.sessions.get_cached(key) or self.sessions.store.load(key)
+            if session is not None:
+                refs[key] = {m.get("blob") for m in session.get_messages() if m.get("blob")}
+            await asyncio.sleep(0)
+        for info in self.archive.list_archives():
+            session = await asyncio.to_thread(self.archive.load, info["key"])
+            if session is not None:
+                refs.setdefault(info["key"], set()).update(
+                    m.get("blob") for m in session.get_messages() if m.get("blob")
+                )
+        return refs
+
+    def _archive(self, info: dict[str, Any]) -> int:
+        """Move one session to the archive. Returns the bytes saved."""
+        key = info["key"]
+        session = self.sessions.store.load(key)
+        if session is None:
+            return 0
+        archived_size = self.archive.archive(session)
+        self.sessions.evict(key)
+        self.sessions.store.delete(key)  # Kept in the search index: still findable, restored on access
+        return max(0, (info.get("size_bytes") or 0) - archived_size)
+
+
+class SessionMaintenanceService(PeriodicService):
+    """
+    Runs a SessionArchiver periodically.
+
+    The first run comes ``initial_delay_s`` after startup, so a gateway that
+    restarts more often than ``interval_s`` still gets maintained.
+    """
+
+    name = "Session maintenance"
+
+    def __init__(
+        self,
+        archiver: SessionArchiver,
+        interval_s: int = 24 * 3600,
+        enabled: bool = True,
+        initial_delay_s: float = 60,
+    ):
+        super().__init__(interval_s, enabled, initial_delay_s)
+        self.archiver = archiver
+
+    async def tick(self) -> None:
+        await self.archiver.run()
@@ -0,0 +1,203 @@
+"""Content-addressed blob storage for large transcript payloads."""
+
+import hashlib
+import json
+import time
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+from nanobot.session.message import Message
+from nanobot.session.store import _Watermarks
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+# Log of the blobs each session references, kept next to the blobs
+REFS_FILENAME = "refs.log"
+
+
+class BlobStore:
+    """
+    Stores text once per unique content, keyed by its SHA-256 hash.
+
+    Blobs are zlib-compressed under ``root/<first two hex chars>/<hash>.z``
+    and never modified, so repeated outputs (the same file read or page
+    fetched in many turns) cost one blob however often they are referenced.
+
+    The references each session holds are recorded as it is saved, in an
+    append-only log (the last ``refs`` record for a session replaces its
+    set, ``add`` records extend it), so blobs no session references any
+    more can be found and removed by ``sweep`` without reading sessions.
+    """
+
+    # Superseded reference records tolerated before the log is compacted, at minimum
+    COMPACT_MIN_STALE = 256
+
+    def __init__(self, root: Path, writer: BackgroundWriter | None = None):
+        self.root = ensure_dir(root)
+        self.writer = writer or get_writer()
+        self._known: set[str] = set()
+        self.refs_path = self.root / REFS_FILENAME
+        self._refs: dict[str, set[str]] = {}
+        self._tracked = _Watermarks()
+        self._records = 0
+        self.writer.flush(paths=[self.refs_path])
+        # False until every session's references are recorded (see add_references)
+        self.references_loaded = self._load_references()
+
+    def _load_references(self) -> bool:
+        """Replay the reference log. Returns False if there is none to replay."""
+        if not self.refs_path.exists():
+            return False
+
+        with open(self.refs_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt record in blob reference log {self.refs_path}")
+                    continue
+                self._records += 1
+                key = record["key"]
+                if "refs" in record:
+                    self._refs[key] = set(record["refs"])
+                else:
+                    self._refs.setdefault(key, set()).update(record.get("add", []))
+                if not self._refs[key]:
+                    del self._refs[key]
+        return True
+
+    def _path(self, ref: str) -> Path:
+        return self.root / ref[:2] / f"{ref}.z"
+
+    def put(self, text: str) -> str:
+        """Store text (if new) and return its reference."""
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        if ref not in self._known:
+            path = self._path(ref)
+            if not path.exists():
+                self.writer.write_bytes(path, zlib.compress(data))
+            self._known.add(ref)
+        return ref
+
+    def get(self, ref: str) -> str | None:
+        """Return the text for a reference, or None if the blob is missing."""
+        path = self._path(ref)
+        if ref in self._known:
+            self.writer.flush(paths=[path])
+        if not path.exists():
+            return None
+        return zlib.decompress(path.read_bytes()).decode("utf-8")
+
+    def track(self, session: Session) -> None:
+        """Note a session just loaded from the store: its next update scans only new messages."""
+        self._tracked.set(session)
+
+    def update(self, session: Session) -> None:
+        """Record the blob references of a session's messages saved since the last update."""
+        new_messages = self._tracked.new_messages(session)
+        if new_messages is None:
+            # New, restored or rewritten (e.g. cleared) session: recount everything
+            refs = self._references(session.get_messages())
+            if refs != self._refs.get(session.key, set()):
+                self._set(session.key, refs)
+        else:
+            added = self._references(new_messages) - self._refs.get(session.key, set())
+            if added:
+                self._refs.setdefault(session.key, set()).update(added)
+                self._append({"key": session.key, "add": sorted(added)})
+        self._tracked.set(session)
+
+    def forget(self, key: str) -> None:
+        """Drop the references of a deleted session."""
+        self._tracked.forget(key)
+        if key in self._refs:
+            self._set(key, set())
+
+    def add_references(self, refs: dict[str, set[str]]) -> None:
+        """
+        Record references found by reading sessions, then persist the log.
+
+        Used once, when there is no reference log yet: until then nothing is
+        written, so a restart before every session was read starts over.
+        """
+        for key, session_refs in refs.items():
+            if session_refs:
+                self._refs.setdefault(key, set()).update(session_refs)
+        self.references_loaded = True
+        self._compact()
+
+    def referenced(self) -> set[str]:
+        """All blob references held by live or archived sessions."""
+        return set().union(*self._refs.values())
+
+    @staticmethod
+    def _references(messages: Iterable[Message]) -> set[str]:
+        return {m.get("blob") for m in messages if m.get("blob")}
+
+    def _set(self, key: str, refs: set[str]) -> None:
+        if refs:
+            self._refs[key] = refs
+        else:
+            self._refs.pop(key, None)
+        self._append({"key": key, "refs": sorted(refs)})
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if not self.references_loaded:
+            return
+        self._records += 1
+        if self._records > max(self.COMPACT_MIN_STALE, 2 * len(self._refs)):
+            self._compact()
+        else:
+            self.writer.append(self.refs_path, json.dumps(record) + "\n")
+
+    def _compact(self) -> None:
+        """Rewrite the reference log with one record per session."""
+        self.writer.write(self.refs_path, "".join(
+            json.dumps({"key": key, "refs": sorted(refs)}) + "\n" for key, refs in self._refs.items()
+        ))
+        self._records = len(self._refs)
+
+    def sweep(self, live: set[str], min_age_s: float = 3600) -> tuple[int, int]:
+        """
+        Delete blobs that are not referenced (the sweep of a mark-and-sweep).
+
+        Blobs stored by this process or younger than ``min_age_s`` are kept,
+        since a session referencing them may not be saved yet. Safe to run
+        in a worker thread.
+
+        Args:
+            live: References still in use by live or archived sessions.
+            min_age_s: Minimum age of a blob file before it can be deleted.
+
+        Returns:
+            (blobs deleted, bytes freed).
+        """
+        self.writer.flush(paths=[self.root])
+        cutoff = time.time() - min_age_s
+        deleted = freed = 0
+        for path in self.root.glob("??/*.z"):
+            ref = path.name[:-2]
+            if ref in live or ref in self._known:
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime > cutoff:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            deleted += 1
+            freed += stat.st_size
+        return deleted, freed
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._known or self._path(ref).exists()
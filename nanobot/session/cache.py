@@ -0,0 +1,146 @@
+"""Bounded in-memory cache of loaded sessions."""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+
+# Estimated per-message bookkeeping bytes (slotted Message, float timestamp, list slot)
+MESSAGE_OVERHEAD_BYTES = 100
+
+
+def estimate_session_bytes(session: Session) -> int:
+    """Roughly estimate the memory a session's messages occupy."""
+    return sum(
+        len(str(m.content or "")) + MESSAGE_OVERHEAD_BYTES
+        for m in session.messages
+    ) + len(str(session.metadata))
+
+
+class SessionCache:
+    """
+    LRU cache of sessions bounded by count, estimated bytes and idle time.
+
+    The least recently used sessions are evicted first; a session idle for
+    longer than ``idle_ttl`` seconds is evicted on the next cache access.
+    Evicted sessions are simply reloaded from the store when needed again.
+    Pinned sessions (e.g. with a turn in flight) are never evicted, so
+    everyone working on a session shares one instance.
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_bytes: int = 256 * 1024 * 1024, idle_ttl: float = 3600):
+        self.max_sessions = max(1, max_sessions)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        # key -> (session, estimated bytes, last access time)
+        self._entries: OrderedDict[str, tuple[Session, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._pins: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Session | None:
+        """Return a cached session and mark it as recently used."""
+        self._evict_idle()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        session, size, _ = entry
+        self._entries[key] = (session, size, time.monotonic())
+        self._entries.move_to_end(key)
+        return session
+
+    def peek(self, key: str) -> Session | None:
+        """Return a cached session without marking it as used or counting a hit."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, session: Session) -> None:
+        """Insert or refresh a session (re-estimating its size), then enforce limits."""
+        self.discard(session.key)
+        size = estimate_session_bytes(session)
+        self._entries[session.key] = (session, size, time.monotonic())
+        self._bytes += size
+        # Never evict the entry just inserted, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            if not self._evict_oldest(keep=session.key):
+                break
+
+    def pin(self, key: str) -> None:
+        """Keep a session from being evicted until it is unpinned (pins nest)."""
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str) -> None:
+        """Release one pin on a session."""
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+        else:
+            self._pins.pop(key, None)
+
+    def is_pinned(self, key: str) -> bool:
+        """Whether a session is pinned."""
+        return key in self._pins
+
+    def discard(self, key: str) -> None:
+        """Remove a session from the cache without counting an eviction."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict_idle(self) -> None:
+        """Evict sessions that have not been accessed within ``idle_ttl``."""
+        if self.idle_ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = []
+        for key, (_, _, last_access) in self._entries.items():
+            if last_access >= cutoff:
+                break
+            if key not in self._pins:
+                idle.append(key)
+        for key in idle:
+            self._evict(key)
+
+    def _evict_oldest(self, keep: str | None = None) -> bool:
+        """Evict the least recently used unpinned session. Returns False if there is none."""
+        for key in self._entries:
+            if key != keep and key not in self._pins:
+                self._evict(key)
+                return True
+        return False
+
+    def _evict(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        self.evictions += 1
+        logger.debug(f"Evicted session {key} from cache ({size} bytes)")
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated bytes held by cached sessions."""
+        return self._bytes
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters and current occupancy."""
+        return {
+            "sessions": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
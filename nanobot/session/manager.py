@@ -1,14 +1,27 @@
 """Session management for conversation history."""
 
-import json
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.session.message import Message
+
+if TYPE_CHECKING:
+    from nanobot.session.archive import SessionArchive
+    from nanobot.session.blobs import BlobStore
+    from nanobot.session.cache import SessionCache
+    from nanobot.session.search import SessionSearchIndex
+    from nanobot.session.store import SessionStore
+
+# Tool outputs longer than this are moved to the blob store
+TRANSCRIPT_INLINE_CHARS = 2000
+# Characters of a blob-backed tool output kept inline as a preview
+TRANSCRIPT_PREVIEW_CHARS = 500
 
 
 @dataclass
@@ -16,64 +29,129 @@ class Session:
     """
     A conversation session.
     
-    Stores messages in JSONL format for easy reading and persistence.
+    Large sessions may be loaded partially: ``messages`` then holds only the
+    newest messages, starting at absolute index ``offset``, and older ones
+    are fetched through ``loader`` when first needed. Indices passed to
+    ``get_messages``/``get_history`` are always absolute.
+    
+    Messages are compact ``Message`` records; ``get_history`` materializes
+    LLM dicts only for the window requested and caches the result until
+    the session changes.
     """
     
     key: str  # channel:chat_id
-    messages: list[dict[str, Any]] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
+    offset: int = 0  # Absolute index of messages[0]; older messages are not loaded yet
+    loader: Callable[[int, int], list[Message]] | None = field(default=None, repr=False, compare=False)
+    # (max_messages, start, message_count) -> history; reset whenever messages change
+    _history_cache: tuple[tuple[int, int, int], list[dict[str, Any]]] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def message_count(self) -> int:
+        """Total number of messages, including ones not loaded yet."""
+        return self.offset + len(self.messages)
+    
+    def get_messages(self, start: int = 0, end: int | None = None) -> list[Message]:
+        """
+        Get messages by absolute index, loading older ones on demand.
+        
+        Args:
+            start: Absolute index of the first message.
+            end: Absolute index after the last message (default: all).
+        
+        Returns:
+            The messages in ``[start, end)``.
+        """
+        start = max(0, start)
+        if start < self.offset:
+            self._load_older(start)
+        end = self.message_count if end is None else end
+        return self.messages[start - self.offset:max(0, end - self.offset)]
+    
+    def _load_older(self, start: int) -> None:
+        """Prepend messages ``[start, offset)`` from the loader."""
+        if self.loader is None:
+            raise RuntimeError(f"Session {self.key} has unloaded messages but no loader")
+        older = self.loader(start, self.offset)
+        self.messages[:0] = older
+        self.offset -= len(older)
+        self._history_cache = None
     
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
-        """Add a message to the session."""
-        msg = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            **kwargs
-        }
-        self.messages.append(msg)
+        """Add a message to the session (extra fields go to ``Message.extra``)."""
+        self.messages.append(Message(role, content, extra=kwargs))
         self.updated_at = datetime.now()
+        self._history_cache = None
     
-    def get_history(self, max_messages: int = 50) -> list[dict[str, Any]]:
+    def get_history(self, max_messages: int = 50, start: int = 0) -> list[dict[str, Any]]:
         """
         Get message history for LLM context.
         
         Args:
             max_messages: Maximum messages to return.
+            start: Index of the oldest message to consider (e.g. the first
+                one not covered by the session summary).
         
         Returns:
-            List of messages in LLM format.
+            List of messages in LLM format. The list is cached and shared
+            between calls, so callers must not modify it or its dicts.
         """
+        cache_key = (max_messages, start, self.message_count)
+        if self._history_cache is not None and self._history_cache[0] == cache_key:
+            return self._history_cache[1]
+        
         # Get recent messages
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
+        recent = self.get_messages(max(start, self.message_count - max_messages))
         
-        # Convert to LLM format (just role and content)
-        return [{"role": m["role"], "content": m["content"]} for m in recent]
+        # Convert to LLM format (just role and content); tool-call steps stay in the transcript only
+        history = [m.llm_dict() for m in recent if m.is_conversation]
+        self._history_cache = (cache_key, history)
+        return history
     
     def clear(self) -> None:
         """Clear all messages in the session."""
         self.messages = []
+        self.offset = 0
+        self.loader = None
         self.updated_at = datetime.now()
+        self._history_cache = None
 
 
 class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are held in a bounded LRU cache and persisted through a
+    pluggable SessionStore (append-only JSONL files by default). Large
+    tool outputs in transcripts are kept in a content-addressed BlobStore.
+    An optional SessionSearchIndex is updated on every save. Sessions moved
+    to the cold SessionArchive are restored transparently when requested.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        store: "SessionStore | None" = None,
+        cache: "SessionCache | None" = None,
+        blobs: "BlobStore | None" = None,
+        search: "SessionSearchIndex | None" = None,
+        archive: "SessionArchive | None" = None,
+    ):
+        from nanobot.session.archive import SessionArchive
+        from nanobot.session.blobs import BlobStore
+        from nanobot.session.cache import SessionCache
+        from nanobot.session.store import JsonlSessionStore
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
-        self._cache: dict[str, Session] = {}
-    
-    def _get_session_path(self, key: str) -> Path:
-        """Get the file path for a session."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.sessions_dir / f"{safe_key}.jsonl"
+        self.store = store or JsonlSessionStore(Path.home() / ".nanobot" / "sessions")
+        self._cache = cache if cache is not None else SessionCache()
+        self.blobs = blobs or BlobStore(Path.home() / ".nanobot" / "blobs")
+        self.search = search
+        self.archive = archive or SessionArchive(Path.home() / ".nanobot" / "archive")
     
     def get_or_create(self, key: str) -> Session:
         """
@@ -86,72 +164,73 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        session = self._cache.get(key)
+        if session is not None:
+            return session
         
-        # Try to load from disk
-        session = self._load(key)
+        # Try to load from the store, then the archive
+        session = self.store.load(key)
         if session is None:
-            session = Session(key=key)
+            session = self._restore(key) or Session(key=key)
+        else:
+            self.blobs.track(session)
+            if self.search is not None:
+                self.search.track(session)
         
-        self._cache[key] = session
+        self._cache.put(session)
         return session
     
-    def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
-        path = self._get_session_path(key)
-        
-        if not path.exists():
+    def _restore(self, key: str) -> Session | None:
+        """Move an archived session back into the store."""
+        session = self.archive.load(key)
+        if session is None:
             return None
+        self.store.save(session)
+        self.archive.delete(key)  # Flushes the store write first
+        logger.info(f"Restored session {key} from archive")
+        return session
+    
+    def add_transcript(self, session: Session, messages: list[dict[str, Any]]) -> None:
+        """
+        Append a turn's tool-call trajectory to a session.
         
-        try:
-            messages = []
-            metadata = {}
-            created_at = None
-            
-            with open(path) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                    else:
-                        messages.append(data)
-            
-            return Session(
-                key=key,
-                messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata
-            )
-        except Exception as e:
-            logger.warning(f"Failed to load session {key}: {e}")
-            return None
+        Tool outputs longer than ``TRANSCRIPT_INLINE_CHARS`` are stored once in
+        the blob store; the session keeps a preview plus ``blob`` (reference)
+        and ``chars`` (full length) fields.
+        
+        Args:
+            session: The session to append to.
+            messages: Assistant tool-call and tool result messages, in order.
+        """
+        for message in messages:
+            extra = {k: v for k, v in message.items() if k not in ("role", "content")}
+            content = message.get("content")
+            if (
+                message["role"] == "tool"
+                and isinstance(content, str)
+                and len(content) > TRANSCRIPT_INLINE_CHARS
+            ):
+                extra["blob"] = self.blobs.put(content)
+                extra["chars"] = len(content)
+                content = content[:TRANSCRIPT_PREVIEW_CHARS]
+            session.add_message(message["role"], content, **extra)
+    
+    def get_full_content(self, message: Message) -> Any:
+        """Return a stored message's full content, resolving blob references."""
+        ref = message.get("blob")
+        if ref:
+            text = self.blobs.get(ref)
+            if text is not None:
+                return text
+        return message.content
     
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
-        path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # Write metadata first
-            metadata_line = {
-                "_type": "metadata",
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata
-            }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # Write messages
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
-        
-        self._cache[session.key] = session
+        """Save a session to the store (and the search index, if any)."""
+        self.blobs.update(session)  # Queued before the session write that references the blobs
+        self.store.save(session)
+        if self.search is not None:
+            self.search.index(session)
+        self._cache.put(session)
     
     def delete(self, key: str) -> bool:
         """
@@ -164,39 +243,53 @@ class SessionManager:
             True if deleted, False if not found.
         """
         # Remove from cache
-        self._cache.pop(key, None)
+        self._cache.discard(key)
+        self.blobs.forget(key)
+        if self.search is not None:
+            self.search.remove(key)
+        archived = self.archive.delete(key) > 0
+        return self.store.delete(key) or archived
+    
+    @contextmanager
+    def pinned(self, key: str) -> Iterator[None]:
+        """
+        Keep a session cached while the block runs (e.g. for a whole turn).
         
-        # Remove file
-        path = self._get_session_path(key)
-        if path.exists():
-            path.unlink()
-            return True
-        return False
+        A session evicted mid-turn would be reloaded as a second copy by
+        anyone else touching it (such as the summarizer), and whichever copy
+        is saved last would silently drop the other's changes.
+        """
+        self._cache.pin(key)
+        try:
+            yield
+        finally:
+            self._cache.unpin(key)
+    
+    def is_pinned(self, key: str) -> bool:
+        """Whether a session is pinned (e.g. a turn on it is in flight)."""
+        return self._cache.is_pinned(key)
+    
+    def get_cached(self, key: str) -> Session | None:
+        """Return a session if it is in the cache, without loading it."""
+        return self._cache.peek(key)
     
-    def list_sessions(self) -> list[dict[str, Any]]:
+    def evict(self, key: str) -> None:
+        """Drop a session from the in-memory cache (it is reloaded from the store when needed)."""
+        self._cache.discard(key)
+    
+    def list_sessions(self, **filters: Any) -> list[dict[str, Any]]:
         """
-        List all sessions.
+        List sessions, most recently updated first.
+        
+        Args:
+            **filters: Passed to ``SessionStore.list_sessions`` (channel,
+                updated_since, min_messages, limit).
         
         Returns:
             List of session info dicts.
         """
-        sessions = []
-        
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
-        
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        return self.store.list_sessions(**filters)
+    
+    def cache_stats(self) -> dict[str, Any]:
+        """Session cache hit/miss/eviction counters and occupancy."""
+        return self._cache.stats()
@@ -0,0 +1,165 @@
+"""Incrementally maintained index of stored sessions."""
+
+import json
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.utils.writer import BackgroundWriter
+
+
+class SessionManifest:
+    """
+    Index of sessions (timestamps, message count, byte size, channel).
+
+    Entries are kept in memory in save order, so listing never touches the
+    session files. The index is persisted as an append-only log of entry
+    records (the last record for a key wins; ``deleted`` records remove it)
+    and rewritten once superseded records outnumber the live ones.
+    """
+
+    # Superseded records tolerated before the log is compacted, at minimum
+    COMPACT_MIN_STALE = 256
+
+    def __init__(self, path: Path, writer: BackgroundWriter):
+        self.path = path
+        self.writer = writer
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._records = 0
+        self._messages = 0
+        self._bytes = 0
+        self.loaded = self._load()
+
+    def _load(self) -> bool:
+        """Replay the log. Returns False if there is none to replay."""
+        if not self.path.exists():
+            return False
+
+        entries: dict[str, dict[str, Any]] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt record in session manifest {self.path}")
+                    continue
+                self._records += 1
+                if record.get("deleted"):
+                    entries.pop(record["key"], None)
+                else:
+                    entries[record["key"]] = record
+
+        for entry in sorted(entries.values(), key=lambda e: e.get("updated_at") or ""):
+            self._add(entry)
+        return True
+
+    def _add(self, entry: dict[str, Any]) -> None:
+        self._entries[entry["key"]] = entry
+        self._messages += entry.get("message_count") or 0
+        self._bytes += entry.get("size_bytes") or 0
+
+    def _discard(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._messages -= entry.get("message_count") or 0
+            self._bytes -= entry.get("size_bytes") or 0
+        return entry
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the entry for a session, if indexed."""
+        return self._entries.get(key)
+
+    def update(
+        self,
+        key: str,
+        created_at: datetime,
+        updated_at: datetime,
+        message_count: int,
+        size_bytes: int,
+    ) -> None:
+        """Record a saved session (making it the most recently updated)."""
+        self._discard(key)
+        entry = {
+            "key": key,
+            "channel": key.split(":", 1)[0],
+            "created_at": created_at.isoformat(),
+            "updated_at": updated_at.isoformat(),
+            "message_count": message_count,
+            "size_bytes": size_bytes,
+        }
+        self._add(entry)
+        self._append(entry)
+
+    def remove(self, key: str) -> bool:
+        """Remove a session from the index. Returns True if it was indexed."""
+        if self._discard(key) is None:
+            return False
+        self._append({"key": key, "deleted": True})
+        return True
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._records += 1
+        if self._records > max(self.COMPACT_MIN_STALE, 2 * len(self._entries)):
+            self.compact()
+        else:
+            self.writer.append(self.path, json.dumps(record) + "\n")
+
+    def compact(self) -> None:
+        """Rewrite the log with one record per live session."""
+        self.writer.write(self.path, "".join(json.dumps(e) + "\n" for e in self._entries.values()))
+        self._records = len(self._entries)
+
+    def rebuild(self, entries: list[dict[str, Any]]) -> None:
+        """Replace the whole index (e.g. after scanning the session files)."""
+        self._entries.clear()
+        self._messages = self._bytes = 0
+        for entry in sorted(entries, key=lambda e: e.get("updated_at") or ""):
+            self._add(entry)
+        self.compact()
+        self.loaded = True
+
+    def entries(
+        self,
+        channel: str | None = None,
+        updated_since: datetime | None = None,
+        min_messages: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        List indexed sessions, most recently updated first.
+
+        Args:
+            channel: Only sessions from this channel (e.g. "telegram").
+            updated_since: Only sessions updated at or after this time.
+            min_messages: Only sessions with at least this many messages.
+            limit: Maximum number of sessions to return.
+        """
+        since = updated_since.isoformat() if updated_since else None
+        result = []
+        for entry in reversed(self._entries.values()):
+            if limit and len(result) >= limit:
+                break
+            if channel and entry["channel"] != channel:
+                continue
+            if since and (entry.get("updated_at") or "") < since:
+                continue
+            if (entry.get("message_count") or 0) < min_messages:
+                continue
+            result.append(dict(entry))
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """Totals across all indexed sessions."""
+        return {"sessions": len(self._entries), "messages": self._messages, "bytes": self._bytes}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,69 @@
+"""Compact in-memory record for session messages."""
+
+import sys
+import time
+from datetime import datetime
+from typing import Any
+
+
+class Message:
+    """
+    One stored conversation message.
+
+    Uses ``__slots__``, an interned role string and a float timestamp
+    instead of a dict with an ISO string, which cuts the per-message
+    overhead of large cached sessions severalfold. Rarely used fields
+    (tool calls, blob references) live in ``extra``, which stays None
+    for plain text messages. The on-disk format is unchanged: see
+    ``from_dict``/``to_dict``.
+    """
+
+    __slots__ = ("role", "content", "timestamp", "extra")
+
+    def __init__(
+        self,
+        role: str,
+        content: Any,
+        timestamp: float | None = None,
+        extra: dict[str, Any] | None = None,
+    ):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Message":
+        """Build a message from its stored (JSON) form."""
+        extra = {k: v for k, v in data.items() if k not in ("role", "content", "timestamp")}
+        ts = data.get("timestamp")
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts).timestamp()
+        return cls(data["role"], data.get("content"), ts, extra)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the stored (JSON) form."""
+        data = {"role": self.role, "content": self.content, "timestamp": self.isoformat()}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def isoformat(self) -> str:
+        """The timestamp as an ISO 8601 string (local time)."""
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up an extra field (e.g. "tool_calls", "blob")."""
+        return self.extra.get(key, default) if self.extra else default
+
+    @property
+    def is_conversation(self) -> bool:
+        """Whether this is user/assistant text rather than a tool-call step."""
+        return self.role in ("user", "assistant") and not self.get("tool_calls")
+
+    def llm_dict(self) -> dict[str, Any]:
+        """The message in LLM format (just role and content)."""
+        return {"role": self.role, "content": self.content}
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={str(self.content)[:40]!r})"
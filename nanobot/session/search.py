@@ -0,0 +1,188 @@
+"""Full-text search index over session messages."""
+
+import re
+import sqlite3
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from nanobot.session.manager import Session
+from nanobot.session.store import _Watermarks
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    session_key UNINDEXED,
+    seq UNINDEXED,
+    role UNINDEXED,
+    timestamp UNINDEXED,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS indexed_sessions (
+    session_key TEXT PRIMARY KEY,
+    message_count INTEGER NOT NULL
+);
+"""
+
+
+def to_fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words (in any order)."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"' for w in words)
+
+
+class SessionSearchIndex:
+    """
+    Inverted index of user/assistant messages across all sessions.
+
+    Backed by an SQLite FTS5 table, so queries are answered from the index
+    with BM25 ranking instead of scanning sessions. Indexing is incremental:
+    each save adds only the messages appended since the session was last
+    indexed (tracked per session in the database, so restarts resume where
+    they left off). Inserts run on a BackgroundWriter.
+    """
+
+    def __init__(self, db_path: Path, writer: BackgroundWriter | None = None):
+        self.db_path = db_path
+        self.writer = writer or get_writer()
+        ensure_dir(db_path.parent)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._indexed = _Watermarks()
+        with self._lock:
+            self._counts: dict[str, int] = dict(
+                self._conn.execute("SELECT session_key, message_count FROM indexed_sessions").fetchall()
+            )
+
+    def index(self, session: Session, rebuild: bool = False) -> None:
+        """
+        Add a session's new messages to the index.
+
+        Args:
+            session: The session just saved.
+            rebuild: Re-index the whole session instead of only new messages.
+        """
+        start = self._counts.get(session.key, 0)
+        rewrite = rebuild
+        if not rebuild:
+            new_messages = self._indexed.new_messages(session)
+            if new_messages is not None:
+                start = session.message_count - len(new_messages)
+            elif session.key in self._indexed or start > session.message_count:
+                rewrite = True  # Earlier messages changed (e.g. the session was cleared)
+        if rewrite:
+            start = 0
+
+        rows = [
+            (m.content, session.key, seq, m.role, m.isoformat())
+            for seq, m in enumerate(session.get_messages(start), start)
+            if m.is_conversation and isinstance(m.content, str)
+        ]
+        self.writer.submit(
+            partial(self._write, session.key, rows, session.message_count, rewrite), path=self.db_path
+        )
+        self._indexed.set(session)
+        self._counts[session.key] = session.message_count
+
+    def track(self, session: Session) -> None:
+        """
+        Note a session just loaded from the store.
+
+        If the index already covers all of its messages, later saves of this
+        instance append to the index instead of rewriting the session's
+        entries (e.g. after it was evicted from the cache and reloaded).
+        """
+        if self._counts.get(session.key) == session.message_count:
+            self._indexed.set(session)
+        else:
+            self._indexed.forget(session.key)
+
+    def _write(self, key: str, rows: list[tuple], count: int, rewrite: bool) -> None:
+        """Apply one index update in a single transaction (runs on the writer thread)."""
+        with self._lock, self._conn:
+            if rewrite:
+                self._conn.execute("DELETE FROM messages_fts WHERE session_key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO messages_fts (content, session_key, seq, role, timestamp) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO indexed_sessions (session_key, message_count) VALUES (?, ?)",
+                (key, count),
+            )
+
+    def remove(self, key: str) -> None:
+        """Drop a deleted session from the index."""
+        self._indexed.forget(key)
+        self._counts.pop(key, None)
+        self.writer.flush(paths=[self.db_path])
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages_fts WHERE session_key = ?", (key,))
+            self._conn.execute("DELETE FROM indexed_sessions WHERE session_key = ?", (key,))
+
+    def search(
+        self,
+        query: str,
+        session_key: str | None = None,
+        channel: str | None = None,
+        limit: int = 20,
+        raw: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Find messages matching a query, best matches first.
+
+        Args:
+            query: Words to search for (all must match).
+            session_key: Only search this session.
+            channel: Only search sessions from this channel.
+            limit: Maximum number of results.
+            raw: Pass ``query`` through as FTS5 syntax (phrases, OR, prefix*).
+
+        Returns:
+            Dicts with ``session_key``, ``seq`` (message index), ``role``,
+            ``timestamp``, ``snippet`` (match highlighted in [brackets])
+            and ``score`` (lower is better).
+        """
+        match = query if raw else to_fts_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT session_key, seq, role, timestamp, bm25(messages_fts) AS score, "
+            "snippet(messages_fts, 0, '[', ']', '…', 16) AS snippet "
+            "FROM messages_fts WHERE messages_fts MATCH ?"
+        )
+        params: list[Any] = [match]
+        if session_key:
+            sql += " AND session_key = ?"
+            params.append(session_key)
+        elif channel:
+            sql += " AND session_key >= ? AND session_key < ?"
+            params.extend([f"{channel}:", f"{channel};"])  # ";" sorts right after ":"
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> dict[str, int]:
+        """Number of indexed sessions and messages."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            messages = self._conn.execute("SELECT COUNT(*) FROM messages_fts").fetchone()[0]
+        return {"sessions": len(self._counts), "messages": messages}
+
+    def close(self) -> None:
+        """Commit queued updates and close the database connection."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            self._conn.close()
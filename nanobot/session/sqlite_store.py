@@ -0,0 +1,223 @@
+"""SQLite session storage backend."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from nanobot.session.manager import Session
+from nanobot.session.message import Message
+from nanobot.session.store import SessionStore, _Watermarks
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    key TEXT PRIMARY KEY,
+    channel TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_channel ON sessions (channel, updated_at);
+
+CREATE TABLE IF NOT EXISTS messages (
+    session_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_key, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Stores sessions in a single SQLite database.
+
+    Uses WAL journaling so reads never block the writer, and indexes sessions
+    by key, channel and update time. Saves (new messages plus the session
+    row) are queued and committed by a BackgroundWriter, all saves queued
+    since the last commit in one transaction, so saving never blocks on disk.
+    Loading fetches only the newest ``tail_messages``; older messages are
+    fetched on demand.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        tail_messages: int = 500,
+        writer: BackgroundWriter | None = None,
+    ):
+        self.db_path = db_path
+        self.tail_messages = tail_messages
+        self.writer = writer or get_writer()
+        ensure_dir(db_path.parent)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._persisted = _Watermarks()
+        self._sizes: dict[str, int] = {}
+        self._queue: list[tuple[str, list[tuple], tuple, bool]] = []  # Saves not yet committed
+        self._queue_lock = threading.Lock()
+
+    def load(self, key: str) -> Session | None:
+        """Load a session and its newest messages."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        offset = max(0, row["message_count"] - self.tail_messages)
+        session = Session(
+            key=key,
+            messages=self._load_range(key, offset, row["message_count"]),
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+            metadata=json.loads(row["metadata"]),
+            offset=offset,
+            loader=partial(self._load_range, key),
+        )
+        self._persisted.set(session)
+        self._sizes[key] = row["size_bytes"]
+        return session
+
+    def _load_range(self, key: str, start: int, end: int) -> list[Message]:
+        """Fetch messages ``[start, end)`` (absolute indices) of a session."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM messages WHERE session_key = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (key, start, end),
+            ).fetchall()
+        return [Message.from_dict(json.loads(r["data"])) for r in rows]
+
+    def save(self, session: Session) -> None:
+        """Queue inserting new messages and upserting the session row."""
+        new_messages = self._persisted.new_messages(session)
+        rewrite = new_messages is None
+        if rewrite:
+            new_messages = session.get_messages()
+        first_seq = session.message_count - len(new_messages)
+        rows = [(session.key, first_seq + i, json.dumps(m.to_dict())) for i, m in enumerate(new_messages)]
+        size = (0 if rewrite else self._sizes.get(session.key, 0)) + sum(len(r[2]) for r in rows)
+
+        row = (
+            session.key,
+            session.key.split(":", 1)[0],
+            session.created_at.isoformat(),
+            session.updated_at.isoformat(),
+            session.message_count,
+            size,
+            json.dumps(session.metadata),
+        )
+        with self._queue_lock:
+            self._queue.append((session.key, rows, row, rewrite))
+            schedule = len(self._queue) == 1  # Otherwise a queued commit picks it up
+        if schedule:
+            self.writer.submit(self._commit, path=self.db_path)
+        self._persisted.set(session)
+        self._sizes[session.key] = size
+
+    def _commit(self) -> None:
+        """Apply every queued save in a single transaction (runs on the writer thread)."""
+        with self._queue_lock:
+            saves, self._queue = self._queue, []
+        if not saves:
+            return
+        with self._lock, self._conn:
+            for key, rows, session_row, rewrite in saves:
+                if rewrite:
+                    self._conn.execute("DELETE FROM messages WHERE session_key = ?", (key,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages (session_key, seq, data) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    """
+                    INSERT INTO sessions (key, channel, created_at, updated_at, message_count, size_bytes, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        updated_at = excluded.updated_at,
+                        message_count = excluded.message_count,
+                        size_bytes = excluded.size_bytes,
+                        metadata = excluded.metadata
+                    """,
+                    session_row,
+                )
+
+    def delete(self, key: str) -> bool:
+        """Delete a session and its messages."""
+        self._persisted.forget(key)
+        self._sizes.pop(key, None)
+        self.writer.flush(paths=[self.db_path])
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_key = ?", (key,))
+            cursor = self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def list_sessions(
+        self,
+        channel: str | None = None,
+        updated_since: datetime | None = None,
+        min_messages: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        List sessions, most recently updated first.
+
+        Args:
+            channel: Only sessions from this channel (e.g. "telegram").
+            updated_since: Only sessions updated at or after this time.
+            min_messages: Only sessions with at least this many messages.
+            limit: Maximum number of sessions to return.
+        """
+        query = "SELECT key, channel, created_at, updated_at, message_count, size_bytes FROM sessions"
+        clauses, params = [], []
+        if channel:
+            clauses.append("channel = ?")
+            params.append(channel)
+        if updated_since:
+            clauses.append("updated_at >= ?")
+            params.append(updated_since.isoformat())
+        if min_messages:
+            clauses.append("message_count >= ?")
+            params.append(min_messages)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY updated_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> dict[str, int]:
+        """Session, message and byte totals."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0), COALESCE(SUM(size_bytes), 0) FROM sessions"
+            ).fetchone()
+        return {"sessions": row[0], "messages": row[1], "bytes": row[2]}
+
+    def flush(self) -> None:
+        """Wait until all queued transactions are committed."""
+        self.writer.flush(paths=[self.db_path])
+
+    def close(self) -> None:
+        """Commit queued transactions and close the database connection."""
+        self.writer.flush(paths=[self.db_path])
+        with self._lock:
+            self._conn.close()
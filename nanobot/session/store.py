@@ -0,0 +1,525 @@
+"""Session storage backends."""
+
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+from nanobot.session.manifest import SessionManifest
+from nanobot.session.message import Message
+from nanobot.utils.helpers import ensure_dir, read_lines_backwards, safe_filename
+from nanobot.utils.writer import BackgroundWriter, get_writer
+
+# Prefix of every metadata record line (json.dumps keeps key order)
+METADATA_PREFIX = '{"_type": "metadata"'
+
+# Session index kept alongside the session files (not *.jsonl, so never mistaken for one)
+MANIFEST_FILENAME = "manifest.log"
+
+
+class SessionStore(ABC):
+    """
+    Abstract persistence backend for sessions.
+
+    Stores are incremental: ``save`` is called after every turn and should
+    only write what changed since the session was last loaded or saved.
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> Session | None:
+        """Load a session, or return None if it does not exist."""
+        pass
+
+    @abstractmethod
+    def save(self, session: Session) -> None:
+        """Persist a session."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+        pass
+
+    @abstractmethod
+    def list_sessions(
+        self,
+        channel: str | None = None,
+        updated_since: datetime | None = None,
+        min_messages: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        List stored sessions, most recently updated first.
+
+        Args:
+            channel: Only sessions from this channel (e.g. "telegram").
+            updated_since: Only sessions updated at or after this time.
+            min_messages: Only sessions with at least this many messages.
+            limit: Maximum number of sessions to return.
+
+        Returns:
+            Dicts with at least ``key``, ``created_at``, ``updated_at``,
+            ``message_count`` and ``size_bytes``.
+        """
+        pass
+
+    def stats(self) -> dict[str, int]:
+        """Number of sessions and total messages and bytes stored."""
+        sessions = self.list_sessions()
+        return {
+            "sessions": len(sessions),
+            "messages": sum(s.get("message_count") or 0 for s in sessions),
+            "bytes": sum(s.get("size_bytes") or 0 for s in sessions),
+        }
+
+    def flush(self) -> None:
+        """Wait until all saved data is durably written."""
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+        pass
+
+
+class _Watermarks:
+    """Tracks how much of each session a store has already persisted."""
+
+    def __init__(self):
+        self._marks: dict[str, tuple[int, Message | None]] = {}
+
+    def set(self, session: Session) -> None:
+        """Record that everything in the session is persisted."""
+        self._marks[session.key] = (
+            session.message_count,
+            session.messages[-1] if session.messages else None,
+        )
+
+    def new_messages(self, session: Session) -> list[Message] | None:
+        """
+        Messages added since the last save, or None if earlier messages
+        changed (e.g. the session was cleared) and it must be rewritten.
+        """
+        mark = self._marks.get(session.key)
+        if mark is None:
+            return None
+        count, last = mark
+        if session.message_count < count:
+            return None
+        if count:
+            index = count - 1 - session.offset
+            if not 0 <= index < len(session.messages) or session.messages[index] is not last:
+                return None
+        return session.messages[count - session.offset:]
+
+    def forget(self, key: str) -> None:
+        """Drop the watermark for a session."""
+        self._marks.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._marks
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    Stores each session as an append-only JSONL file.
+
+    Each save appends only the new messages, plus a metadata record when the
+    session's metadata changed or ``CHECKPOINT_MESSAGES`` messages were
+    appended since the last one; the last metadata record in a file wins and
+    messages after it are counted on load. Files are rewritten (compacted)
+    once superseded metadata records take up more bytes than the live data.
+
+    Loading reads the file backwards and keeps only the newest
+    ``tail_messages`` (reading at most ``CHECKPOINT_MESSAGES`` more to reach
+    a metadata record); older messages are read on demand. Writes go through
+    a BackgroundWriter so saving never blocks on disk. Listing is answered
+    from a SessionManifest updated on every save, not by reading the files.
+    """
+
+    # Bytes of stale records tolerated before a file is compacted, at minimum
+    COMPACT_MIN_STALE_BYTES = 64 * 1024
+
+    # Messages appended before a metadata record is repeated, which bounds
+    # how far past the tail loading has to read
+    CHECKPOINT_MESSAGES = 64
+
+    def __init__(
+        self,
+        sessions_dir: Path,
+        tail_messages: int = 500,
+        writer: BackgroundWriter | None = None,
+    ):
+        self.sessions_dir = ensure_dir(sessions_dir)
+        self.tail_messages = tail_messages
+        self.writer = writer or get_writer()
+        self._persisted = _Watermarks()
+        self._stale: dict[str, int] = {}  # Bytes of superseded metadata records
+        # Last metadata state, its record size and the messages appended since
+        self._written: dict[str, tuple[str, int, int]] = {}
+        self.writer.flush(paths=[self.sessions_dir])
+        self.manifest = SessionManifest(self.sessions_dir / MANIFEST_FILENAME, self.writer)
+        if not self.manifest.loaded:
+            self.manifest.rebuild(self._scan_sessions())
+
+    def _get_session_path(self, key: str) -> Path:
+        """Get the file path for a session."""
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.sessions_dir / f"{safe_key}.jsonl"
+
+    def load(self, key: str) -> Session | None:
+        """Load a session from disk (metadata and newest messages only, when possible)."""
+        path = self._get_session_path(key)
+        self.writer.flush(paths=[path])
+
+        if not path.exists():
+            return None
+
+        try:
+            session = self._load_tail(key, path)
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError):
+            session = None  # e.g. a torn final write; the full read below recovers
+        return session or self._load_full(key, path)
+
+    def _load_tail(self, key: str, path: Path) -> Session | None:
+        """
+        Load the last metadata record and the newest messages, reading backwards.
+
+        Returns None when that would mean reading the whole file anyway, or
+        when the file predates ``message_count`` in metadata records.
+        """
+        tail: list[Message] = []  # newest first
+        record = None
+        record_size = 0
+        trailing = 0  # messages written after the last metadata record
+        skipped = 0  # newer messages beyond the tail, counted but not parsed
+
+        for line in read_lines_backwards(path):
+            if not line.strip():
+                continue
+            if line.startswith(METADATA_PREFIX.encode()):
+                if record is None:
+                    record, record_size, trailing = json.loads(line), len(line) + 1, skipped + len(tail)
+                continue
+            if len(tail) >= self.tail_messages:
+                if record is not None:
+                    break
+                skipped += 1
+                continue
+            tail.append(Message.from_dict(json.loads(line)))
+        else:
+            return None
+
+        if "message_count" not in record:
+            return None
+        offset = record["message_count"] + trailing - len(tail)
+        if offset < 0:
+            return None
+
+        tail.reverse()
+        created_at = datetime.fromisoformat(record["created_at"]) if record.get("created_at") else datetime.now()
+        session = Session(
+            key=key,
+            messages=tail,
+            created_at=created_at,
+            updated_at=self._updated_at(record, tail[-1] if trailing and tail else None) or created_at,
+            metadata=record.get("metadata", {}),
+            offset=offset,
+            loader=partial(self._load_range, key),
+        )
+        self._persisted.set(session)
+        self._written[key] = (self._metadata_state(session), record_size, trailing)
+        self._stale[key] = 0  # Unknown without a full scan; counting restarts here
+        return session
+
+    def _load_range(self, key: str, start: int, end: int) -> list[Message]:
+        """Read messages ``[start, end)`` (absolute indices) from a session file."""
+        messages = []
+        index = 0
+        path = self._get_session_path(key)
+        self.writer.flush(paths=[path])
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith(METADATA_PREFIX):
+                    continue
+                if index >= end:
+                    break
+                if index >= start:
+                    messages.append(Message.from_dict(json.loads(line)))
+                index += 1
+        return messages
+
+    def _load_full(self, key: str, path: Path) -> Session | None:
+        """Load a session by reading its whole file."""
+        try:
+            messages = []
+            metadata = {}
+            created_at = None
+            record: dict[str, Any] = {}
+            record_size = 0
+            stale = 0
+            trailing = 0
+            header = False  # Last record is the first line (older compacted files)
+            corrupt = False
+
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final write; everything before it is intact
+                        logger.warning(f"Skipping corrupt record in session {key}")
+                        corrupt = True
+                        continue
+
+                    if data.get("_type") == "metadata":
+                        stale += record_size
+                        record, record_size, trailing = data, len(line.encode("utf-8")) + 1, 0
+                        header = not messages and not stale
+                        metadata = data.get("metadata", {})
+                        if data.get("created_at"):
+                            created_at = datetime.fromisoformat(data["created_at"])
+                    else:
+                        messages.append(Message.from_dict(data))
+                        trailing += 1
+
+            session = Session(
+                key=key,
+                messages=messages,
+                created_at=created_at or datetime.now(),
+                updated_at=(
+                    self._updated_at(record, messages[-1] if trailing and not header else None)
+                    or created_at or datetime.now()
+                ),
+                metadata=metadata
+            )
+            # A corrupt file is rewritten on the next save rather than appended to
+            if not corrupt:
+                self._persisted.set(session)
+                self._written[key] = (self._metadata_state(session), record_size, trailing)
+                self._stale[key] = stale
+            return session
+        except Exception as e:
+            logger.warning(f"Failed to load session {key}: {e}")
+            return None
+
+    def save(self, session: Session) -> None:
+        """
+        Save a session to disk.
+
+        Appends the messages added since the last save, and a metadata record
+        only if the session's metadata changed or a checkpoint is due. The file is rewritten instead
+        when the session's earlier messages changed (e.g. it was cleared) or
+        when superseded metadata records outweigh the live data.
+        """
+        key = session.key
+        new_messages = self._persisted.new_messages(session)
+        if new_messages is None:
+            self.compact(session)
+            return
+
+        entry = self.manifest.get(key)
+        size = entry["size_bytes"] if entry else 0
+        stale = self._stale.get(key, 0)
+        state = self._metadata_state(session)
+        written = self._written.get(key)
+
+        lines = [json.dumps(msg.to_dict()) + "\n" for msg in new_messages]
+        since = (written[2] if written else 0) + len(new_messages)
+        if written is None or written[0] != state or since >= self.CHECKPOINT_MESSAGES:
+            record = json.dumps(self._metadata_record(session)) + "\n"
+            lines.append(record)
+            stale += written[1] if written else 0
+            written = (state, len(record.encode("utf-8")), 0)
+            if stale > max(self.COMPACT_MIN_STALE_BYTES, size - stale):
+                self.compact(session)
+                return
+        else:
+            written = (state, written[1], since)
+
+        data = "".join(lines)
+        if data:
+            self.writer.append(self._get_session_path(key), data)
+        self._persisted.set(session)
+        self._written[key] = written
+        self._stale[key] = stale
+        self._index(session, size + len(data.encode("utf-8")))
+
+    def compact(self, session: Session) -> None:
+        """Rewrite a session file from scratch (atomically, in the background)."""
+        # Messages (including any not loaded yet), then the metadata record,
+        # so the file reads like one long sequence of saves
+        record = json.dumps(self._metadata_record(session)) + "\n"
+        lines = [json.dumps(msg.to_dict()) + "\n" for msg in session.get_messages()]
+        lines.append(record)
+        data = "".join(lines)
+        self.writer.write(self._get_session_path(session.key), data)
+
+        self._persisted.set(session)
+        self._written[session.key] = (self._metadata_state(session), len(record.encode("utf-8")), 0)
+        self._stale[session.key] = 0
+        self._index(session, len(data.encode("utf-8")))
+
+    def _index(self, session: Session, size_bytes: int) -> None:
+        """Update the manifest entry for a saved session."""
+        self.manifest.update(
+            session.key,
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            message_count=session.message_count,
+            size_bytes=size_bytes,
+        )
+
+    def flush(self) -> None:
+        """Wait until all queued session writes are on disk."""
+        self.writer.flush(paths=[self.sessions_dir])
+
+    @staticmethod
+    def _metadata_state(session: Session) -> str:
+        """The parts of a metadata record that are not derivable from the messages."""
+        return json.dumps([session.created_at.isoformat(), session.metadata])
+
+    @staticmethod
+    def _updated_at(record: dict[str, Any], newest: Message | None) -> datetime | None:
+        """Last update time: the metadata record's, or the newest message written after it."""
+        updated_at = datetime.fromisoformat(record["updated_at"]) if record.get("updated_at") else None
+        if newest is not None:
+            written = datetime.fromtimestamp(newest.timestamp)
+            if updated_at is None or written > updated_at:
+                updated_at = written
+        return updated_at
+
+    @staticmethod
+    def _metadata_record(session: Session) -> dict[str, Any]:
+        """Build the metadata record written alongside a session's messages."""
+        return {
+            "_type": "metadata",
+            "key": session.key,
+            "created_at": session.created_at.isoformat(),
+            "updated_at": session.updated_at.isoformat(),
+            "metadata": session.metadata,
+            "message_count": session.message_count,
+        }
+
+    def delete(self, key: str) -> bool:
+        """Delete a session file."""
+        self._persisted.forget(key)
+        self._stale.pop(key, None)
+        self._written.pop(key, None)
+        self.manifest.remove(key)
+
+        path = self._get_session_path(key)
+        self.writer.flush(paths=[path])
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def list_sessions(
+        self,
+        channel: str | None = None,
+        updated_since: datetime | None = None,
+        min_messages: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """List sessions from the manifest, most recently updated first."""
+        sessions = self.manifest.entries(channel, updated_since, min_messages, limit)
+        for info in sessions:
+            info["path"] = str(self._get_session_path(info["key"]))
+        return sessions
+
+    def stats(self) -> dict[str, int]:
+        """Session, message and byte totals from the manifest."""
+        return self.manifest.stats()
+
+    def rebuild_manifest(self) -> int:
+        """Re-index all session files from disk. Returns the number of sessions found."""
+        self.writer.flush(paths=[self.sessions_dir])
+        entries = self._scan_sessions()
+        self.manifest.rebuild(entries)
+        return len(entries)
+
+    def _scan_sessions(self) -> list[dict[str, Any]]:
+        """Build manifest entries by reading every session file."""
+        sessions = []
+
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                data = self._read_last_metadata(path)
+                if data is None:
+                    continue
+                key = data.get("key") or path.stem.replace("_", ":")
+                sessions.append({
+                    "key": key,
+                    "channel": key.split(":", 1)[0],
+                    "created_at": data.get("created_at"),
+                    "updated_at": data.get("updated_at"),
+                    "message_count": data.get("message_count"),
+                    "size_bytes": path.stat().st_size,
+                })
+            except Exception:
+                continue
+
+        return sessions
+
+    @classmethod
+    def _read_last_metadata(cls, path: Path) -> dict[str, Any] | None:
+        """
+        Find the newest metadata record, reading the file backwards.
+
+        Its ``message_count`` and ``updated_at`` are brought up to date with
+        the messages appended after it, unless it is a header record (the
+        first line of a file compacted before records moved to the end).
+        """
+        newest = None
+        trailing = 0
+        lines = read_lines_backwards(path)
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                if not line.startswith(METADATA_PREFIX.encode()):
+                    if newest is None:
+                        newest = Message.from_dict(json.loads(line))
+                    trailing += 1
+                    continue
+                data = json.loads(line)
+            except (json.JSONDecodeError, KeyError):
+                continue
+            if trailing and any(earlier.strip() for earlier in lines):
+                data["message_count"] = (data.get("message_count") or 0) + trailing
+                updated_at = cls._updated_at(data, newest)
+                data["updated_at"] = updated_at.isoformat() if updated_at else None
+            return data
+        return None
+
+
+def create_session_store(backend: str = "jsonl", path: Path | None = None) -> SessionStore:
+    """
+    Create a session store by backend name.
+
+    Args:
+        backend: "jsonl" (one file per session) or "sqlite".
+        path: Sessions directory (jsonl) or database file (sqlite);
+            defaults to a location under ~/.nanobot.
+
+    Returns:
+        The session store.
+    """
+    from nanobot.utils.helpers import get_data_path
+
+    if backend == "jsonl":
+        return JsonlSessionStore(path or get_data_path() / "sessions")
+    if backend == "sqlite":
+        from nanobot.session.sqlite_store import SQLiteSessionStore
+        return SQLiteSessionStore(path or get_data_path() / "sessions.db")
+    raise ValueError(f"Unknown session backend: {backend}")
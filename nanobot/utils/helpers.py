@@ -1,5 +1,6 @@
 """Utility functions for nanobot."""
 
+from collections.abc import Iterator
 from pathlib import Path
 from datetime import datetime
 
@@ -49,6 +50,82 @@ def get_skills_path(workspace: Path | None = None) -> Path:
     return ensure_dir(ws / "skills")
 
 
+def file_signature(*paths: Path) -> tuple:
+    """
+    Cheap change-detection key for a set of files.
+    
+    Args:
+        paths: Files (or directories) to fingerprint.
+    
+    Returns:
+        A tuple of (path, mtime_ns, size) per path, with None values for
+        missing paths, so it changes whenever any path is created,
+        modified or removed.
+    """
+    sig = []
+    for path in paths:
+        try:
+            st = path.stat()
+            sig.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((str(path), None, None))
+    return tuple(sig)
+
+
+class FileCache:
+    """
+    Text file reader that re-reads a file only when its mtime/size change.
+    """
+    
+    def __init__(self):
+        self._entries: dict[Path, tuple[tuple, str]] = {}  # path -> (signature, content)
+    
+    def read(self, path: Path) -> str | None:
+        """
+        Read a file, reusing the cached content while it is unchanged.
+        
+        Args:
+            path: File to read.
+        
+        Returns:
+            The file content, or None if it does not exist.
+        """
+        sig = file_signature(path)
+        cached = self._entries.get(path)
+        if cached and cached[0] == sig:
+            return cached[1]
+        if sig[0][1] is None:
+            self._entries.pop(path, None)
+            return None
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+        self._entries[path] = (sig, content)
+        return content
+
+
+def read_lines_backwards(path: Path, block_size: int = 65536) -> Iterator[bytes]:
+    """
+    Yield the lines of a file from last to first, reading it in blocks.
+    
+    Only as much of the file is read as the caller consumes, so finding
+    the last few records of a large log costs O(records), not O(file).
+    """
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        pos = f.tell()
+        remainder = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            yield from reversed(lines)
+        yield remainder
+
+
 def today_date() -> str:
     """Get today's date in YYYY-MM-DD format."""
     return datetime.now().strftime("%Y-%m-%d")
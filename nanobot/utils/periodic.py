@@ -0,0 +1,62 @@
+"""Base class for background services that run a task at a fixed interval."""
+
+import asyncio
+from abc import ABC, abstractmethod
+
+from loguru import logger
+
+
+class PeriodicService(ABC):
+    """
+    Runs ``tick()`` every ``interval_s`` seconds on the event loop.
+
+    The first tick comes ``initial_delay_s`` after ``start()`` (default: one
+    full interval). Errors are logged and the loop carries on; ``stop()``
+    cancels it, including a tick in progress.
+    """
+
+    # Used in log messages, e.g. "Heartbeat started (every 1800s)"
+    name = "Periodic service"
+
+    def __init__(self, interval_s: float, enabled: bool = True, initial_delay_s: float | None = None):
+        self.interval_s = interval_s
+        self.enabled = enabled
+        self.initial_delay_s = interval_s if initial_delay_s is None else initial_delay_s
+        self._running = False
+        self._task: asyncio.Task | None = None
+
+    @abstractmethod
+    async def tick(self) -> None:
+        """Do one run of the service's work."""
+        pass
+
+    async def start(self) -> None:
+        """Start the service."""
+        if not self.enabled:
+            logger.info(f"{self.name} disabled")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"{self.name} started (every {self.interval_s}s)")
+
+    def stop(self) -> None:
+        """Stop the service."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_loop(self) -> None:
+        """Main loop: wait, tick, repeat."""
+        delay = self.initial_delay_s
+        while self._running:
+            try:
+                await asyncio.sleep(delay)
+                delay = self.interval_s
+                if self._running:
+                    await self.tick()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"{self.name} error: {e}")
@@ -0,0 +1,85 @@
+"""Token counting and model context-window helpers."""
+
+from functools import lru_cache
+from typing import Any
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its encoding file unavailable
+    _ENCODING = None
+
+# Per-message framing overhead (role, separators) added by chat formats
+MESSAGE_OVERHEAD = 4
+
+# Flat estimate for a non-text content block (e.g. an image)
+MEDIA_BLOCK_TOKENS = 1000
+
+# Context windows by model-name substring; first match wins
+_CONTEXT_WINDOWS: list[tuple[str, int]] = [
+    ("claude", 200_000),
+    ("gemini", 1_000_000),
+    ("gpt-4.1", 1_000_000),
+    ("gpt-4o", 128_000),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-5", 400_000),
+    ("gpt-4", 8_192),
+    ("gpt-3.5", 16_385),
+    ("glm", 128_000),
+    ("llama", 128_000),
+    ("deepseek", 64_000),
+    ("mixtral", 32_000),
+    ("o1", 200_000),
+    ("o3", 200_000),
+    ("o4", 200_000),
+]
+DEFAULT_CONTEXT_WINDOW = 32_000
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a string.
+
+    Uses tiktoken's cl100k encoding when available, otherwise estimates from
+    the UTF-8 length (about four bytes per token, which stays conservative
+    for non-Latin scripts). Results are cached per string, so re-counting
+    the same history on every turn is cheap.
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def message_tokens(message: dict[str, Any]) -> int:
+    """Estimate the tokens a chat message occupies in the prompt."""
+    total = MESSAGE_OVERHEAD
+    content = message.get("content")
+    if isinstance(content, str):
+        total += count_tokens(content)
+    elif isinstance(content, list):
+        for block in content:
+            if block.get("type") == "text":
+                total += count_tokens(block.get("text", ""))
+            else:
+                total += MEDIA_BLOCK_TOKENS
+    for call in message.get("tool_calls") or []:
+        function = call.get("function", {})
+        total += count_tokens(function.get("name", "")) + count_tokens(function.get("arguments", ""))
+    return total
+
+
+def messages_tokens(messages: list[dict[str, Any]]) -> int:
+    """Estimate the total prompt tokens for a list of messages."""
+    return sum(message_tokens(m) for m in messages)
+
+
+def context_window(model: str) -> int:
+    """Return the context window (in tokens) for a model name."""
+    name = model.lower()
+    for key, window in _CONTEXT_WINDOWS:
+        if key in name:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
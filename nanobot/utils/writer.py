@@ -0,0 +1,210 @@
+"""Background writer: moves file I/O off the asyncio event loop."""
+
+import atexit
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+
+@dataclass
+class _PendingWrite:
+    """Coalesced pending data for one file."""
+    replace: bool  # True: the data is the whole new content; False: append it
+    chunks: list[str] = field(default_factory=list)
+    data: bytes | None = None  # Binary data (used instead of chunks)
+
+
+class BackgroundWriter:
+    """
+    Performs file writes on a dedicated thread.
+
+    Writes to the same file are coalesced while they wait: a full write
+    supersedes everything queued before it and appends are concatenated.
+    Each batch is group-committed with one fsync per file. Callers that
+    read files they also write through the writer should ``flush()`` first,
+    ideally restricted to those files so unrelated writes are not waited for.
+    """
+
+    def __init__(self, fsync: bool = True, name: str = "nanobot-writer"):
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._pending: dict[Path, _PendingWrite] = {}
+        self._calls: list[tuple[Path | None, Callable[[], None]]] = []
+        self._busy = False
+        self._writing: set[Path] = set()  # Files in the batch being written
+        self._closed = False
+        self.batches = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, data: str) -> None:
+        """Queue replacing a file's content (applied atomically via a temp file)."""
+        with self._cond:
+            self._check_open()
+            if path in self._pending:
+                self.coalesced += 1
+            self._pending[path] = _PendingWrite(replace=True, chunks=[data])
+            self._cond.notify()
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        """Queue replacing a file's content with binary data."""
+        with self._cond:
+            self._check_open()
+            if path in self._pending:
+                self.coalesced += 1
+            self._pending[path] = _PendingWrite(replace=True, data=data)
+            self._cond.notify()
+
+    def append(self, path: Path, data: str) -> None:
+        """Queue appending to a file."""
+        with self._cond:
+            self._check_open()
+            pending = self._pending.get(path)
+            if pending is not None and pending.data is not None:
+                raise ValueError(f"Cannot append text to pending binary write of {path}")
+            if pending is None:
+                self._pending[path] = _PendingWrite(replace=False, chunks=[data])
+            else:
+                pending.chunks.append(data)
+                self.coalesced += 1
+            self._cond.notify()
+
+    def append_bytes(self, path: Path, data: bytes) -> None:
+        """Queue appending binary data to a file."""
+        with self._cond:
+            self._check_open()
+            pending = self._pending.get(path)
+            if pending is not None and pending.data is None:
+                raise ValueError(f"Cannot append binary data to pending text write of {path}")
+            if pending is None:
+                self._pending[path] = _PendingWrite(replace=False, data=data)
+            else:
+                pending.data += data
+                self.coalesced += 1
+            self._cond.notify()
+
+    def submit(self, fn: Callable[[], None], path: Path | None = None) -> None:
+        """
+        Queue an arbitrary blocking operation (run in submission order).
+
+        Args:
+            fn: The operation.
+            path: File the operation writes (e.g. a database), so that
+                ``flush(paths=...)`` naming it waits for the operation.
+        """
+        with self._cond:
+            self._check_open()
+            self._calls.append((path, fn))
+            self._cond.notify()
+
+    def flush(self, timeout: float | None = None, paths: Iterable[Path] | None = None) -> bool:
+        """
+        Block until everything queued so far is on disk.
+
+        Args:
+            timeout: Seconds to wait at most (None: no limit).
+            paths: Only wait for writes to these files, or to files inside
+                these directories (including operations submitted with a
+                ``path`` among them).
+
+        Returns:
+            False if the timeout expired first.
+        """
+        if threading.current_thread() is self._thread:
+            return True  # Called from a submitted operation; the batch is already running
+        with self._cond:
+            if paths is None:
+                return self._cond.wait_for(
+                    lambda: not (self._pending or self._calls or self._busy), timeout
+                )
+            targets = set(paths)
+            return self._cond.wait_for(
+                lambda: not any(
+                    path in targets or not targets.isdisjoint(path.parents)
+                    for path in (*self._pending, *self._writing, *(p for p, _ in self._calls if p))
+                ),
+                timeout,
+            )
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+
+    def _run(self) -> None:
+        """Writer thread: take everything queued as one batch and write it."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._calls or self._closed)
+                if not (self._pending or self._calls):
+                    return  # Closed and drained
+                batch, self._pending = self._pending, {}
+                calls, self._calls = self._calls, []
+                self._busy = True
+                self._writing = set(batch) | {p for p, _ in calls if p}
+
+            for path, pending in batch.items():
+                try:
+                    self._apply(path, pending)
+                except Exception as e:
+                    logger.error(f"Background write to {path} failed: {e}")
+            for _, fn in calls:
+                try:
+                    fn()
+                except Exception as e:
+                    logger.error(f"Background write operation failed: {e}")
+
+            with self._cond:
+                self.batches += 1
+                self._busy = False
+                self._writing = set()
+                self._cond.notify_all()
+
+    def _apply(self, path: Path, pending: _PendingWrite) -> None:
+        """Write one file's coalesced data with a single fsync."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = pending.data if pending.data is not None else "".join(pending.chunks).encode("utf-8")
+        if not pending.replace:
+            with open(path, "ab") as f:
+                f.write(data)
+                self._sync(f)
+            return
+
+        tmp = path.with_name(f"{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            self._sync(f)
+        os.replace(tmp, path)
+
+    def _sync(self, f) -> None:
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+_default_writer: BackgroundWriter | None = None
+_default_lock = threading.Lock()
+
+
+def get_writer() -> BackgroundWriter:
+    """Get the shared background writer (flushed automatically at exit)."""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = BackgroundWriter()
+            atexit.register(_default_writer.close)
+        return _default_writer
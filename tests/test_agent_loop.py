@@ -0,0 +1,360 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.base import Tool
+from nanobot.bus.events import InboundMessage, OutboundDelta
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamChunk, ToolCallRequest
+
+
+class EchoProvider(LLMProvider):
+    """Replies with the last user message after a short delay, recording overlap."""
+
+    def __init__(self, delay: float = 0.05):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.order: list[str] = []
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        text = messages[-1]["content"]
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        self.order.append(text)
+        return LLMResponse(content=f"echo: {text}")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _make_loop(tmp_path: Path, provider: LLMProvider, **kwargs: Any) -> tuple[AgentLoop, MessageBus]:
+    bus = MessageBus()
+    loop = AgentLoop(bus=bus, provider=provider, workspace=tmp_path / "ws", **kwargs)
+    return loop, bus
+
+
+async def _collect(bus: MessageBus, count: int) -> list[str]:
+    """Collect the next `count` complete replies, skipping streamed deltas."""
+    out = []
+    while len(out) < count:
+        msg = await asyncio.wait_for(bus.consume_outbound(), timeout=5)
+        if not isinstance(msg, OutboundDelta):
+            out.append(f"{msg.chat_id}:{msg.content}")
+    return out
+
+
+async def test_different_sessions_run_concurrently(tmp_path: Path) -> None:
+    provider = EchoProvider()
+    loop, bus = _make_loop(tmp_path, provider, max_concurrent_turns=3)
+    runner = asyncio.create_task(loop.run())
+    for i in range(3):
+        await bus.publish_inbound(InboundMessage("telegram", "u", f"chat{i}", f"hi {i}"))
+    replies = await _collect(bus, 3)
+    loop.stop()
+    await runner
+
+    assert provider.max_active == 3
+    assert sorted(replies) == [f"chat{i}:echo: hi {i}" for i in range(3)]
+
+
+async def test_same_session_stays_ordered(tmp_path: Path) -> None:
+    provider = EchoProvider()
+    loop, bus = _make_loop(tmp_path, provider, max_concurrent_turns=4)
+    runner = asyncio.create_task(loop.run())
+    for i in range(3):
+        await bus.publish_inbound(InboundMessage("telegram", "u", "chat", f"m{i}"))
+    replies = await _collect(bus, 3)
+    loop.stop()
+    await runner
+
+    assert provider.max_active == 1
+    assert provider.order == ["m0", "m1", "m2"]
+    assert replies == ["chat:echo: m0", "chat:echo: m1", "chat:echo: m2"]
+
+
+async def test_concurrency_cap_is_respected(tmp_path: Path) -> None:
+    provider = EchoProvider()
+    loop, bus = _make_loop(tmp_path, provider, max_concurrent_turns=2)
+    runner = asyncio.create_task(loop.run())
+    for i in range(5):
+        await bus.publish_inbound(InboundMessage("whatsapp", "u", f"c{i}", "x"))
+    await _collect(bus, 5)
+    loop.stop()
+    await runner
+
+    assert provider.max_active == 2
+    assert loop.active_sessions == 0
+
+
+async def test_message_tool_context_is_turn_scoped(tmp_path: Path) -> None:
+    loop, bus = _make_loop(tmp_path, EchoProvider())
+    tool = loop.tools.get("message")
+
+    async def turn(chat_id: str) -> None:
+        tool.set_context("telegram", chat_id)
+        await asyncio.sleep(0.01)  # let the other turn overwrite a shared context
+        await tool.execute(content=f"to {chat_id}")
+
+    await asyncio.gather(turn("a"), turn("b"))
+    assert sorted(await _collect(bus, 2)) == ["a:to a", "b:to b"]
+
+
+async def test_memory_tools_append_and_search(tmp_path: Path) -> None:
+    loop, _ = _make_loop(tmp_path, EchoProvider())
+    memory = loop.context.memory
+    memory.memory_file.write_text("# Long-term Memory\n\n## Preferences\n\n(User preferences)\n\n## Notes\n")
+
+    append = loop.tools.get("memory_append")
+    await append.execute(content="- Prefers oolong tea", target="long_term", section="preferences")
+    await append.execute(content="- Avoids coffee", target="long_term", section="Preferences")
+    assert await append.execute(content="- Avoids coffee", target="long_term", section="Preferences") == (
+        "Already in long-term memory"
+    )
+    await append.execute(content="Booked flights to Lisbon")
+
+    assert memory.read_long_term() == (
+        "# Long-term Memory\n\n## Preferences\n\n- Prefers oolong tea\n- Avoids coffee\n\n## Notes\n"
+    )
+    assert "Booked flights to Lisbon" in memory.read_today()
+
+    search = loop.tools.get("memory_search")
+    assert (await search.execute(query="tea")).startswith("[MEMORY.md › Preferences]\n- Prefers oolong tea")
+    assert "Lisbon" in await search.execute(query="lisbon flights")
+    assert await search.execute(query="submarine") == "No memories found for: submarine"
+
+
+class ChunkedProvider(EchoProvider):
+    """Streams its reply word by word."""
+
+    async def chat_stream(self, messages: list[dict[str, Any]], **kwargs: Any):
+        words = ["Hello", " there", "!"]
+        for word in words:
+            yield StreamChunk(delta=word)
+        yield StreamChunk(response=LLMResponse(content="".join(words)))
+
+
+async def test_replies_stream_as_deltas_then_final_message(tmp_path: Path) -> None:
+    loop, bus = _make_loop(tmp_path, ChunkedProvider(), stream=True)
+    runner = asyncio.create_task(loop.run())
+    await bus.publish_inbound(InboundMessage("telegram", "u", "42", "hi"))
+
+    deltas = []
+    while True:
+        msg = await asyncio.wait_for(bus.consume_outbound(), timeout=5)
+        if not isinstance(msg, OutboundDelta):
+            break
+        deltas.append(msg)
+    loop.stop()
+    await runner
+
+    assert [d.delta for d in deltas] == ["Hello", " there", "!"]
+    assert {d.stream_id for d in deltas} == {msg.metadata["stream_id"]}
+    assert (deltas[0].channel, deltas[0].chat_id) == ("telegram", "42")
+    assert msg.content == "Hello there!"
+
+
+class FailingStreamProvider(EchoProvider):
+    """Streams part of a reply, then fails."""
+
+    async def chat_stream(self, messages: list[dict[str, Any]], **kwargs: Any):
+        yield StreamChunk(delta="Hel")
+        raise RuntimeError("connection reset")
+
+
+async def test_failed_turn_finalizes_streamed_preview(tmp_path: Path) -> None:
+    loop, bus = _make_loop(tmp_path, FailingStreamProvider(), stream=True)
+    runner = asyncio.create_task(loop.run())
+    await bus.publish_inbound(InboundMessage("telegram", "u", "42", "hi"))
+
+    delta = await asyncio.wait_for(bus.consume_outbound(), timeout=5)
+    error = await asyncio.wait_for(bus.consume_outbound(), timeout=5)
+    loop.stop()
+    await runner
+
+    assert isinstance(delta, OutboundDelta)
+    assert error.metadata["stream_id"] == delta.stream_id
+    assert "connection reset" in error.content
+
+
+async def test_process_direct_streams_to_callback(tmp_path: Path) -> None:
+    loop, _ = _make_loop(tmp_path, ChunkedProvider())
+    received: list[str] = []
+
+    async def on_delta(delta: str) -> None:
+        received.append(delta)
+
+    reply = await loop.process_direct("hi", on_delta=on_delta)
+    assert reply == "Hello there!"
+    assert "".join(received) == reply
+
+
+class ProbeTool(Tool):
+    name = "probe"
+    description = "records that it ran"
+    parameters = {"type": "object", "properties": {}}
+    read_only = True
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.started.set()
+        return "probed"
+
+
+class EarlyToolProvider(EchoProvider):
+    """Streams a tool call, then keeps generating until the tool has started."""
+
+    def __init__(self, tool: ProbeTool):
+        super().__init__()
+        self.tool = tool
+        self.started_mid_stream = False
+        self.seen_results: list[str] = []
+
+    async def chat_stream(self, messages: list[dict[str, Any]], **kwargs: Any):
+        if messages[-1]["role"] == "tool":
+            self.seen_results.append(messages[-1]["content"])
+            yield StreamChunk(response=LLMResponse(content="done"))
+            return
+        call = ToolCallRequest(id="call_1", name="probe", arguments={})
+        yield StreamChunk(tool_call=call)
+        try:
+            await asyncio.wait_for(self.tool.started.wait(), timeout=1)
+            self.started_mid_stream = True
+        except asyncio.TimeoutError:
+            pass
+        yield StreamChunk(delta="trailing text")
+        yield StreamChunk(response=LLMResponse(content="trailing text", tool_calls=[call]))
+
+
+async def test_tool_calls_start_before_stream_ends(tmp_path: Path) -> None:
+    tool = ProbeTool()
+    provider = EarlyToolProvider(tool)
+    loop, _ = _make_loop(tmp_path, provider)
+    loop.tools.register(tool)
+
+    reply = await loop.process_direct("go")
+    assert reply == "done"
+    assert provider.started_mid_stream
+    assert provider.seen_results == ["probed"]
+
+
+class SlowWriteTool(Tool):
+    name = "slow_write"
+    description = "takes a while to write"
+    parameters = {"type": "object", "properties": {}}
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.finished = False
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.started.set()
+        await asyncio.sleep(0.05)
+        self.finished = True
+        return "written"
+
+
+class AbandonedToolProvider(EchoProvider):
+    """Streams a tool call, waits for it to start, then fails the response."""
+
+    def __init__(self, tool: SlowWriteTool):
+        super().__init__()
+        self.tool = tool
+
+    async def chat_stream(self, messages: list[dict[str, Any]], **kwargs: Any):
+        yield StreamChunk(tool_call=ToolCallRequest(id="call_1", name="slow_write", arguments={}))
+        await asyncio.wait_for(self.tool.started.wait(), timeout=1)
+        yield StreamChunk(response=LLMResponse(content="Error calling LLM: boom", finish_reason="error"))
+
+
+async def test_started_writes_finish_when_the_response_fails(tmp_path: Path) -> None:
+    tool = SlowWriteTool()
+    loop, _ = _make_loop(tmp_path, AbandonedToolProvider(tool))
+    loop.tools.register(tool)
+
+    reply = await loop.process_direct("go")
+    assert reply == "Error calling LLM: boom"
+    assert tool.finished
+
+
+class BigOutputTool(Tool):
+    name = "dump"
+    description = "returns a very long output"
+    parameters = {"type": "object", "properties": {}}
+    read_only = True
+
+    async def execute(self, **kwargs: Any) -> str:
+        return "x" * 50_000
+
+
+class SmallContextProvider(EchoProvider):
+    """Calls the dump tool once, then rejects any request whose messages are too long."""
+
+    def __init__(self, limit: int = 20_000):
+        super().__init__()
+        self.limit = limit
+        self.rejected = 0
+
+    async def chat_stream(self, messages: list[dict[str, Any]], **kwargs: Any):
+        if sum(len(str(m.get("content") or "")) for m in messages) > self.limit:
+            self.rejected += 1
+            yield StreamChunk(response=LLMResponse(
+                content="Error calling LLM: prompt is too long",
+                finish_reason="context_length_exceeded",
+            ))
+            return
+        if messages[-1]["role"] == "tool":
+            yield StreamChunk(response=LLMResponse(content=f"got {len(messages[-1]['content'])} chars"))
+            return
+        call = ToolCallRequest(id="call_1", name="dump", arguments={})
+        yield StreamChunk(response=LLMResponse(content=None, tool_calls=[call]))
+
+
+async def test_context_overflow_is_compacted_and_retried(tmp_path: Path) -> None:
+    provider = SmallContextProvider()
+    loop, _ = _make_loop(tmp_path, provider)
+    loop.tools.register(BigOutputTool())
+    session = loop.sessions.get_or_create("cli:direct")
+    for i in range(3):
+        session.add_message("user", f"old question {i}")
+        session.add_message("assistant", f"old answer {i}")
+    loop.sessions.save(session)
+
+    reply = await loop.process_direct("dump it")
+    assert provider.rejected >= 1
+    assert reply.startswith("got ") and int(reply.split()[1]) < 50_000
+
+
+async def test_transcript_keeps_tool_calls_with_deduplicated_blobs(tmp_path: Path) -> None:
+    loop, _ = _make_loop(tmp_path, SmallContextProvider(limit=10**9))
+    loop.tools.register(BigOutputTool())
+
+    for text in ("dump it", "dump it again"):
+        assert await loop.process_direct(text) == "got 50000 chars"
+
+    session = loop.sessions.get_or_create("cli:direct")
+    assert [m.role for m in session.messages] == ["user", "assistant", "tool", "assistant"] * 2
+    assert session.messages[1].get("tool_calls")[0]["function"]["name"] == "dump"
+    tool_msg = session.messages[2]
+    assert tool_msg.get("chars") == 50_000 and len(tool_msg.content) < 1000
+    assert loop.sessions.get_full_content(tool_msg) == "x" * 50_000
+    assert session.messages[6].get("blob") == tool_msg.get("blob")
+    assert len(list(loop.sessions.blobs.root.rglob("*.z"))) == 1
+
+    history = session.get_history()
+    assert [m["content"] for m in history] == ["dump it", "got 50000 chars", "dump it again", "got 50000 chars"]
@@ -0,0 +1,47 @@
+import re
+from typing import Any
+
+from nanobot.agent.compaction import ContextCompactor
+from nanobot.agent.tools.recall import RecallToolResultTool, ToolResultStore
+
+
+def _turn(rounds: int, size: int = 5000) -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "research this"},
+    ]
+    for i in range(rounds):
+        call = {"id": f"c{i}", "type": "function", "function": {"name": "web_fetch", "arguments": "{}"}}
+        messages.append({"role": "assistant", "content": "", "tool_calls": [call]})
+        messages.append({"role": "tool", "tool_call_id": f"c{i}", "name": "web_fetch", "content": f"{i}" * size})
+    return messages
+
+
+async def test_stale_tool_results_become_recallable_digests() -> None:
+    messages = _turn(4)
+    store = ToolResultStore()
+    compactor = ContextCompactor(messages, turn_start=1)
+
+    assert compactor.digest_stale_tool_results(keep_rounds=2, store=store) == 2
+    tool_msgs = [m for m in messages if m["role"] == "tool"]
+    assert all(len(m["content"]) < 1000 for m in tool_msgs[:2])
+    assert [m["content"] for m in tool_msgs[2:]] == ["2" * 5000, "3" * 5000]
+
+    # Already-digested results are left alone
+    assert compactor.digest_stale_tool_results(keep_rounds=2, store=store) == 0
+
+    handle = re.search(r'handle="(tr_\w+)"', tool_msgs[0]["content"]).group(1)
+    tool = RecallToolResultTool(store, max_chars=3000)
+    first = await tool.execute(handle=handle)
+    assert first.startswith("0" * 3000) and "offset=3000" in first
+    assert await tool.execute(handle=handle, offset=3000) == "0" * 2000
+    assert (await tool.execute(handle="tr_missing")).startswith("Error")
+
+
+def test_result_store_evicts_least_recently_used() -> None:
+    store = ToolResultStore(max_chars=10)
+    a = store.put("aaaa")
+    b = store.put("bbbb")
+    store.get(a)
+    store.put("cccc")
+    assert store.get(b) is None and store.get(a) == "aaaa" and len(store) == 2
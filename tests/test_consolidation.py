@@ -0,0 +1,107 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from nanobot.agent.consolidation import MemoryConsolidationService, MemoryConsolidator
+from nanobot.agent.memory import MemoryStore
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.utils.tokens import count_tokens
+
+TODAY = date(2026, 3, 20)
+
+
+class MergeProvider(LLMProvider):
+    """Returns a fixed merged memory file."""
+
+    def __init__(self, content: str) -> None:
+        super().__init__()
+        self.content = content
+        self.requests: list[dict[str, Any]] = []
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        self.requests.append({"messages": messages, **kwargs})
+        return LLMResponse(content=self.content)
+
+    def get_default_model(self) -> str:
+        return "main-model"
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> MemoryStore:
+    store = MemoryStore(tmp_path / "ws")
+    store.memory_file.write_text("# Long-term Memory\n\n## Preferences\n\n- Likes tea\n", encoding="utf-8")
+    notes = {
+        "2026-03-01": "# 2026-03-01\n\n- Likes tea\nBooked dentist for April.",
+        "2026-03-02": "# 2026-03-02\n\n- booked dentist for april\nStarted learning Portuguese.",
+        "2026-03-19": "# 2026-03-19\n\nRecent note.",
+    }
+    for day, text in notes.items():
+        (store.memory_dir / f"{day}.md").write_text(text, encoding="utf-8")
+    return store
+
+
+async def test_old_notes_are_merged_deduplicated_and_archived(store: MemoryStore) -> None:
+    report = await MemoryConsolidator(store, keep_days=7).run(today=TODAY)
+
+    assert report.notes == ["2026-03-01.md", "2026-03-02.md"]
+    assert store.read_long_term() == (
+        "# Long-term Memory\n\n## Preferences\n\n- Likes tea\n\n## From Daily Notes\n\n"
+        "- [2026-03-01] Booked dentist for April.\n- [2026-03-02] Started learning Portuguese.\n"
+    )
+    assert [p.name for p in store.list_memory_files()] == ["2026-03-19.md"]
+    assert (store.memory_dir / "archive" / "2026-03-01.md").exists()
+
+    # Nothing due any more: a second run changes nothing
+    again = await MemoryConsolidator(store, keep_days=7).run(today=TODAY)
+    assert not again.notes and not again.added
+
+
+async def test_oldest_consolidated_entries_are_dropped_over_budget(store: MemoryStore) -> None:
+    for i in range(1, 13):
+        (store.memory_dir / f"2026-02-{i:02d}.md").write_text(f"Fact number {i} about the weather.", encoding="utf-8")
+
+    report = await MemoryConsolidator(store, keep_days=7, token_budget=60).run(today=TODAY)
+
+    memory = store.read_long_term()
+    assert report.dropped > 0
+    assert count_tokens(memory) <= 60
+    assert "- Likes tea" in memory  # Only consolidated entries are dropped
+    assert "Fact number 1 " not in memory and "Started learning Portuguese." in memory
+
+    # Dropped entries are still retrievable from the archived notes
+    sources = {chunk.source for _, chunk in store.search("fact number weather", k=20)}
+    assert "archive/2026-02-01.md" in sources
+
+
+async def test_llm_merge_uses_cheap_model_and_falls_back_when_over_budget(store: MemoryStore) -> None:
+    provider = MergeProvider("```markdown\n# Long-term Memory\n\n- Likes tea; dentist in April\n```")
+    report = await MemoryConsolidator(store, provider=provider, model="cheap-model").run(today=TODAY)
+
+    assert report.summarized
+    assert provider.requests[0]["model"] == "cheap-model"
+    assert "Started learning Portuguese." in provider.requests[0]["messages"][1]["content"]
+    assert store.read_long_term() == "# Long-term Memory\n\n- Likes tea; dentist in April\n"
+
+    (store.memory_dir / "2026-03-05.md").write_text("Adopted a cat.", encoding="utf-8")
+    provider.content = "word " * 400
+    report = await MemoryConsolidator(store, token_budget=100, provider=provider).run(today=TODAY)
+    assert not report.summarized
+    assert "- [2026-03-05] Adopted a cat." in store.read_long_term()
+
+
+async def test_consolidation_service_runs_soon_after_startup() -> None:
+    runs = []
+
+    class Consolidator:
+        async def run(self) -> None:
+            runs.append(1)
+
+    service = MemoryConsolidationService(Consolidator(), interval_s=3600, initial_delay_s=0)
+    await service.start()
+    await asyncio.sleep(0.05)
+    service.stop()
+    assert runs == [1]
+    assert MemoryConsolidationService(Consolidator()).initial_delay_s < 3600
@@ -0,0 +1,166 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.utils.tokens import messages_tokens
+
+
+def _touch(path: Path, content: str) -> None:
+    """Write a file and move its mtime forward so the change is always visible."""
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    _touch(ws / "USER.md", "user v1")
+    _touch(ws / "SOUL.md", "soul v1")
+    return ws
+
+
+def test_system_prompt_picks_up_file_changes(workspace: Path) -> None:
+    ctx = ContextBuilder(workspace)
+    assert "user v1" in ctx.build_system_prompt()
+
+    _touch(workspace / "USER.md", "user v2")
+    _touch(ctx.memory.memory_file, "remember this")
+    prompt = ctx.build_system_prompt()
+    assert "user v2" in prompt and "user v1" not in prompt
+    assert "remember this" in prompt
+
+    (workspace / "USER.md").unlink()
+    assert "user v2" not in ctx.build_system_prompt()
+
+
+def test_unchanged_files_are_not_reread(workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    ctx = ContextBuilder(workspace)
+    ctx.build_system_prompt()
+
+    reads: list[str] = []
+    original = Path.read_text
+
+    def counting_read_text(self: Path, *args, **kwargs) -> str:
+        reads.append(self.name)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+    ctx.build_system_prompt()
+    assert reads == []
+
+    _touch(workspace / "USER.md", "user v2")
+    ctx.build_system_prompt()
+    assert reads == ["USER.md"]
+
+
+def test_cacheable_prefix_is_stable_and_time_comes_last(workspace: Path) -> None:
+    ctx = ContextBuilder(workspace)
+    first = ctx.build_messages([], "hi", cache_control=True)[0]["content"]
+    second = ctx.build_messages([], "hello", cache_control=True)[0]["content"]
+
+    stable, runtime = first
+    assert stable["cache_control"] == {"type": "ephemeral"}
+    assert "Current Time" not in stable["text"] and "Current Time" in runtime["text"]
+    assert "cache_control" not in runtime
+    assert second[0] == stable
+
+    plain = ctx.build_messages([], "hi")[0]["content"]
+    assert plain.startswith(stable["text"]) and plain.endswith(runtime["text"])
+
+
+def test_history_is_trimmed_to_token_budget(workspace: Path) -> None:
+    ctx = ContextBuilder(workspace)
+    history = []
+    for i in range(20):
+        history.append({"role": "user", "content": f"question {i} " + "word " * 200})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+
+    full = ctx.build_messages(history, "now")
+    budget = messages_tokens(full) - messages_tokens(history[:9])
+    trimmed = ctx.build_messages(history, "now", token_budget=budget)
+
+    assert messages_tokens(trimmed) <= budget
+    assert trimmed[1]["role"] == "user"
+    assert trimmed[1:-1] == history[-len(trimmed) + 2:]
+    assert trimmed[-2] == history[-1] and trimmed[-1]["content"] == "now"
+    assert len(trimmed) < len(full)
+
+
+def test_memory_over_budget_is_retrieved_by_relevance(workspace: Path) -> None:
+    ctx = ContextBuilder(workspace, memory_budget=300)
+    facts = [f"## Topic {i}\n\nFiller fact number {i} about unrelated things." for i in range(200)]
+    facts.insert(120, "## Pets\n\nThe user's cat is called Miso and eats salmon.")
+    _touch(ctx.memory.memory_file, "\n\n".join(facts))
+    _touch(ctx.memory.memory_dir / "2020-01-01.md", "# 2020-01-01\n\nBooked the dentist for March.")
+
+    system = ctx.build_messages(history=[], current_message="what does my cat Miso eat?")[0]["content"]
+    assert "Filler fact number 5 " not in system
+    assert "[MEMORY.md › Pets]\nThe user's cat is called Miso and eats salmon." in system
+
+    # Small memory stays whole in the cached prefix; older notes are still reachable
+    _touch(ctx.memory.memory_file, "The user prefers tea.")
+    system = ctx.build_messages(history=[], current_message="when is the dentist?")[0]["content"]
+    assert system.index("The user prefers tea.") < system.index("Booked the dentist for March.")
+
+
+def test_vector_memory_search_ranks_by_similarity_and_persists(
+    workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pytest.importorskip("numpy")
+    from nanobot.agent.memory import MemoryStore
+    from nanobot.agent.memory_vectors import HashingEmbedder
+
+    store = MemoryStore(workspace, vector_search=True)
+    _touch(store.memory_file, "\n\n".join([
+        "Project deadlines: the quarterly report is due in September.",
+        "Favourite restaurants include a small ramen place downtown.",
+        "Travel: flights to Lisbon booked for the conference.",
+    ]))
+    _touch(store.memory_dir / "2020-01-01.md", "Asked about restaurant recommendations.")
+
+    # Trigram overlap finds "restaurants" from "restaurant" without an exact keyword match
+    texts = [chunk.text for _, chunk in store.search("restaurant", k=2)]
+    assert texts[0] == "Asked about restaurant recommendations."
+    assert "ramen" in texts[1]
+    results = store.search("restaurant", k=3, exclude={"2020-01-01.md"})
+    assert "ramen" in results[0][1].text
+    assert all(chunk.source == "MEMORY.md" for _, chunk in results)
+
+    # A fresh store reuses the persisted embeddings instead of re-embedding
+    store.writer.flush()
+    embedded: list[str] = []
+    original = HashingEmbedder.embed
+    monkeypatch.setattr(HashingEmbedder, "embed", lambda self, texts: embedded.extend(texts) or original(self, texts))
+    reopened = MemoryStore(workspace, vector_search=True)
+    assert "Lisbon" in reopened.search("flights lisbon", k=1)[0][1].text
+    assert embedded == ["flights lisbon"]
+
+    # Editing one file embeds only its changed chunk, appended to the stored vectors
+    vectors = reopened.memory_dir / ".index" / "vectors.f32"
+    size = vectors.stat().st_size
+    embedded.clear()
+    _touch(reopened.memory_dir / "2020-01-01.md", "Asked about restaurant recommendations.\n\nBooked a table.")
+    reopened.search("table", k=1)
+    reopened.writer.flush()
+    assert embedded == ["Asked about restaurant recommendations.\n\nBooked a table.", "table"]
+    assert vectors.stat().st_size == size + 4 * HashingEmbedder().dim
+
+
+def test_daily_notes_are_appended_without_flushing(workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from nanobot.agent.memory import MemoryStore
+
+    store = MemoryStore(workspace)
+    store.append_today("first")
+    flushes: list[None] = []
+    monkeypatch.setattr(store.writer, "flush", lambda *a, **kw: flushes.append(None))
+    store.append_today("second")
+    store.append_today("third")
+    monkeypatch.undo()
+
+    assert not flushes
+    assert store.read_today().endswith("\n\nfirst\nsecond\nthird")
+    assert store.read_today().count("# ") == 1
@@ -0,0 +1,276 @@
+import json
+import subprocess
+import sys
+from typing import Any
+
+import httpx
+import pytest
+
+from nanobot.config.schema import Config
+from nanobot.providers.anthropic_provider import AnthropicProvider
+from nanobot.providers.factory import create_provider
+from nanobot.providers.openai_provider import OpenAICompatibleProvider
+
+TOOLS = [{
+    "type": "function",
+    "function": {"name": "read_file", "description": "Read a file", "parameters": {"type": "object"}},
+}]
+
+
+def _client(handler, requests: list[httpx.Request]) -> httpx.AsyncClient:
+    def record(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return handler(request)
+    return httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+
+def _sse(events: list[tuple[str, Any]]) -> bytes:
+    lines = []
+    for event, data in events:
+        if event:
+            lines.append(f"event: {event}")
+        lines.append(f"data: {data if isinstance(data, str) else json.dumps(data)}")
+        lines.append("")
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def test_openai_compatible_chat_parses_tool_calls() -> None:
+    requests: list[httpx.Request] = []
+    reply = {
+        "choices": [{
+            "message": {"content": None, "tool_calls": [
+                {"id": "call_1", "function": {"name": "read_file", "arguments": '{"path": "a.txt"}'}},
+            ]},
+            "finish_reason": "tool_calls",
+        }],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+    }
+    provider = OpenAICompatibleProvider(
+        api_key="sk-test",
+        api_base="http://vllm.local/v1/",
+        default_model="hosted_vllm/llama-3",
+        client=_client(lambda r: httpx.Response(200, json=reply), requests),
+    )
+
+    response = await provider.chat([{"role": "user", "content": "hi"}], tools=TOOLS)
+
+    assert response.finish_reason == "tool_calls"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
+    assert response.usage["total_tokens"] == 15
+    assert str(requests[0].url) == "http://vllm.local/v1/chat/completions"
+    assert requests[0].headers["authorization"] == "Bearer sk-test"
+    body = json.loads(requests[0].content)
+    assert body["model"] == "llama-3" and body["tool_choice"] == "auto"
+
+
+async def test_openai_compatible_stream_and_errors() -> None:
+    stream = _sse([
+        ("", {"choices": [{"delta": {"content": "Hel"}}]}),
+        ("", {"choices": [{"delta": {"content": "lo"}}]}),
+        ("", {"choices": [{"delta": {"tool_calls": [
+            {"index": 0, "id": "c1", "function": {"name": "read_file", "arguments": '{"path":'}},
+        ]}}]}),
+        ("", {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": ' "b"}'}}]},
+                           "finish_reason": "tool_calls"}]}),
+        ("", {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}}),
+        ("", "[DONE]"),
+    ])
+    requests: list[httpx.Request] = []
+    provider = OpenAICompatibleProvider(
+        api_key="sk-or-test",
+        api_base="https://openrouter.ai/api/v1",
+        default_model="anthropic/claude-opus-4-5",
+        client=_client(lambda r: httpx.Response(200, content=stream), requests),
+    )
+
+    messages = [{"role": "system", "content": "You are nanobot."}, {"role": "user", "content": "hi"}]
+    chunks = [c async for c in provider.chat_stream(messages)]
+
+    assert [c.delta for c in chunks if c.delta] == ["Hel", "lo"]
+    assert [c.tool_call.arguments for c in chunks if c.tool_call] == [{"path": "b"}]
+    final = chunks[-1].response
+    assert final.content == "Hello" and final.finish_reason == "tool_calls" and final.usage["total_tokens"] == 7
+    body = json.loads(requests[0].content)
+    assert body["model"] == "anthropic/claude-opus-4-5"  # OpenRouter keeps the vendor prefix
+    assert body["messages"][1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+
+    overflow = {"error": {"message": "This model's maximum context length is 8192 tokens",
+                          "code": "context_length_exceeded"}}
+    provider._client = _client(lambda r: httpx.Response(400, json=overflow), [])
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+    assert response.finish_reason == "context_length_exceeded"
+    assert "HTTP 400" in response.content
+
+    rate_limit = {"error": {"message": "Rate limit reached: too many tokens, context length 8192",
+                            "code": "rate_limit_exceeded"}}
+    provider._client = _client(lambda r: httpx.Response(429, json=rate_limit), [])
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+    assert response.finish_reason == "error"
+
+
+async def test_openai_stream_yields_tool_calls_in_order() -> None:
+    stream = _sse([
+        ("", {"choices": [{"delta": {"tool_calls": [
+            {"index": 0, "id": "c0", "function": {"name": "write_file", "arguments": '{"path": "a", '}},
+        ]}}]}),
+        ("", {"choices": [{"delta": {"tool_calls": [
+            {"index": 1, "id": "c1", "function": {"name": "read_file", "arguments": '{"path": "a"}'}},
+        ]}}]}),
+        ("", {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": "oops"}}]},
+                           "finish_reason": "tool_calls"}]}),
+        ("", "[DONE]"),
+    ])
+    provider = OpenAICompatibleProvider(
+        api_key="sk-test", client=_client(lambda r: httpx.Response(200, content=stream), []),
+    )
+
+    chunks = [c async for c in provider.chat_stream([{"role": "user", "content": "hi"}])]
+
+    # The read never runs ahead of the write, whose arguments never completed mid-stream
+    assert [c.tool_call for c in chunks if c.tool_call] == []
+    assert [tc.id for tc in chunks[-1].response.tool_calls] == ["c0", "c1"]
+
+
+async def test_openai_reasoning_models_use_max_completion_tokens() -> None:
+    reply = {"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}]}
+    requests: list[httpx.Request] = []
+    provider = OpenAICompatibleProvider(
+        api_key="sk-test", client=_client(lambda r: httpx.Response(200, json=reply), requests),
+    )
+
+    await provider.chat([{"role": "user", "content": "hi"}], model="openai/o3-mini", max_tokens=100)
+    await provider.chat([{"role": "user", "content": "hi"}], model="gpt-5", max_tokens=100)
+    await provider.chat([{"role": "user", "content": "hi"}], model="gpt-4o", max_tokens=100)
+    provider.is_openrouter = True
+    await provider.chat([{"role": "user", "content": "hi"}], model="openai/o4-mini", max_tokens=100)
+
+    bodies = [json.loads(r.content) for r in requests]
+    for body in (bodies[0], bodies[1], bodies[3]):
+        assert body["max_completion_tokens"] == 100
+        assert "max_tokens" not in body and "temperature" not in body
+    assert bodies[2]["max_tokens"] == 100 and bodies[2]["temperature"] == 0.7
+    assert bodies[3]["model"] == "openai/o4-mini"
+
+
+async def test_anthropic_converts_messages_and_parses_response() -> None:
+    requests: list[httpx.Request] = []
+    reply = {
+        "content": [
+            {"type": "text", "text": "Reading it."},
+            {"type": "tool_use", "id": "tu_2", "name": "read_file", "input": {"path": "b.txt"}},
+        ],
+        "stop_reason": "tool_use",
+        "usage": {"input_tokens": 10, "cache_read_input_tokens": 90, "output_tokens": 5},
+    }
+    provider = AnthropicProvider(
+        api_key="sk-ant-test",
+        default_model="anthropic/claude-opus-4-5",
+        client=_client(lambda r: httpx.Response(200, json=reply), requests),
+    )
+    messages = [
+        {"role": "system", "content": [
+            {"type": "text", "text": "You are nanobot.", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "Current time: now"},
+        ]},
+        {"role": "user", "content": "Read a.txt"},
+        {"role": "assistant", "content": "", "tool_calls": [
+            {"id": "tu_1", "type": "function", "function": {"name": "read_file", "arguments": '{"path": "a.txt"}'}},
+        ]},
+        {"role": "tool", "tool_call_id": "tu_1", "name": "read_file", "content": "contents of a"},
+        {"role": "user", "content": [
+            {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            {"type": "text", "text": "and this"},
+        ]},
+    ]
+
+    response = await provider.chat(messages, tools=TOOLS)
+
+    assert response.content == "Reading it."
+    assert response.finish_reason == "tool_calls"
+    assert response.tool_calls[0].arguments == {"path": "b.txt"}
+    assert response.usage == {"prompt_tokens": 100, "completion_tokens": 5, "total_tokens": 105}
+
+    request = requests[0]
+    assert str(request.url) == "https://api.anthropic.com/v1/messages"
+    assert request.headers["x-api-key"] == "sk-ant-test"
+    body = json.loads(request.content)
+    assert body["model"] == "claude-opus-4-5"
+    assert body["system"][0] == {"type": "text", "text": "You are nanobot.", "cache_control": {"type": "ephemeral"}}
+    assert [m["role"] for m in body["messages"]] == ["user", "assistant", "user"]
+    assert body["messages"][1]["content"] == [
+        {"type": "tool_use", "id": "tu_1", "name": "read_file", "input": {"path": "a.txt"}},
+    ]
+    tool_result, image, text = body["messages"][2]["content"]
+    assert tool_result["tool_use_id"] == "tu_1" and tool_result["content"][0]["text"] == "contents of a"
+    assert image["source"] == {"type": "base64", "media_type": "image/png", "data": "AAAA"}
+    assert text["cache_control"] == {"type": "ephemeral"}
+    assert body["tools"][0]["input_schema"] == {"type": "object"}
+    assert body["tools"][0]["cache_control"] == {"type": "ephemeral"}
+
+
+async def test_anthropic_stream_yields_tool_calls_as_blocks_close() -> None:
+    stream = _sse([
+        ("message_start", {"type": "message_start", "message": {"usage": {"input_tokens": 20, "output_tokens": 1}}}),
+        ("content_block_start", {"type": "content_block_start", "index": 0,
+                                 "content_block": {"type": "text", "text": ""}}),
+        ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                 "delta": {"type": "text_delta", "text": "Let me look."}}),
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("content_block_start", {"type": "content_block_start", "index": 1,
+                                 "content_block": {"type": "tool_use", "id": "tu_1", "name": "read_file"}}),
+        ("content_block_delta", {"type": "content_block_delta", "index": 1,
+                                 "delta": {"type": "input_json_delta", "partial_json": '{"path": '}}),
+        ("content_block_delta", {"type": "content_block_delta", "index": 1,
+                                 "delta": {"type": "input_json_delta", "partial_json": '"c.txt"}'}}),
+        ("content_block_stop", {"type": "content_block_stop", "index": 1}),
+        ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "tool_use"},
+                           "usage": {"output_tokens": 15}}),
+        ("message_stop", {"type": "message_stop"}),
+    ])
+    provider = AnthropicProvider(
+        api_key="sk-ant-test",
+        client=_client(lambda r: httpx.Response(200, content=stream), []),
+    )
+
+    chunks = [c async for c in provider.chat_stream([{"role": "user", "content": "hi"}])]
+
+    assert [c.delta for c in chunks if c.delta] == ["Let me look."]
+    assert [c.tool_call.arguments for c in chunks if c.tool_call] == [{"path": "c.txt"}]
+    final = chunks[-1].response
+    assert final.finish_reason == "tool_calls"
+    assert final.usage == {"prompt_tokens": 20, "completion_tokens": 15, "total_tokens": 35}
+
+
+def test_factory_picks_native_providers() -> None:
+    config = Config()
+    config.providers.anthropic.api_key = "sk-ant"
+    assert isinstance(create_provider(config), AnthropicProvider)
+
+    config.providers.openrouter.api_key = "sk-or"
+    provider = create_provider(config)
+    assert isinstance(provider, OpenAICompatibleProvider) and provider.is_openrouter
+
+    config = Config()
+    config.providers.vllm.api_base = "http://localhost:8000/v1"
+    provider = create_provider(config, model="meta-llama/Llama-3.1-8B-Instruct")
+    assert isinstance(provider, OpenAICompatibleProvider) and provider.api_base == "http://localhost:8000/v1"
+
+    config = Config()
+    config.providers.gemini.api_key = "g"
+    config.providers.backend = "native"
+    with pytest.raises(ValueError):
+        create_provider(config, model="gemini/gemini-2.0-flash")
+
+
+def test_native_providers_do_not_import_litellm() -> None:
+    code = (
+        "import sys\n"
+        "from nanobot.config.schema import Config\n"
+        "from nanobot.providers.factory import create_provider\n"
+        "import nanobot.agent.loop\n"
+        "config = Config()\n"
+        "config.providers.openrouter.api_key = 'sk-or'\n"
+        "create_provider(config)\n"
+        "assert 'litellm' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,501 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.tools.history import SearchHistoryTool
+from nanobot.session.archive import RetentionPolicy, SessionArchiver, SessionMaintenanceService
+from nanobot.session.cache import SessionCache
+from nanobot.session.manager import Session, SessionManager
+from nanobot.session.message import Message
+from nanobot.session.search import SessionSearchIndex
+from nanobot.session.sqlite_store import SQLiteSessionStore
+from nanobot.session.store import JsonlSessionStore
+from nanobot.utils.writer import BackgroundWriter
+
+
+@pytest.fixture
+def manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SessionManager:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return SessionManager(tmp_path / "ws")
+
+
+def _lines(manager: SessionManager, key: str) -> list[str]:
+    manager.store.flush()
+    return manager.store._get_session_path(key).read_text().splitlines()
+
+
+def test_save_appends_only_new_messages(manager: SessionManager) -> None:
+    session = manager.get_or_create("telegram:1")
+    session.add_message("user", "hi")
+    session.add_message("assistant", "hello")
+    manager.save(session)
+    first = _lines(manager, "telegram:1")
+
+    session.add_message("user", "again")
+    manager.save(session)
+    assert len(_lines(manager, "telegram:1")) == len(first) + 1  # metadata unchanged: message only
+
+    session.add_message("assistant", "hey")
+    session.metadata["summary"] = "greeting"
+    manager.save(session)
+    lines = _lines(manager, "telegram:1")
+
+    assert lines[:len(first)] == first
+    assert len(lines) == len(first) + 3  # two messages + one metadata record
+
+    reopened = SessionManager(manager.workspace)
+    reloaded = reopened.get_or_create("telegram:1")
+    assert [m.content for m in reloaded.messages] == ["hi", "hello", "again", "hey"]
+    assert reloaded.metadata == {"summary": "greeting"}
+
+    reloaded.add_message("user", "more")
+    reopened.save(reloaded)
+    reopened.store.rebuild_manifest()
+    assert reopened.list_sessions()[0]["message_count"] == 5
+    latest = SessionManager(manager.workspace).get_or_create("telegram:1")
+    assert latest.message_count == 5
+    assert latest.updated_at >= datetime.fromtimestamp(latest.messages[-1].timestamp)
+
+
+def test_clear_rewrites_the_file(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:x")
+    session.add_message("user", "old")
+    manager.save(session)
+    session.clear()
+    session.add_message("user", "new")
+    manager.save(session)
+
+    reloaded = SessionManager(manager.workspace).get_or_create("cli:x")
+    assert [m.content for m in reloaded.messages] == ["new"]
+
+
+def test_stale_metadata_records_are_compacted(manager: SessionManager) -> None:
+    manager.store.COMPACT_MIN_STALE_BYTES = 2048
+    session = manager.get_or_create("cli:y")
+    for i in range(100):
+        session.metadata["n"] = i
+        manager.save(session)
+        assert sum(len(line) + 1 for line in _lines(manager, "cli:y")) <= 2 * 2048 + 200
+
+    reloaded = SessionManager(manager.workspace).get_or_create("cli:y")
+    assert reloaded.metadata == {"n": 99}
+
+
+def test_torn_final_record_is_skipped(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:z")
+    session.add_message("user", "kept")
+    manager.save(session)
+    manager.store.flush()
+    with open(manager.store._get_session_path("cli:z"), "a") as f:
+        f.write('{"role": "assistant", "content": "cut o')
+
+    reloaded = SessionManager(manager.workspace)
+    assert [m.content for m in reloaded.get_or_create("cli:z").messages] == ["kept"]
+    assert reloaded.list_sessions()[0]["key"] == "cli:z"
+
+    # The next save repairs the file instead of appending after the torn line
+    session = reloaded.get_or_create("cli:z")
+    session.add_message("user", "more")
+    reloaded.save(session)
+    again = SessionManager(manager.workspace).get_or_create("cli:z")
+    assert [m.content for m in again.messages] == ["kept", "more"]
+
+
+def test_sqlite_store_round_trip_and_queries(tmp_path: Path) -> None:
+    store = SQLiteSessionStore(tmp_path / "sessions.db")
+    manager = SessionManager(tmp_path / "ws", store=store)
+    for key in ("telegram:1", "telegram:2", "whatsapp:3"):
+        session = manager.get_or_create(key)
+        session.add_message("user", f"hi from {key}")
+        manager.save(session)
+
+    session = manager.get_or_create("telegram:1")
+    session.add_message("assistant", "hello")
+    session.metadata["summary"] = "s"
+    manager.save(session)
+    session.clear()
+    session.add_message("user", "fresh")
+    manager.save(session)
+
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert [s["key"] for s in store.list_sessions(channel="telegram")] == ["telegram:1", "telegram:2"]
+    assert store.list_sessions(channel="telegram", limit=1)[0]["message_count"] == 1
+    store.close()
+
+    reopened = SessionManager(tmp_path / "ws", store=SQLiteSessionStore(tmp_path / "sessions.db"))
+    loaded = reopened.get_or_create("telegram:1")
+    assert [m.content for m in loaded.messages] == ["fresh"]
+    assert loaded.metadata == {"summary": "s"}
+    assert reopened.delete("whatsapp:3") and not reopened.delete("whatsapp:3")
+
+
+def test_sqlite_store_commits_queued_saves_together(tmp_path: Path) -> None:
+    writer = BackgroundWriter(fsync=False)
+    store = SQLiteSessionStore(tmp_path / "sessions.db", writer=writer)
+    statements: list[str] = []
+    store._conn.set_trace_callback(statements.append)
+    gate = threading.Event()
+    writer.submit(gate.wait)  # Hold the writer thread so the saves below queue up
+
+    for key in ("telegram:1", "telegram:2", "whatsapp:3"):
+        session = Session(key=key)
+        session.add_message("user", f"hi from {key}")
+        session.add_message("assistant", "hello")
+        store.save(session)
+    gate.set()
+    store.flush()
+
+    assert [s for s in statements if s.startswith("COMMIT")] == ["COMMIT"]
+    stats = store.stats()
+    assert stats["sessions"] == 3 and stats["messages"] == 6
+    store.close()
+    writer.close()
+
+
+def test_migrate_jsonl_sessions_to_sqlite(manager: SessionManager, tmp_path: Path) -> None:
+    session = manager.get_or_create("cli:with_underscore")
+    session.add_message("user", "keep me")
+    manager.save(session)
+
+    target = SQLiteSessionStore(tmp_path / "sessions.db")
+    for info in manager.list_sessions():
+        target.save(manager.store.load(info["key"]))
+
+    assert [s["key"] for s in target.list_sessions()] == ["cli:with_underscore"]
+    assert target.load("cli:with_underscore").messages[0].content == "keep me"
+
+
+def test_session_cache_is_bounded_and_counts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path / "ws", cache=SessionCache(max_sessions=2, idle_ttl=0))
+    for key in ("a:1", "a:2", "a:3"):
+        session = manager.get_or_create(key)
+        session.add_message("user", key)
+        manager.save(session)
+
+    stats = manager.cache_stats()
+    assert stats["sessions"] == 2 and stats["evictions"] == 1 and stats["misses"] == 3
+
+    # The evicted session reloads from the store
+    assert manager.get_or_create("a:1").messages[0].content == "a:1"
+    assert manager.get_or_create("a:1") is manager.get_or_create("a:1")
+    assert manager.cache_stats()["hits"] == 2
+
+
+def test_session_cache_evicts_by_bytes_and_idle_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("nanobot.session.cache.time.monotonic", lambda: now[0])
+    cache = SessionCache(max_sessions=10, max_bytes=5000, idle_ttl=60)
+    for key in ("x:1", "x:2"):
+        session = Session(key=key)
+        session.add_message("user", "y" * 3000)
+        cache.put(session)
+    assert "x:1" not in cache and "x:2" in cache and cache.size_bytes < 5000
+
+    now[0] += 61
+    assert cache.get("x:2") is None
+    assert len(cache) == 0 and cache.evictions == 2
+
+
+def test_pinned_sessions_are_never_evicted(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path / "ws", cache=SessionCache(max_sessions=1, idle_ttl=0))
+    with manager.pinned("a:busy"):
+        busy = manager.get_or_create("a:busy")
+        other = manager.get_or_create("a:other")
+        assert manager.get_or_create("a:busy") is busy
+        assert manager.get_or_create("a:other") is other  # over the limit while pinned
+
+    manager.get_or_create("a:third")
+    assert manager.cache_stats()["sessions"] == 1
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_large_sessions_load_tail_first(tmp_path: Path, backend: str) -> None:
+    def make_store():
+        if backend == "jsonl":
+            return JsonlSessionStore(tmp_path / "sessions", tail_messages=10)
+        return SQLiteSessionStore(tmp_path / "sessions.db", tail_messages=10)
+
+    writer = SessionManager(tmp_path / "ws", store=make_store())
+    session = writer.get_or_create("telegram:big")
+    for i in range(100):
+        session.add_message("user", f"m{i}")
+        if i % 7 == 0:
+            writer.save(session)
+    writer.save(session)
+
+    manager = SessionManager(tmp_path / "ws", store=make_store())
+    loaded = manager.get_or_create("telegram:big")
+    assert (loaded.offset, len(loaded.messages), loaded.message_count) == (90, 10, 100)
+    assert [m["content"] for m in loaded.get_history(max_messages=3)] == ["m97", "m98", "m99"]
+
+    # Older messages are pulled in on demand, then appends continue where they left off
+    assert [m.content for m in loaded.get_messages(85, 88)] == ["m85", "m86", "m87"]
+    assert loaded.offset == 85
+    loaded.add_message("user", "m100")
+    manager.save(loaded)
+
+    full = SessionManager(tmp_path / "ws", store=make_store()).get_or_create("telegram:big")
+    assert [m.content for m in full.get_messages()] == [f"m{i}" for i in range(101)]
+
+
+def test_tail_load_reads_a_bounded_window(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import nanobot.session.store as store_module
+
+    store = JsonlSessionStore(tmp_path / "sessions", tail_messages=50)
+    session = Session(key="telegram:long")
+    for i in range(2000):  # Metadata never changes
+        session.add_message("user", f"m{i}")
+        store.save(session)
+    store.flush()
+
+    read = []
+    read_lines_backwards = store_module.read_lines_backwards
+
+    def counting(path: Path):
+        for line in read_lines_backwards(path):
+            read.append(line)
+            yield line
+
+    monkeypatch.setattr(store_module, "read_lines_backwards", counting)
+    loaded = JsonlSessionStore(tmp_path / "sessions", tail_messages=50).load("telegram:long")
+
+    assert (loaded.offset, loaded.message_count) == (1950, 2000)
+    assert loaded.messages[-1].content == "m1999"
+    assert len(read) <= 50 + JsonlSessionStore.CHECKPOINT_MESSAGES + 1
+
+
+def test_manifest_lists_without_reading_session_files(manager: SessionManager) -> None:
+    for key in ("telegram:1", "whatsapp:2", "telegram:3"):
+        session = manager.get_or_create(key)
+        session.add_message("user", f"hi from {key}")
+        manager.save(session)
+    manager.delete("whatsapp:2")
+    manager.store.flush()
+
+    for path in manager.store.sessions_dir.glob("*.jsonl"):
+        path.write_text("not json\n")  # Listing must not depend on the files
+
+    reloaded = SessionManager(manager.workspace)
+    listed = reloaded.list_sessions()
+    assert [s["key"] for s in listed] == ["telegram:3", "telegram:1"]
+    assert listed[0]["message_count"] == 1 and listed[0]["size_bytes"] > 0
+    assert [s["key"] for s in reloaded.list_sessions(channel="telegram", limit=1)] == ["telegram:3"]
+    assert reloaded.store.stats()["sessions"] == 2
+
+
+def test_manifest_is_rebuilt_from_session_files(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "hello")
+    manager.save(session)
+    manager.store.flush()
+    (manager.store.sessions_dir / "manifest.log").unlink()
+
+    store = JsonlSessionStore(manager.store.sessions_dir)
+    [info] = store.list_sessions()
+    assert (info["key"], info["message_count"]) == ("cli:a", 1)
+    assert info["size_bytes"] == store._get_session_path("cli:a").stat().st_size
+
+
+def test_search_index_is_incremental_and_ranked(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path / "ws", search=SessionSearchIndex(tmp_path / "search.db"))
+    tg = manager.get_or_create("telegram:1")
+    tg.add_message("user", "Book me a flight to Tokyo")
+    tg.add_message("assistant", "Your flight to Tokyo leaves Friday; Tokyo hotels are pricey")
+    manager.save(tg)
+    tg.add_message("user", "And the hotel?")
+    manager.save(tg)
+    wa = manager.get_or_create("whatsapp:2")
+    wa.add_message("user", "tokyo weather")
+    manager.save(wa)
+
+    results = manager.search.search("tokyo")
+    assert len(results) == 3
+    assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+    telegram = [r for r in results if r["session_key"] == "telegram:1"]
+    assert [r["seq"] for r in telegram] == [1, 0]  # More mentions rank higher
+    assert "[Tokyo]" in telegram[0]["snippet"]
+    assert [r["session_key"] for r in manager.search.search("tokyo", channel="whatsapp")] == ["whatsapp:2"]
+    assert sorted(r["seq"] for r in manager.search.search("hotel", session_key="telegram:1")) == [1, 2]
+
+    tg.clear()
+    tg.add_message("user", "fresh start")
+    manager.save(tg)
+    reopened = SessionSearchIndex(tmp_path / "search.db")
+    assert [r["session_key"] for r in reopened.search("tokyo")] == ["whatsapp:2"]
+    assert reopened.stats() == {"sessions": 2, "messages": 2}
+
+    manager.delete("whatsapp:2")
+    assert reopened.search("tokyo") == []
+
+    # A session reloaded after eviction keeps appending to the index
+    writes = []
+    write = manager.search._write
+    monkeypatch.setattr(manager.search, "_write", lambda *args: (writes.append(args), write(*args)))
+    manager.evict("telegram:1")
+    tg = manager.get_or_create("telegram:1")
+    tg.add_message("assistant", "fresh indeed")
+    manager.save(tg)
+    manager.search.writer.flush()
+    assert [(len(rows), rewrite) for _, rows, _, rewrite in writes] == [(1, False)]
+    assert len(manager.search.search("fresh")) == 2
+
+
+async def test_idle_sessions_are_archived_and_restored(manager: SessionManager) -> None:
+    old = datetime.now() - timedelta(days=40)
+    for key in ("telegram:old", "telegram:new", "cron:ancient"):
+        session = manager.get_or_create(key)
+        for i in range(50):
+            session.add_message("user", f"{key} message {i} " + "padding " * 20)
+        if key != "telegram:new":
+            session.updated_at = old
+        manager.save(session)
+
+    archiver = SessionArchiver(manager, manager.archive, {"cron": RetentionPolicy(max_age_days=30)})
+    report = await archiver.run()
+    assert report.archived == ["telegram:old"] and report.pruned == ["cron:ancient"]
+    assert report.bytes_reclaimed > 0
+    assert [s["key"] for s in manager.list_sessions()] == ["telegram:new"]
+    assert "telegram:old" in manager.archive
+
+    restored = SessionManager(manager.workspace).get_or_create("telegram:old")
+    assert restored.message_count == 50 and restored.updated_at == old
+    assert "telegram:old" not in manager.archive
+    reopened = JsonlSessionStore(manager.store.sessions_dir)
+    assert {s["key"] for s in reopened.list_sessions()} == {"telegram:old", "telegram:new"}
+
+
+async def test_pinned_sessions_are_not_archived(manager: SessionManager) -> None:
+    session = manager.get_or_create("telegram:busy")
+    session.add_message("user", "hi")
+    session.updated_at = datetime.now() - timedelta(days=40)
+    manager.save(session)
+    archiver = SessionArchiver(manager, manager.archive, {"*": RetentionPolicy(max_age_days=60)})
+
+    with manager.pinned("telegram:busy"):  # A turn in flight, idle by its timestamp
+        session = manager.get_or_create("telegram:busy")
+        assert (await archiver.run()).archived == []
+        session.add_message("assistant", "hello")
+    session.updated_at = datetime.now() - timedelta(days=40)
+    manager.save(session)
+    assert "telegram:busy" not in manager.archive
+
+    assert (await archiver.run()).archived == ["telegram:busy"]
+    assert manager.list_sessions() == []
+    assert manager.get_or_create("telegram:busy").message_count == 2
+
+
+async def test_archives_are_pruned_to_size(manager: SessionManager) -> None:
+    for i in range(3):
+        session = manager.get_or_create(f"whatsapp:{i}")
+        session.add_message("user", f"chat {i} " * 500)
+        session.updated_at = datetime.now() - timedelta(days=60 - i)
+        manager.save(session)
+
+    await SessionArchiver(manager, manager.archive).run()
+    sizes = [a["size_bytes"] for a in manager.archive.list_archives()]
+    policy = RetentionPolicy(max_bytes=sum(sizes) - 1)
+    report = await SessionArchiver(manager, manager.archive, {"*": policy}).run()
+    assert report.pruned == ["whatsapp:0"] and report.bytes_reclaimed == sizes[0]
+
+
+async def test_unreferenced_blobs_are_collected(manager: SessionManager) -> None:
+    for key, output in (("telegram:kept", "k" * 5000), ("cron:gone", "g" * 5000)):
+        session = manager.get_or_create(key)
+        manager.add_transcript(session, [{"role": "tool", "tool_call_id": "c1", "content": output}])
+        if key == "cron:gone":
+            session.updated_at = datetime.now() - timedelta(days=40)
+        manager.save(session)
+    manager.store.flush()
+    for path in manager.blobs.root.glob("??/*.z"):
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    # A fresh process: blobs put by the running one are never collected
+    restarted = SessionManager(manager.workspace)
+    archiver = SessionArchiver(restarted, restarted.archive, {"cron": RetentionPolicy(max_age_days=30)})
+    report = await archiver.run()
+
+    assert report.pruned == ["cron:gone"] and report.blobs_deleted == 1
+    kept = restarted.get_or_create("telegram:kept").messages[0]
+    assert restarted.get_full_content(kept) == "k" * 5000
+    assert len(list(restarted.blobs.root.glob("??/*.z"))) == 1
+
+
+async def test_blob_references_are_recorded_on_save(manager: SessionManager, monkeypatch: pytest.MonkeyPatch) -> None:
+    await SessionArchiver(manager, manager.archive).run()  # Starts the reference log
+    session = manager.get_or_create("telegram:1")
+    manager.add_transcript(session, [{"role": "tool", "tool_call_id": "c1", "content": "a" * 5000}])
+    manager.save(session)
+    ref = session.messages[0].get("blob")
+    manager.store.flush()
+    manager.blobs.writer.flush(paths=[manager.blobs.root])
+    for path in manager.blobs.root.glob("??/*.z"):
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    restarted = SessionManager(manager.workspace)
+    assert restarted.blobs.referenced() == {ref}
+    session = restarted.get_or_create("telegram:1")
+    monkeypatch.setattr(restarted.store, "load", lambda key: pytest.fail("sessions must not be read"))
+    archiver = SessionArchiver(restarted, restarted.archive)
+    assert (await archiver.run()).blobs_deleted == 0
+
+    session.clear()
+    restarted.save(session)
+    assert restarted.blobs.referenced() == set()
+    assert (await archiver.run()).blobs_deleted == 1
+
+
+def test_messages_are_compact_and_history_is_cached() -> None:
+    stored = {"role": "tool", "content": "out", "timestamp": "2026-01-02T03:04:05.123456", "tool_call_id": "c1"}
+    message = Message.from_dict(stored)
+    assert message.to_dict() == stored
+    assert not hasattr(message, "__dict__") and message.get("tool_call_id") == "c1"
+
+    session = Session(key="cli:x")
+    session.add_message("user", "hi")
+    session.add_message("assistant", "hello")
+    assert session.messages[0].role is sys.intern("".join(["us", "er"]))
+    first = session.get_history()
+    assert session.get_history() is first  # Unchanged session: cached view
+    session.add_message("user", "again")
+    assert [m["content"] for m in session.get_history()] == ["hi", "hello", "again"]
+
+
+async def test_search_history_stays_in_the_current_chat(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path / "ws", search=SessionSearchIndex(tmp_path / "search.db"))
+    for key in ("telegram:1", "telegram:2"):
+        session = manager.get_or_create(key)
+        session.add_message("user", f"my secret is {key}")
+        manager.save(session)
+
+    tool = SearchHistoryTool(manager.search)
+    tool.set_context("telegram", "1")
+    assert "scope" not in tool.parameters["properties"]
+    assert await tool.execute("secret", scope="all") == "Error: Searching other chats is disabled"
+    assert "telegram:2" not in await tool.execute("secret")
+
+    tool = SearchHistoryTool(manager.search, allow_all=True)
+    assert "telegram:2" in await tool.execute("secret", scope="all")
+
+
+async def test_maintenance_runs_soon_after_startup() -> None:
+    runs = []
+
+    class Archiver:
+        async def run(self) -> None:
+            runs.append(1)
+
+    service = SessionMaintenanceService(Archiver(), interval_s=3600, initial_delay_s=0)
+    await service.start()
+    await asyncio.sleep(0.05)
+    service.stop()
+    assert runs == [1]
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.summarizer import SessionSummarizer
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.session.manager import SessionManager
+
+
+class SummaryProvider(LLMProvider):
+    """Returns a fixed summary and records what it was asked to summarize."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests: list[dict[str, Any]] = []
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        self.requests.append({"messages": messages, **kwargs})
+        return LLMResponse(content="- user likes tea")
+
+    def get_default_model(self) -> str:
+        return "main-model"
+
+
+@pytest.fixture
+def sessions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SessionManager:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return SessionManager(tmp_path / "ws")
+
+
+def _fill(sessions: SessionManager, key: str, turns: int) -> None:
+    session = sessions.get_or_create(key)
+    for i in range(turns):
+        session.add_message("user", f"question {i}")
+        session.add_message("assistant", f"answer {i}")
+    sessions.save(session)
+
+
+async def test_summary_folds_older_turns_with_cheap_model(sessions: SessionManager) -> None:
+    provider = SummaryProvider()
+    summarizer = SessionSummarizer(provider, sessions, model="cheap-model", trigger=10)
+    _fill(sessions, "telegram:1", 4)
+    assert not summarizer.needs_summary(sessions.get_or_create("telegram:1"))
+
+    _fill(sessions, "telegram:1", 2)
+    assert await summarizer.summarize("telegram:1")
+
+    assert provider.requests[0]["model"] == "cheap-model"
+    assert "question 0" in provider.requests[0]["messages"][-1]["content"]
+    session = sessions.get_or_create("telegram:1")
+    summary, upto = summarizer.get_summary(session)
+    assert summary == "- user likes tea"
+    assert upto == 6 and session.messages[upto].role == "user"
+
+    # Persisted with the session
+    reloaded = SessionManager(sessions.workspace)
+    assert reloaded.get_or_create("telegram:1").metadata["summarized_upto"] == 6
+
+
+async def test_summary_is_injected_ahead_of_recent_history(sessions: SessionManager) -> None:
+    summarizer = SessionSummarizer(SummaryProvider(), sessions, trigger=10)
+    _fill(sessions, "cli:x", 6)
+    await summarizer.summarize("cli:x")
+
+    session = sessions.get_or_create("cli:x")
+    summary, upto = summarizer.get_summary(session)
+    ctx = ContextBuilder(sessions.workspace)
+    messages = ctx.build_messages(session.get_history(start=upto), "next", summary=summary)
+
+    assert "user likes tea" in messages[0]["content"]
+    assert messages[0]["content"].index("user likes tea") < messages[0]["content"].index("Current Time")
+    assert [m["content"] for m in messages[1:3]] == ["question 3", "answer 3"]
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+
+
+class RecordingTool(Tool):
+    """Sleeps, then records when it started and finished."""
+
+    def __init__(self, name: str, read_only: bool, log: list[str], delay: float = 0.02):
+        self._name = name
+        self._read_only = read_only
+        self._log = log
+        self._delay = delay
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "recording tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"tag": {"type": "string"}}, "required": ["tag"]}
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    async def execute(self, tag: str, **kwargs: Any) -> str:
+        self._log.append(f"start {tag}")
+        await asyncio.sleep(self._delay)
+        self._log.append(f"end {tag}")
+        return f"{self._name}:{tag}"
+
+
+def _registry(log: list[str]) -> ToolRegistry:
+    reg = ToolRegistry()
+    reg.register(RecordingTool("read", True, log))
+    reg.register(RecordingTool("write", False, log))
+    return reg
+
+
+async def test_read_only_calls_fan_out() -> None:
+    log: list[str] = []
+    reg = _registry(log)
+    results = await reg.execute_batch([("read", {"tag": "a"}), ("read", {"tag": "b"})])
+    assert results == ["read:a", "read:b"]
+    assert log[:2] == ["start a", "start b"]
+
+
+async def test_mutating_calls_are_barriers() -> None:
+    log: list[str] = []
+    reg = _registry(log)
+    results = await reg.execute_batch([
+        ("read", {"tag": "r1"}),
+        ("write", {"tag": "w"}),
+        ("read", {"tag": "r2"}),
+        ("write", {"tag": "w2"}),
+    ])
+    assert results == ["read:r1", "write:w", "read:r2", "write:w2"]
+    assert log == [
+        "start r1", "end r1",
+        "start w", "end w",
+        "start r2", "end r2",
+        "start w2", "end w2",
+    ]
+
+
+async def test_batch_keeps_errors_in_place() -> None:
+    reg = _registry([])
+    results = await reg.execute_batch([("missing", {}), ("read", {})])
+    assert results[0] == "Error: Tool 'missing' not found"
+    assert "Invalid parameters" in results[1]
+
+
+def test_definitions_are_sorted_and_stable() -> None:
+    reg = ToolRegistry()
+    reg.register(RecordingTool("write", False, []))
+    reg.register(RecordingTool("read", True, []))
+    first = reg.get_definitions()
+    assert [d["function"]["name"] for d in first] == ["read", "write"]
+    assert reg.get_definitions() == first
+
+    reg.register(RecordingTool("append", False, []))
+    assert [d["function"]["name"] for d in reg.get_definitions()] == ["append", "read", "write"]
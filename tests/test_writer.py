@@ -0,0 +1,67 @@
+import threading
+from pathlib import Path
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.utils.writer import BackgroundWriter
+
+
+def _hold(writer: BackgroundWriter) -> threading.Event:
+    """Block the writer thread until the returned event is set, so writes queue up."""
+    started, gate = threading.Event(), threading.Event()
+    writer.submit(lambda: (started.set(), gate.wait()))
+    started.wait()
+    return gate
+
+
+def test_writes_are_coalesced_and_flushed(tmp_path: Path) -> None:
+    writer = BackgroundWriter()
+    gate = _hold(writer)
+
+    target = tmp_path / "state.json"
+    log = tmp_path / "log.txt"
+    for i in range(5):
+        writer.write(target, f"version {i}")
+        writer.append(log, f"line {i}\n")
+    assert writer.coalesced == 8
+
+    gate.set()
+    assert writer.flush(timeout=5)
+    assert target.read_text() == "version 4"
+    assert log.read_text() == "".join(f"line {i}\n" for i in range(5))
+    assert not (tmp_path / "state.json.tmp").exists()
+    writer.close()
+
+
+def test_flush_can_wait_for_some_paths_only(tmp_path: Path) -> None:
+    writer = BackgroundWriter(fsync=False)
+    gate = _hold(writer)
+    writer.append(tmp_path / "sessions" / "a.jsonl", "x")
+    writer.submit(lambda: None, path=tmp_path / "search.db")
+
+    assert writer.flush(timeout=0.2, paths=[tmp_path / "memory"])
+    assert not writer.flush(timeout=0.2, paths=[tmp_path / "search.db"])
+    assert not writer.flush(timeout=0.2, paths=[tmp_path / "sessions"])
+    assert not writer.flush(timeout=0.2)
+
+    gate.set()
+    assert writer.flush(timeout=5, paths=[tmp_path / "sessions" / "a.jsonl"])
+    assert (tmp_path / "sessions" / "a.jsonl").read_text() == "x"
+    writer.close()
+
+
+def test_close_drains_pending_writes(tmp_path: Path) -> None:
+    writer = BackgroundWriter(fsync=False)
+    writer.append(tmp_path / "a.txt", "x")
+    writer.close()
+    assert (tmp_path / "a.txt").read_text() == "x"
+
+
+def test_memory_appends_without_rewriting(tmp_path: Path) -> None:
+    writer = BackgroundWriter()
+    memory = MemoryStore(tmp_path, writer=writer)
+    memory.append_today("first")
+    memory.append_today("second")
+    notes = memory.read_today()
+    assert notes.count("# ") == 1
+    assert notes.endswith("first\nsecond")
+    writer.close()